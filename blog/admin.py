@@ -38,6 +38,26 @@ from blog.db_operations import (
     obtenir_toutes_configurations,
     modifier_configuration,
 )
+from blog.cache import obtenir_statistiques_caches
+from blog.journal import obtenir_statistiques_journal
+from blog.db_connexion import obtenir_unite_courante, unite_de_travail
+
+
+def _categories_postees(request):
+    """Identifiants des catégories cochées dans le formulaire."""
+    return [int(c) for c in request.POST.getlist("categories")]
+
+
+def _annuler_ecritures():
+    """
+    Annule les écritures SQL de la requête en cours.
+
+    Un contenu n'est jamais gardé sans ses catégories après une erreur
+    affichée dans le formulaire.
+    """
+    unite = obtenir_unite_courante()
+    if unite is not None:
+        unite.demander_annulation()
 
 
 class ProfesseurBlogAdminSite(AdminSite):
@@ -125,8 +145,8 @@ class ProfesseurBlogAdminSite(AdminSite):
 
     def tableau_bord(self, request):
         stats = obtenir_statistiques_globales()
-        derniers_articles = obtenir_tous_articles(limite=5)
-        derniers_livres = obtenir_tous_livres(limite=5)
+        derniers_articles = obtenir_tous_articles(limite=5, projection="admin")
+        derniers_livres = obtenir_tous_livres(limite=5, projection="admin")
         derniers_achats = obtenir_tous_achats(limite=5)
         messages_recents = obtenir_messages_contact(limite=5)
 
@@ -138,6 +158,8 @@ class ProfesseurBlogAdminSite(AdminSite):
             "derniers_livres": derniers_livres,
             "derniers_achats": derniers_achats,
             "messages_recents": messages_recents,
+            "stats_caches": obtenir_statistiques_caches(),
+            "stats_journal": obtenir_statistiques_journal(),
         }
         return render(request, "admin/tableau_bord.html", context)
 
@@ -147,7 +169,9 @@ class ProfesseurBlogAdminSite(AdminSite):
 
     def liste_articles(self, request):
         type_filtre = request.GET.get("type")
-        articles = obtenir_tous_articles(type_article=type_filtre, limite=100)
+        articles = obtenir_tous_articles(
+            type_article=type_filtre, limite=100, projection="admin"
+        )
         context = {
             **self.each_context(request),
             "title": "Gestion des articles",
@@ -217,13 +241,14 @@ class ProfesseurBlogAdminSite(AdminSite):
                 try:
                     if donnees["temps_lecture"]:
                         donnees["temps_lecture"] = int(donnees["temps_lecture"])
-                    article_id = creer_article(donnees)
-                    cat_ids = request.POST.getlist("categories")
-                    if cat_ids:
-                        associer_categories(article_id, [int(c) for c in cat_ids])
+                    categorie_ids = _categories_postees(request)
+                    with unite_de_travail():
+                        article_id = creer_article(donnees)
+                        associer_categories(article_id, categorie_ids)
                     messages.success(request, f'Article "{donnees["titre"]}" créé!')
                     return redirect("admin:contenus_liste")
                 except Exception as e:
+                    _annuler_ecritures()
                     messages.error(request, f"Erreur: {str(e)}")
 
         context = {
@@ -270,14 +295,14 @@ class ProfesseurBlogAdminSite(AdminSite):
                 try:
                     if donnees["temps_lecture"]:
                         donnees["temps_lecture"] = int(donnees["temps_lecture"])
-                    modifier_article(article_id, donnees)
-                    cat_ids = request.POST.getlist("categories")
-                    associer_categories(
-                        article_id, [int(c) for c in cat_ids] if cat_ids else []
-                    )
+                    categorie_ids = _categories_postees(request)
+                    with unite_de_travail():
+                        modifier_article(article_id, donnees)
+                        associer_categories(article_id, categorie_ids)
                     messages.success(request, f"Article modifié!")
                     return redirect("admin:contenus_liste")
                 except Exception as e:
+                    _annuler_ecritures()
                     messages.error(request, f"Erreur: {str(e)}")
             article = donnees
 
@@ -320,11 +345,15 @@ class ProfesseurBlogAdminSite(AdminSite):
     def liste_livres(self, request):
         filtre = request.GET.get("filtre")
         if filtre == "gratuit":
-            livres = obtenir_tous_livres(est_gratuit=True, limite=100)
+            livres = obtenir_tous_livres(
+                est_gratuit=True, limite=100, projection="admin"
+            )
         elif filtre == "payant":
-            livres = obtenir_tous_livres(est_gratuit=False, limite=100)
+            livres = obtenir_tous_livres(
+                est_gratuit=False, limite=100, projection="admin"
+            )
         else:
-            livres = obtenir_tous_livres(limite=100)
+            livres = obtenir_tous_livres(limite=100, projection="admin")
 
         context = {
             **self.each_context(request),
@@ -398,13 +427,14 @@ class ProfesseurBlogAdminSite(AdminSite):
                     if donnees["prix"]:
                         donnees["prix"] = float(donnees["prix"])
 
-                    livre_id = creer_livre(donnees)
-                    cat_ids = request.POST.getlist("categories")
-                    if cat_ids:
-                        associer_categories_livre(livre_id, [int(c) for c in cat_ids])
+                    categorie_ids = _categories_postees(request)
+                    with unite_de_travail():
+                        livre_id = creer_livre(donnees)
+                        associer_categories_livre(livre_id, categorie_ids)
                     messages.success(request, f'Livre "{donnees["titre"]}" créé!')
                     return redirect("admin:livres_liste")
                 except Exception as e:
+                    _annuler_ecritures()
                     messages.error(request, f"Erreur: {str(e)}")
 
         context = {
@@ -462,14 +492,14 @@ class ProfesseurBlogAdminSite(AdminSite):
                     if donnees["prix"]:
                         donnees["prix"] = float(donnees["prix"])
 
-                    modifier_livre(livre_id, donnees)
-                    cat_ids = request.POST.getlist("categories")
-                    associer_categories_livre(
-                        livre_id, [int(c) for c in cat_ids] if cat_ids else []
-                    )
+                    categorie_ids = _categories_postees(request)
+                    with unite_de_travail():
+                        modifier_livre(livre_id, donnees)
+                        associer_categories_livre(livre_id, categorie_ids)
                     messages.success(request, f"Livre modifié!")
                     return redirect("admin:livres_liste")
                 except Exception as e:
+                    _annuler_ecritures()
                     messages.error(request, f"Erreur: {str(e)}")
             livre = donnees
 
@@ -0,0 +1,204 @@
+"""
+Index d'autocomplétion en mémoire pour le Blog Académique.
+
+``api_recherche`` est appelée à chaque frappe: au lieu d'interroger la
+base, elle cherche le préfixe saisi dans un tableau trié de clés
+normalisées (sans accents, en minuscules), construit à partir des titres,
+des auteurs et des catégories des contenus publiés. Une recherche est
+une dichotomie suivie d'un parcours des clés qui commencent par le
+préfixe.
+
+Chaque worker garde son index et le reconstruit lorsque la version du
+catalogue (table ``versions_contenu``) change: le nouvel index est
+construit à part puis remplace l'ancien, les recherches en cours ne sont
+jamais bloquées.
+"""
+
+import re
+import threading
+import unicodedata
+import logging
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+# Priorité des clés (la plus petite l'emporte pour un même contenu)
+PRIORITE_TITRE = 0  # début du titre
+PRIORITE_MOT = 1  # début d'un mot du titre
+PRIORITE_AUTEUR = 2
+PRIORITE_CATEGORIE = 3
+
+PRIORITES = (PRIORITE_TITRE, PRIORITE_MOT, PRIORITE_AUTEUR, PRIORITE_CATEGORIE)
+TYPES = ("article", "livre")
+
+
+def normaliser(texte):
+    """Minuscules, sans accents, mots séparés par une seule espace."""
+    decompose = unicodedata.normalize("NFKD", texte or "")
+    sans_accents = "".join(c for c in decompose if not unicodedata.combining(c))
+    return re.sub(r"[\W_]+", " ", sans_accents.casefold()).strip()
+
+
+def _suffixes(texte):
+    """Le texte normalisé depuis le début de chacun de ses mots."""
+    mots = normaliser(texte).split()
+    return [" ".join(mots[position:]) for position in range(len(mots))]
+
+
+def entree_article(article):
+    """Résultat affiché par l'API pour un article."""
+    return {
+        "id": article["id"],
+        "titre": article["titre"],
+        "type": "article",
+        "sous_type": article["type_article"],
+        "image": article["image_url"],
+        "slug": article["slug"],
+        "url": f"/article/{article['slug']}/",
+    }
+
+
+def entree_livre(livre):
+    """Résultat affiché par l'API pour un livre."""
+    return {
+        "id": livre["id"],
+        "titre": livre["titre"],
+        "type": "livre",
+        "image": livre["image_couverture"],
+        "slug": livre["slug"],
+        "url": f"/livre/{livre['slug']}/",
+        "prix": livre["prix"] if not livre["est_gratuit"] else "Gratuit",
+    }
+
+
+class IndexAutocompletion:
+    """
+    Tableaux triés de clés normalisées, un par type de contenu et par
+    priorité.
+
+    Une recherche parcourt les tableaux par priorité croissante et
+    s'arrête dès que la limite est atteinte: son coût dépend du nombre de
+    résultats demandés, pas de la taille du catalogue. L'index n'est plus
+    modifié une fois construit et peut être lu par plusieurs threads sans
+    verrou.
+    """
+
+    def __init__(self, articles=(), livres=()):
+        self._entrees = []
+        cles = {(type_, priorite): [] for type_ in TYPES for priorite in PRIORITES}
+        for ligne, construire in [
+            *((article, entree_article) for article in articles),
+            *((livre, entree_livre) for livre in livres),
+        ]:
+            numero = len(self._entrees)
+            entree = construire(ligne)
+            self._entrees.append(entree)
+
+            titre = _suffixes(ligne["titre"])
+            sources = [
+                *((cle, PRIORITE_TITRE) for cle in titre[:1]),
+                *((cle, PRIORITE_MOT) for cle in titre[1:]),
+                *((cle, PRIORITE_AUTEUR) for cle in _suffixes(ligne["auteur"])),
+                *(
+                    (cle, PRIORITE_CATEGORIE)
+                    for nom in ligne["categories_noms"].split(",")
+                    for cle in _suffixes(nom)
+                ),
+            ]
+            vues = set()
+            for cle, priorite in sources:
+                if cle not in vues:
+                    vues.add(cle)
+                    cles[entree["type"], priorite].append((cle, numero))
+
+        self._tables = {}
+        for table, paires in cles.items():
+            paires.sort()
+            self._tables[table] = (
+                [cle for cle, _ in paires],
+                [numero for _, numero in paires],
+            )
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def rechercher(self, terme, limite_par_type=5):
+        """
+        Retourne les contenus dont une clé commence par ``terme``.
+
+        Les contenus sont classés par priorité de la clé trouvée (début
+        du titre, mot du titre, auteur, catégorie) puis par ordre
+        alphabétique de la clé, au plus ``limite_par_type`` articles puis
+        ``limite_par_type`` livres.
+        """
+        prefixe = normaliser(terme)
+        if not prefixe:
+            return []
+
+        resultats = []
+        for type_ in TYPES:
+            trouves = []
+            for priorite in PRIORITES:
+                cles, numeros = self._tables[type_, priorite]
+                position = bisect_left(cles, prefixe)
+                while (
+                    len(trouves) < limite_par_type
+                    and position < len(cles)
+                    and cles[position].startswith(prefixe)
+                ):
+                    if numeros[position] not in trouves:
+                        trouves.append(numeros[position])
+                    position += 1
+                if len(trouves) >= limite_par_type:
+                    break
+            resultats.extend(self._entrees[numero] for numero in trouves)
+        return resultats
+
+
+# =============================================================================
+# INDEX DU PROCESSUS
+# =============================================================================
+
+_index = None
+_version_index = None
+_verrou_index = threading.Lock()
+
+
+def construire_index():
+    """Construit un index à partir des contenus publiés."""
+    from blog.db_operations import obtenir_entrees_autocompletion
+
+    articles, livres = obtenir_entrees_autocompletion()
+    return IndexAutocompletion(articles, livres)
+
+
+def obtenir_index_autocompletion():
+    """
+    Retourne l'index du processus, reconstruit si le catalogue a changé.
+
+    Un seul thread reconstruit l'index; les autres continuent avec
+    l'ancien jusqu'au remplacement.
+    """
+    global _index, _version_index
+    from blog.cache import DOMAINE_CATALOGUE
+    from blog.db_operations import obtenir_versions_contenu
+
+    version = obtenir_versions_contenu((DOMAINE_CATALOGUE,))
+    if _index is not None and version == _version_index:
+        return _index
+
+    if not _verrou_index.acquire(blocking=_index is None):
+        return _index
+    try:
+        if _index is None or version != _version_index:
+            index = construire_index()
+            _index, _version_index = index, version
+            logger.info(f"Index d'autocomplétion construit: {len(index)} contenus")
+        return _index
+    finally:
+        _verrou_index.release()
+
+
+def autocompleter(terme, limite_par_type=5):
+    """Résultats de l'autocomplétion pour ``terme``."""
+    return obtenir_index_autocompletion().rechercher(terme, limite_par_type)
@@ -0,0 +1,221 @@
+"""
+Cache de résultats versionné pour le Blog Académique.
+
+Les résultats coûteux (sections de la page d'accueil, ...) sont gardés
+en mémoire dans chaque worker et associés au numéro de version de leur
+domaine (table ``versions_contenu``). Les fonctions d'écriture de
+``blog.db_operations`` incrémentent ce numéro dans la même transaction
+que la modification: à la requête suivante, chaque worker voit la
+nouvelle version et recalcule le résultat. Vérifier la version coûte
+une seule lecture par clé primaire.
+
+Une durée de vie (``ttl``) peut en plus borner la fraîcheur des
+résultats qui dépendent d'autres données (les vues pour « les plus
+lus », les statistiques globales).
+
+Les résultats de recherche ont leur propre cache, pour qu'une rafale de
+requêtes différentes n'évince pas les sections de la page d'accueil.
+"""
+
+import threading
+import time
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Domaines de version (clés de la table versions_contenu)
+DOMAINE_CATALOGUE = "catalogue"  # articles, livres et leurs catégories
+DOMAINE_CONFIGURATION = "configuration"  # table configuration_site
+DOMAINE_STATISTIQUES = "statistiques"  # achats, messages, abonnés
+
+CONFIGURATION_CACHE_DEFAUT = {
+    "ACTIF": True,
+    # Durée de vie (secondes) des sections classées par nombre de vues
+    "TTL_VUES": 300,
+    # Durée de vie (secondes) des statistiques globales (vues comprises)
+    "TTL_STATISTIQUES": 60,
+    # Nombre maximal d'entrées gardées par worker
+    "TAILLE_MAX": 256,
+    # Cache des résultats de recherche (entrées par worker, durée de vie)
+    "TAILLE_MAX_RECHERCHE": 512,
+    "TTL_RECHERCHE": 600,
+}
+
+
+class CacheVersionne:
+    """
+    Cache mémoire dont chaque entrée est valide pour une version donnée.
+
+    Une entrée est recalculée si la version de son domaine a changé ou
+    si sa durée de vie est écoulée. Une fois plein, le cache évince
+    l'entrée utilisée le moins récemment.
+    """
+
+    def __init__(self, taille_max=256):
+        self.taille_max = taille_max
+        self._verrou = threading.Lock()
+        self._entrees = {}
+        self._compteurs = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def obtenir(self, cle, version, calculer, ttl=None):
+        """Retourne la valeur en cache pour ``version`` ou la calcule."""
+        maintenant = time.monotonic()
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None:
+                version_entree, expire_a, valeur = entree
+                if version_entree == version and (
+                    expire_a is None or maintenant < expire_a
+                ):
+                    self._compteurs["hits"] += 1
+                    # Replacée en fin d'ordre: la plus récemment utilisée
+                    self._entrees[cle] = self._entrees.pop(cle)
+                    return valeur
+                self._compteurs["invalidations"] += 1
+            self._compteurs["misses"] += 1
+
+        valeur = calculer()
+
+        with self._verrou:
+            if cle not in self._entrees and len(self._entrees) >= self.taille_max:
+                # Éviction de l'entrée utilisée le moins récemment
+                self._entrees.pop(next(iter(self._entrees)))
+            self._entrees[cle] = (
+                version,
+                maintenant + ttl if ttl else None,
+                valeur,
+            )
+        return valeur
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+
+    def obtenir_statistiques(self):
+        """Retourne les compteurs du cache."""
+        with self._verrou:
+            statistiques = dict(self._compteurs)
+            statistiques["entrees"] = len(self._entrees)
+        total = statistiques["hits"] + statistiques["misses"]
+        statistiques["taux_hits"] = statistiques["hits"] / total if total else 0.0
+        return statistiques
+
+
+# =============================================================================
+# CACHE DU PROCESSUS
+# =============================================================================
+
+_cache = None
+_cache_recherche = None
+_verrou_cache = threading.Lock()
+
+
+def obtenir_configuration_cache():
+    """Retourne la configuration du cache (défauts + settings.BLOG_CACHE)."""
+    configuration = dict(CONFIGURATION_CACHE_DEFAUT)
+    configuration.update(getattr(settings, "BLOG_CACHE", {}))
+    return configuration
+
+
+def obtenir_cache():
+    """Retourne le cache versionné du processus."""
+    global _cache
+
+    if _cache is None:
+        with _verrou_cache:
+            if _cache is None:
+                _cache = CacheVersionne(obtenir_configuration_cache()["TAILLE_MAX"])
+    return _cache
+
+
+def obtenir_cache_recherche():
+    """Retourne le cache des résultats de recherche du processus."""
+    global _cache_recherche
+
+    if _cache_recherche is None:
+        with _verrou_cache:
+            if _cache_recherche is None:
+                _cache_recherche = CacheVersionne(
+                    obtenir_configuration_cache()["TAILLE_MAX_RECHERCHE"]
+                )
+    return _cache_recherche
+
+
+def obtenir_statistiques_caches():
+    """Compteurs des caches de ce processus, par nom de cache."""
+    return {
+        "resultats": obtenir_cache().obtenir_statistiques(),
+        "recherche": obtenir_cache_recherche().obtenir_statistiques(),
+    }
+
+
+def memoriser(cle, calculer, domaine=DOMAINE_CATALOGUE, ttl=None, cache=None):
+    """
+    Retourne ``calculer()`` mis en cache pour la version de ``domaine``.
+
+    ``domaine`` peut être un tuple de domaines: l'entrée est alors
+    invalidée dès que l'un d'eux change. Si le cache est désactivé
+    (settings.BLOG_CACHE['ACTIF']), le résultat est calculé à chaque appel.
+    ``cache`` remplace le cache partagé (``obtenir_cache()``).
+    """
+    if not obtenir_configuration_cache()["ACTIF"]:
+        return calculer()
+
+    from blog.db_operations import obtenir_versions_contenu
+
+    domaines = (domaine,) if isinstance(domaine, str) else tuple(domaine)
+    version = obtenir_versions_contenu(domaines)
+    return (cache or obtenir_cache()).obtenir(
+        f"{'+'.join(domaines)}:{cle}", version, calculer, ttl
+    )
+
+
+# =============================================================================
+# RÉSULTATS PARTAGÉS
+# =============================================================================
+
+
+def obtenir_configurations_en_cache():
+    """Configuration du site, invalidée par ``modifier_configuration``."""
+    from blog.db_operations import obtenir_toutes_configurations
+
+    return memoriser(
+        "configurations", obtenir_toutes_configurations, domaine=DOMAINE_CONFIGURATION
+    )
+
+
+def obtenir_statistiques_en_cache():
+    """Statistiques globales, invalidées par les écritures ou après un TTL."""
+    from blog.db_operations import obtenir_statistiques_globales
+
+    return memoriser(
+        "statistiques_globales",
+        obtenir_statistiques_globales,
+        domaine=(DOMAINE_CATALOGUE, DOMAINE_STATISTIQUES),
+        ttl=obtenir_configuration_cache()["TTL_STATISTIQUES"],
+    )
+
+
+def rechercher_en_cache(terme, page=1, par_page=12):
+    """
+    Page de ``rechercher_contenus``, partagée par les saisies qui ne
+    diffèrent que par la casse, les accents ou les espaces.
+
+    Les recherches sans résultat sont gardées comme les autres; toutes
+    sont invalidées par les écritures du catalogue.
+    """
+    from blog.autocompletion import normaliser
+    from blog.db_operations import rechercher_contenus
+
+    cle = normaliser(terme)
+    if not cle:
+        return {"resultats": [], "total": 0, "page": 1, "nombre_pages": 0}
+
+    return memoriser(
+        f"recherche:{page}:{par_page}:{cle}",
+        lambda: rechercher_contenus(terme, page=page, par_page=par_page),
+        ttl=obtenir_configuration_cache()["TTL_RECHERCHE"],
+        cache=obtenir_cache_recherche(),
+    )
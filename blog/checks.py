@@ -0,0 +1,29 @@
+"""
+Vérifications Django (python manage.py check, runserver, migrer_db...).
+"""
+
+import sqlite3
+
+from django.core.checks import Error, register
+
+
+@register()
+def verifier_sqlite(app_configs, **kwargs):
+    """SQLite du processus: fonctions utilisées par le schéma (power)."""
+    from blog.db_migrations import verifier_fonctions_sql
+
+    connexion = sqlite3.connect(":memory:")
+    try:
+        verifier_fonctions_sql(connexion)
+    except RuntimeError as e:
+        return [
+            Error(
+                str(e),
+                hint="Lier Python à SQLite 3.35+ compilé avec les fonctions "
+                "mathématiques (option par défaut du script configure).",
+                id="blog.E001",
+            )
+        ]
+    finally:
+        connexion.close()
+    return []
@@ -0,0 +1,108 @@
+"""
+Compteurs de vues différés pour le Blog Académique.
+
+Les vues des pages de détail ne sont plus écrites pendant la requête:
+elles sont agrégées en mémoire par (article ou livre, jour) puis écrites
+en lot dans ``statistiques_vues`` par un thread d'arrière-plan, toutes
+les N secondes ou dès que N vues sont en attente (voir
+``blog.ecriture_differee``).
+"""
+
+from datetime import date
+
+from django.conf import settings
+
+from blog.ecriture_differee import EcritureDifferee, InstanceProcessus
+
+CONFIGURATION_TAMPON_DEFAUT = {
+    "ACTIF": True,
+    # Délai maximal (secondes) entre deux écritures en lot
+    "INTERVALLE": 5.0,
+    # Nombre de vues en attente déclenchant une écriture anticipée
+    "SEUIL": 100,
+}
+
+
+class TamponVues(EcritureDifferee):
+    """
+    Agrège les incréments de vues et les écrit en lot.
+
+    ``ecrire`` reçoit une liste de tuples
+    ``(article_id, livre_id, date_vue, nombre)``.
+    """
+
+    NOM_FIL = "blog-tampon-vues"
+    CLE_EN_ATTENTE = "vues_en_attente"
+    DESCRIPTION = "Écriture des vues en lot"
+
+    def __init__(self, ecrire, intervalle=5.0, seuil=100):
+        super().__init__(ecrire, intervalle, seuil, compteurs=("vues_recues",))
+
+    def ajouter(self, article_id=None, livre_id=None, date_vue=None):
+        """Enregistre une vue en mémoire (aucune écriture SQL)."""
+        if not article_id and not livre_id:
+            return
+
+        cle = (
+            article_id or None,
+            None if article_id else livre_id,
+            date_vue or date.today().isoformat(),
+        )
+        with self._verrou:
+            self._en_attente[cle] = self._en_attente.get(cle, 0) + 1
+            self._nombre_en_attente += 1
+            self._compteurs["vues_recues"] += 1
+            seuil_atteint = self._nombre_en_attente >= self.seuil
+
+        self._signaler_ajout(seuil_atteint)
+
+    def _reinitialiser_file(self):
+        self._en_attente = {}
+        self._nombre_en_attente = 0
+
+    def _taille_file(self):
+        return self._nombre_en_attente
+
+    def _lignes(self, en_attente):
+        return [
+            (article_id, livre_id, date_vue, nombre)
+            for (article_id, livre_id, date_vue), nombre in en_attente.items()
+        ]
+
+    def _reinjecter(self, en_attente, lignes):
+        for cle, nombre in en_attente.items():
+            self._en_attente[cle] = self._en_attente.get(cle, 0) + nombre
+            self._nombre_en_attente += nombre
+
+
+# =============================================================================
+# TAMPON DU PROCESSUS
+# =============================================================================
+
+
+def obtenir_configuration_tampon():
+    """Retourne la configuration du tampon (défauts + settings.BLOG_TAMPON_VUES)."""
+    configuration = dict(CONFIGURATION_TAMPON_DEFAUT)
+    configuration.update(getattr(settings, "BLOG_TAMPON_VUES", {}))
+    return configuration
+
+
+def _creer_tampon():
+    from blog.db_operations import enregistrer_vues_en_lot
+
+    configuration = obtenir_configuration_tampon()
+    return TamponVues(
+        enregistrer_vues_en_lot,
+        intervalle=configuration["INTERVALLE"],
+        seuil=configuration["SEUIL"],
+    )
+
+
+_tampon = InstanceProcessus(_creer_tampon)
+
+
+def obtenir_tampon_vues():
+    """Retourne le tampon de vues du processus, ou None s'il est désactivé."""
+    if not obtenir_configuration_tampon()["ACTIF"]:
+        return None
+    return _tampon.obtenir()
@@ -6,68 +6,67 @@ disponibles dans tous les templates.
 """
 
 import logging
-from blog.db_operations import (
-    obtenir_toutes_configurations,
-    obtenir_statistiques_globales,
+
+from django.utils.functional import SimpleLazyObject
+
+from blog.cache import (
+    obtenir_configurations_en_cache,
+    obtenir_statistiques_en_cache,
 )
 
 logger = logging.getLogger(__name__)
 
+CONFIG_SITE_DEFAUT = {
+    "nom_site": "Blog Académique",
+    "description_site": "Blog académique - Articles, recherches et publications",
+    "email_contact": "",
+    "telephone": "",
+    "adresse": "",
+    "lien_facebook": "",
+    "lien_twitter": "",
+    "lien_linkedin": "",
+    "lien_youtube": "",
+    "lien_instagram": "",
+    "mots_cles": "professeur, université, recherche, publications, livres",
+    "copyright_texte": "",
+    "google_analytics_id": "",
+}
+
 
 def contexte_global(request):
     """
     Ajoute des variables globales au contexte de tous les templates.
 
+    Les valeurs sont chargées à la première utilisation dans le template
+    (une page qui n'affiche pas les statistiques ne les lit pas) puis
+    servies par le cache versionné (voir ``blog.cache``).
+
     Retourne:
         dict: Variables de contexte globales incluant la configuration du site
     """
-    try:
-        config = obtenir_toutes_configurations()
-        stats = obtenir_statistiques_globales()
+    return {
+        "config_site": SimpleLazyObject(charger_config_site),
+        "stats": SimpleLazyObject(charger_statistiques),
+    }
 
-        # Transformer en objet accessible par attribut
-        config_site = {
-            "nom_site": config.get("nom_site", "Blog Académique"),
-            "description_site": config.get(
-                "description_site",
-                "Blog académique - Articles, recherches et publications",
-            ),
-            "email_contact": config.get("email_contact", ""),
-            "telephone": config.get("telephone", ""),
-            "adresse": config.get("adresse", ""),
-            "lien_facebook": config.get("lien_facebook", ""),
-            "lien_twitter": config.get("lien_twitter", ""),
-            "lien_linkedin": config.get("lien_linkedin", ""),
-            "lien_youtube": config.get("lien_youtube", ""),
-            "lien_instagram": config.get("lien_instagram", ""),
-            "mots_cles": config.get(
-                "mots_cles", "professeur, université, recherche, publications, livres"
-            ),
-            "copyright_texte": config.get("copyright_texte", ""),
-            "google_analytics_id": config.get("google_analytics_id", ""),
-        }
 
+def charger_config_site():
+    """Configuration du site complétée par les valeurs par défaut."""
+    try:
+        config = obtenir_configurations_en_cache()
     except Exception as e:
         logger.error(f"Erreur lors du chargement de la configuration: {e}")
-        # Valeurs par défaut en cas d'erreur
-        config_site = {
-            "nom_site": "Blog Académique",
-            "description_site": "Blog académique - Articles, recherches et publications",
-            "email_contact": "",
-            "telephone": "",
-            "adresse": "",
-            "lien_facebook": "",
-            "lien_twitter": "",
-            "lien_linkedin": "",
-            "lien_youtube": "",
-            "lien_instagram": "",
-            "mots_cles": "professeur, université, recherche, publications, livres",
-            "copyright_texte": "",
-            "google_analytics_id": "",
-        }
-        stats = {}
+        return dict(CONFIG_SITE_DEFAUT)
 
     return {
-        "config_site": config_site,
-        "stats": stats,
+        cle: config.get(cle, defaut) for cle, defaut in CONFIG_SITE_DEFAUT.items()
     }
+
+
+def charger_statistiques():
+    """Statistiques globales du site ({} en cas d'erreur)."""
+    try:
+        return obtenir_statistiques_en_cache()
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement des statistiques: {e}")
+        return {}
@@ -0,0 +1,459 @@
+"""
+Gestion des connexions SQLite pour le Blog Académique du Professeur.
+
+Ce module fournit un pool de connexions persistantes utilisé par
+toutes les fonctions de ``blog.db_operations``. Chaque processus
+(worker gunicorn) possède son propre pool, partagé entre ses threads.
+
+Il fournit aussi l'unité de travail: pendant une requête HTTP (voir
+``blog.middleware``), toutes les requêtes SQL partagent une seule
+connexion et une seule transaction, validée une fois à la fin.
+
+IMPORTANT: Ce projet n'utilise PAS l'ORM Django.
+Toutes les opérations sont effectuées en SQL brut.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+CONFIGURATION_POOL_DEFAUT = {
+    # Nombre maximal de connexions inactives conservées par processus
+    "TAILLE_MAX": 5,
+    # Inactivité (secondes) au-delà de laquelle une connexion est testée
+    "DELAI_VERIFICATION": 30,
+    # Âge maximal (secondes) d'une connexion avant recyclage
+    "DUREE_VIE_MAX": 3600,
+}
+
+
+def obtenir_configuration_pool():
+    """Retourne la configuration du pool (défauts + settings.BLOG_DB_POOL)."""
+    configuration = dict(CONFIGURATION_POOL_DEFAUT)
+    configuration.update(getattr(settings, "BLOG_DB_POOL", {}))
+    return configuration
+
+
+def obtenir_chemin_db():
+    """Retourne le chemin du fichier SQLite configuré."""
+    return str(settings.DATABASES["default"]["NAME"])
+
+
+# =============================================================================
+# PROFIL D'INITIALISATION DES CONNEXIONS (PRAGMAS)
+# =============================================================================
+
+# PRAGMAs gérés. journal_mode est enregistré dans le fichier de la base:
+# il est changé une fois (init_db, migrer_db, voir activer_journal_mode),
+# les autres sont propres à chaque connexion (appliquer_profil).
+PRAGMAS_AUTORISES = (
+    "busy_timeout",
+    "journal_mode",
+    "synchronous",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+    "foreign_keys",
+)
+
+PROFIL_DEFAUT = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,
+    "mmap_size": 64 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+def obtenir_profil_db():
+    """Retourne le profil de PRAGMAs (défauts + settings.BLOG_DB_PROFIL)."""
+    profil = dict(PROFIL_DEFAUT)
+    options = settings.DATABASES["default"].get("OPTIONS", {})
+    if "timeout" in options:
+        profil["busy_timeout"] = int(options["timeout"] * 1000)
+    profil.update(getattr(settings, "BLOG_DB_PROFIL", {}))
+    return profil
+
+
+def _valider_profil(profil):
+    """Refuse les PRAGMAs hors liste et les valeurs qui ne sont pas des mots."""
+    inconnus = set(profil) - set(PRAGMAS_AUTORISES)
+    if inconnus:
+        raise ValueError(f"PRAGMA non autorisé: {', '.join(sorted(inconnus))}")
+
+    for pragma, valeur in profil.items():
+        if valeur is not None and not str(valeur).lstrip("-").replace("_", "").isalnum():
+            raise ValueError(f"Valeur invalide pour PRAGMA {pragma}: {valeur}")
+
+
+def appliquer_profil(connexion, profil):
+    """
+    Applique à une connexion les PRAGMAs du profil qui lui sont propres.
+
+    journal_mode est ignoré ici: le changer demande un verrou exclusif
+    sur la base (voir ``activer_journal_mode``).
+    """
+    _valider_profil(profil)
+    for pragma in PRAGMAS_AUTORISES:
+        if pragma == "journal_mode" or profil.get(pragma) is None:
+            continue
+        connexion.execute(f"PRAGMA {pragma} = {profil[pragma]}").fetchall()
+
+
+def activer_journal_mode(connexion, mode=None):
+    """
+    Passe la base au mode de journal ``mode`` (profil par défaut).
+
+    Le mode est enregistré dans le fichier: rien n'est fait s'il est déjà
+    actif. Si une autre connexion tient la base, le changement est remis
+    à plus tard (avertissement). Retourne le mode actif (None s'il n'a
+    pas pu être lu).
+    """
+    if mode is None:
+        mode = obtenir_profil_db().get("journal_mode")
+    _valider_profil({"journal_mode": mode})
+
+    # Sans attente: une base occupée ne doit pas bloquer le démarrage
+    attente = connexion.execute("PRAGMA busy_timeout").fetchone()[0]
+    connexion.execute("PRAGMA busy_timeout = 0")
+    actif = None
+    try:
+        actif = connexion.execute("PRAGMA journal_mode").fetchone()[0]
+        if mode is None or actif.upper() == str(mode).upper():
+            return actif
+        return connexion.execute(f"PRAGMA journal_mode = {mode}").fetchone()[0]
+    except sqlite3.OperationalError as e:
+        logger.warning(f"journal_mode={mode} non appliqué (base occupée): {e}")
+        return actif
+    finally:
+        connexion.execute(f"PRAGMA busy_timeout = {int(attente)}")
+
+
+def lire_profil(connexion):
+    """Retourne les valeurs actives des PRAGMAs gérés sur une connexion."""
+    valeurs = {}
+    for pragma in PRAGMAS_AUTORISES:
+        ligne = connexion.execute(f"PRAGMA {pragma}").fetchone()
+        valeurs[pragma] = ligne[0] if ligne else None
+    return valeurs
+
+
+def obtenir_connexion(chemin=None, profil=None):
+    """Ouvre une nouvelle connexion configurée selon le profil de la base."""
+    connexion = sqlite3.connect(chemin or obtenir_chemin_db(), check_same_thread=False)
+    try:
+        appliquer_profil(connexion, obtenir_profil_db() if profil is None else profil)
+    except Exception:
+        connexion.close()
+        raise
+    return connexion
+
+
+# =============================================================================
+# POOL DE CONNEXIONS
+# =============================================================================
+
+
+class PoolConnexions:
+    """
+    Pool de connexions SQLite réutilisables pour un fichier de base.
+
+    Les connexions inactives sont conservées (au plus ``taille_max``)
+    et resservies aux requêtes suivantes. Une connexion restée inactive
+    plus de ``delai_verification`` secondes est testée avant d'être
+    réutilisée, et celles plus vieilles que ``duree_vie_max`` sont
+    recyclées.
+    """
+
+    def __init__(
+        self, chemin, taille_max=5, delai_verification=30, duree_vie_max=3600
+    ):
+        self.chemin = chemin
+        self.taille_max = taille_max
+        self.delai_verification = delai_verification
+        self.duree_vie_max = duree_vie_max
+
+        self._verrou = threading.Lock()
+        # Entrées: (connexion, date_ouverture, dernier_usage)
+        self._libres = deque()
+        self._dates_ouverture = {}
+        self._compteurs = {
+            "hits": 0,
+            "misses": 0,
+            "ouvertures": 0,
+            "fermetures": 0,
+            "echecs_sante": 0,
+            "debordements": 0,
+        }
+
+    def _incrementer(self, compteur):
+        with self._verrou:
+            self._compteurs[compteur] += 1
+
+    def _ouvrir(self):
+        """Ouvre une nouvelle connexion et l'enregistre."""
+        connexion = obtenir_connexion(self.chemin)
+        self._dates_ouverture[id(connexion)] = time.monotonic()
+        self._incrementer("ouvertures")
+        return connexion
+
+    def _fermer(self, connexion):
+        """Ferme définitivement une connexion."""
+        self._dates_ouverture.pop(id(connexion), None)
+        try:
+            connexion.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Erreur à la fermeture d'une connexion: {e}")
+        self._incrementer("fermetures")
+
+    def _est_saine(self, connexion):
+        """Vérifie qu'une connexion répond toujours."""
+        try:
+            connexion.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            self._incrementer("echecs_sante")
+            return False
+
+    def acquerir(self):
+        """Retourne une connexion du pool, ou en ouvre une nouvelle."""
+        maintenant = time.monotonic()
+
+        while True:
+            with self._verrou:
+                if not self._libres:
+                    break
+                connexion, date_ouverture, dernier_usage = self._libres.pop()
+
+            if maintenant - date_ouverture > self.duree_vie_max:
+                self._fermer(connexion)
+                continue
+
+            if maintenant - dernier_usage > self.delai_verification:
+                if not self._est_saine(connexion):
+                    self._fermer(connexion)
+                    continue
+
+            self._incrementer("hits")
+            return connexion
+
+        self._incrementer("misses")
+        return self._ouvrir()
+
+    def liberer(self, connexion, invalide=False):
+        """Rend une connexion au pool (ou la ferme si le pool est plein)."""
+        if not invalide and connexion.in_transaction:
+            # Ne jamais remettre dans le pool une transaction inachevée
+            try:
+                connexion.rollback()
+            except sqlite3.Error:
+                invalide = True
+
+        if invalide:
+            self._fermer(connexion)
+            return
+
+        date_ouverture = self._dates_ouverture.get(id(connexion), time.monotonic())
+
+        with self._verrou:
+            if len(self._libres) < self.taille_max:
+                self._libres.append((connexion, date_ouverture, time.monotonic()))
+                return
+            self._compteurs["debordements"] += 1
+
+        self._fermer(connexion)
+
+    @contextmanager
+    def connexion(self):
+        """Gestionnaire de contexte: acquiert puis libère une connexion."""
+        connexion = self.acquerir()
+        invalide = False
+        try:
+            yield connexion
+        except sqlite3.DatabaseError:
+            invalide = not self._est_saine(connexion)
+            raise
+        finally:
+            self.liberer(connexion, invalide=invalide)
+
+    def vider(self):
+        """Ferme toutes les connexions inactives."""
+        with self._verrou:
+            libres = list(self._libres)
+            self._libres.clear()
+        for connexion, _, _ in libres:
+            self._fermer(connexion)
+
+    def abandonner(self):
+        """Oublie les connexions sans les fermer (processus enfant après fork)."""
+        with self._verrou:
+            self._libres.clear()
+        self._dates_ouverture.clear()
+
+    def obtenir_statistiques(self):
+        """Retourne les compteurs du pool."""
+        with self._verrou:
+            statistiques = dict(self._compteurs)
+            statistiques["inactives"] = len(self._libres)
+        total = statistiques["hits"] + statistiques["misses"]
+        statistiques["taux_reutilisation"] = (
+            statistiques["hits"] / total if total else 0.0
+        )
+        return statistiques
+
+
+# =============================================================================
+# POOLS PAR PROCESSUS
+# =============================================================================
+
+_pools = {}
+_verrou_pools = threading.Lock()
+
+
+def obtenir_pool(chemin=None):
+    """Retourne le pool du processus courant pour la base configurée."""
+    chemin = chemin or obtenir_chemin_db()
+    pool = _pools.get(chemin)
+    if pool is not None:
+        return pool
+
+    with _verrou_pools:
+        pool = _pools.get(chemin)
+        if pool is None:
+            configuration = obtenir_configuration_pool()
+            pool = PoolConnexions(
+                chemin,
+                taille_max=configuration["TAILLE_MAX"],
+                delai_verification=configuration["DELAI_VERIFICATION"],
+                duree_vie_max=configuration["DUREE_VIE_MAX"],
+            )
+            _pools[chemin] = pool
+    return pool
+
+
+def obtenir_statistiques_pool():
+    """Retourne les compteurs agrégés de tous les pools du processus."""
+    statistiques = {}
+    for pool in list(_pools.values()):
+        for cle, valeur in pool.obtenir_statistiques().items():
+            if cle != "taux_reutilisation":
+                statistiques[cle] = statistiques.get(cle, 0) + valeur
+    total = statistiques.get("hits", 0) + statistiques.get("misses", 0)
+    statistiques["taux_reutilisation"] = (
+        statistiques.get("hits", 0) / total if total else 0.0
+    )
+    return statistiques
+
+
+def fermer_pools():
+    """Ferme toutes les connexions inactives du processus."""
+    for pool in list(_pools.values()):
+        pool.vider()
+
+
+def _reinitialiser_apres_fork():
+    """Un worker forké ne doit jamais réutiliser les connexions du parent."""
+    for pool in list(_pools.values()):
+        pool.abandonner()
+    _pools.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinitialiser_apres_fork)
+
+
+# =============================================================================
+# UNITÉ DE TRAVAIL (UNE CONNEXION, UNE TRANSACTION)
+# =============================================================================
+
+_unite_courante = ContextVar("blog_unite_de_travail", default=None)
+
+
+class UniteDeTravail:
+    """
+    Connexion et transaction partagées par toutes les requêtes d'un bloc.
+
+    La connexion n'est empruntée au pool qu'à la première requête SQL.
+    Les écritures ne sont pas validées une par une: la transaction est
+    validée une seule fois par ``terminer()``, ou annulée en cas d'erreur.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.connexion = None
+        self.nombre_requetes = 0
+        self.annulation_demandee = False
+
+    def obtenir_connexion(self):
+        """Retourne la connexion de l'unité (empruntée au premier appel)."""
+        if self.connexion is None:
+            self.connexion = self.pool.acquerir()
+        self.nombre_requetes += 1
+        return self.connexion
+
+    def demander_annulation(self):
+        """Annule la transaction à la fin de l'unité au lieu de la valider."""
+        self.annulation_demandee = True
+
+    def terminer(self, succes=True):
+        """Valide (ou annule) la transaction puis rend la connexion."""
+        if self.connexion is None:
+            return
+
+        connexion, self.connexion = self.connexion, None
+        invalide = False
+        try:
+            if connexion.in_transaction:
+                if succes and not self.annulation_demandee:
+                    connexion.commit()
+                else:
+                    connexion.rollback()
+        except sqlite3.Error as e:
+            logger.error(f"Erreur à la fin de l'unité de travail: {e}")
+            invalide = not self.pool._est_saine(connexion)
+            raise
+        finally:
+            self.pool.liberer(connexion, invalide=invalide)
+
+
+def obtenir_unite_courante():
+    """Retourne l'unité de travail active, ou None."""
+    return _unite_courante.get()
+
+
+@contextmanager
+def unite_de_travail(chemin=None):
+    """
+    Exécute un bloc dans une unité de travail.
+
+    Une unité déjà active est réutilisée: les blocs imbriqués font
+    partie de la même transaction que le bloc englobant.
+    """
+    unite = _unite_courante.get()
+    if unite is not None:
+        yield unite
+        return
+
+    unite = UniteDeTravail(obtenir_pool(chemin))
+    jeton = _unite_courante.set(unite)
+    try:
+        yield unite
+    except BaseException:
+        _unite_courante.reset(jeton)
+        unite.terminer(succes=False)
+        raise
+    _unite_courante.reset(jeton)
+    unite.terminer(succes=True)
@@ -0,0 +1,151 @@
+"""
+Conversion des lignes SQL en objets Python pour le Blog Académique.
+
+Les fonctions de lecture ne construisent plus leurs dictionnaires à la
+main avec ``row[n]``: le nom des colonnes est lu dans
+``cursor.description`` et une fonction de conversion est générée une
+seule fois par forme de requête (noms de colonnes, valeurs par défaut,
+type de résultat), puis réutilisée pour chaque ligne.
+
+Deux formes de résultat sont disponibles:
+
+- ``FORME_DICT``: un ``dict`` par ligne (forme utilisée par les vues et
+  les templates);
+- ``FORME_ENREGISTREMENT``: un objet à ``__slots__`` par ligne, plus
+  compact en mémoire, accessible par attribut ou par clé.
+"""
+
+import keyword
+from functools import lru_cache
+
+FORME_DICT = "dict"
+FORME_ENREGISTREMENT = "enregistrement"
+
+# Nombre de formes de requête conservées (une entrée par jeu de colonnes)
+TAILLE_CACHE_MAPPEURS = 256
+
+
+class EnregistrementBase:
+    """
+    Base des enregistrements générés: accès par attribut et par clé.
+
+    Les sous-classes sont créées par ``creer_classe_enregistrement`` avec
+    un ``__slots__`` correspondant aux colonnes de la requête.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, cle):
+        try:
+            return getattr(self, cle)
+        except (AttributeError, TypeError):
+            raise KeyError(cle) from None
+
+    def __contains__(self, cle):
+        return cle in self.__slots__
+
+    def __eq__(self, autre):
+        if isinstance(autre, EnregistrementBase):
+            return self.en_dict() == autre.en_dict()
+        if isinstance(autre, dict):
+            return self.en_dict() == autre
+        return NotImplemented
+
+    def __repr__(self):
+        champs = ", ".join(f"{nom}={getattr(self, nom)!r}" for nom in self.__slots__)
+        return f"{type(self).__name__}({champs})"
+
+    def get(self, cle, defaut=None):
+        return getattr(self, cle, defaut) if cle in self.__slots__ else defaut
+
+    def keys(self):
+        return self.__slots__
+
+    def en_dict(self):
+        """Retourne l'enregistrement sous forme de dictionnaire."""
+        return {nom: getattr(self, nom) for nom in self.__slots__}
+
+
+def _valider_noms(noms):
+    """Vérifie que les colonnes sont utilisables comme noms d'attributs."""
+    if len(set(noms)) != len(noms):
+        raise ValueError(f"Colonnes en double dans la requête: {noms}")
+    for nom in noms:
+        if not nom.isidentifier() or keyword.iskeyword(nom):
+            raise ValueError(
+                f"Colonne '{nom}' invalide pour un enregistrement "
+                f"(utiliser un alias: AS nom_colonne)"
+            )
+
+
+def _expression(position, nom, defauts):
+    """Expression Python lisant la colonne ``position`` d'une ligne."""
+    if nom in defauts:
+        return f"_v if (_v := ligne[{position}]) is not None else _defauts[{nom!r}]"
+    return f"ligne[{position}]"
+
+
+@lru_cache(maxsize=TAILLE_CACHE_MAPPEURS)
+def creer_classe_enregistrement(noms):
+    """Crée (une fois par jeu de colonnes) une classe à ``__slots__``."""
+    noms = tuple(noms)
+    _valider_noms(noms)
+    return type("Enregistrement", (EnregistrementBase,), {"__slots__": noms})
+
+
+@lru_cache(maxsize=TAILLE_CACHE_MAPPEURS)
+def _compiler_mappeur(noms, forme, defauts):
+    """Génère la fonction de conversion d'une forme de requête."""
+    defauts = dict(defauts)
+    expressions = [
+        _expression(position, nom, defauts) for position, nom in enumerate(noms)
+    ]
+    espace = {"_defauts": defauts}
+
+    if forme == FORME_DICT:
+        champs = ", ".join(
+            f"{nom!r}: ({expression})" for nom, expression in zip(noms, expressions)
+        )
+        source = f"def convertir(ligne):\n    return {{{champs}}}\n"
+
+    elif forme == FORME_ENREGISTREMENT:
+        classe = creer_classe_enregistrement(noms)
+        affectations = "".join(
+            f"    objet.{nom} = {expression}\n"
+            for nom, expression in zip(noms, expressions)
+        )
+        source = (
+            "def convertir(ligne):\n"
+            "    objet = _nouveau(_classe)\n"
+            f"{affectations}"
+            "    return objet\n"
+        )
+        espace.update(_classe=classe, _nouveau=object.__new__)
+
+    else:
+        raise ValueError(f"Forme de résultat inconnue: {forme}")
+
+    exec(compile(source, f"<mappeur {forme}>", "exec"), espace)
+    return espace["convertir"]
+
+
+def obtenir_mappeur(description, forme=FORME_DICT, defauts=None):
+    """
+    Retourne la fonction ``ligne -> objet`` pour un ``cursor.description``.
+
+    ``defauts`` remplace les ``NULL`` de certaines colonnes, par exemple
+    ``{"categories_noms": ""}`` pour un ``GROUP_CONCAT`` sans résultat.
+    """
+    noms = tuple([colonne[0] for colonne in description])
+    defauts = tuple(defauts.items()) if defauts else ()
+    return _compiler_mappeur(noms, forme, defauts)
+
+
+def obtenir_statistiques_mappeurs():
+    """Retourne l'état du cache des fonctions de conversion."""
+    info = _compiler_mappeur.cache_info()
+    return {
+        "formes": info.currsize,
+        "hits": info.hits,
+        "misses": info.misses,
+    }
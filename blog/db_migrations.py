@@ -0,0 +1,350 @@
+"""
+Migrations du schéma SQL brut pour le Blog Académique.
+
+``SCHEMA_SQL`` décrit le schéma complet d'une nouvelle base. Une base
+existante est mise à jour par les migrations numérotées du répertoire
+``blog/migrations_sql``, sans suppression de données:
+
+    0006_nom.sql   instructions SQL, exécutées une par une
+    0007_nom.py    module définissant, au choix: ``COLONNES`` (colonnes
+                   ajoutées par ``ajouter_colonne``), ``SQL`` (instructions
+                   exécutées ensuite) et ``migrer(connexion)``
+
+La table ``schema_version`` garde la liste des migrations appliquées.
+Chaque migration s'exécute dans sa propre transaction (BEGIN IMMEDIATE):
+les lectures continuent pendant la migration (mode WAL), les écritures
+n'attendent que la migration en cours. Les instructions doivent pouvoir
+être rejouées (IF NOT EXISTS, ``ajouter_colonne``): une base créée avec
+``SCHEMA_SQL`` est simplement marquée à jour.
+
+Usage:
+    python manage.py migrer_db
+    python manage.py migrer_db --simulation
+"""
+
+import re
+import sqlite3
+import time
+import logging
+import importlib.util
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+REPERTOIRE_MIGRATIONS = Path(__file__).resolve().parent / "migrations_sql"
+
+TABLE_VERSIONS_SQL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    nom VARCHAR(100) NOT NULL,
+    date_application TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    duree_ms REAL
+)
+"""
+
+# Instructions qui bloquent les écritures le temps de parcourir ou de
+# réécrire une table: signalées par la simulation
+INSTRUCTIONS_BLOQUANTES = (
+    (re.compile(r"^CREATE\s+(UNIQUE\s+)?INDEX", re.I), "construit un index"),
+    (re.compile(r"'rebuild'", re.I), "reconstruit un index plein texte"),
+    (re.compile(r"^DROP\s+TABLE", re.I), "supprime une table"),
+    (re.compile(r"^ALTER\s+TABLE\s+\S+\s+DROP", re.I), "réécrit la table"),
+    (re.compile(r"^(UPDATE|DELETE)\b", re.I), "modifie des lignes existantes"),
+)
+
+MOTIF_FICHIER = re.compile(r"^(\d{4})_(\w+)\.(sql|py)$")
+
+
+class Migration:
+    """Une migration numérotée (fichier .sql ou module .py)."""
+
+    def __init__(self, chemin):
+        correspondance = MOTIF_FICHIER.match(chemin.name)
+        if correspondance is None:
+            raise ValueError(f"Nom de migration invalide: {chemin.name}")
+        self.chemin = chemin
+        self.version = int(correspondance.group(1))
+        self.nom = correspondance.group(2)
+        self.format = correspondance.group(3)
+        self._module = None
+
+    def __repr__(self):
+        return f"<Migration {self.version:04d}_{self.nom}>"
+
+    @property
+    def description(self):
+        """Première ligne de commentaire (SQL) ou du docstring (Python)."""
+        if self.format == "py":
+            documentation = self._charger_module().__doc__ or ""
+            lignes = documentation.strip().splitlines()
+        else:
+            lignes = [
+                ligne.lstrip("- ")
+                for ligne in self.chemin.read_text(encoding="utf-8").splitlines()
+                if ligne.startswith("--")
+            ]
+        return lignes[0] if lignes else self.nom
+
+    def colonnes(self):
+        """Colonnes ajoutées par la migration: (table, colonne, définition)."""
+        if self.format == "py":
+            return list(getattr(self._charger_module(), "COLONNES", []))
+        return []
+
+    def instructions(self):
+        """Instructions SQL de la migration, dans l'ordre."""
+        if self.format == "py":
+            script = getattr(self._charger_module(), "SQL", "")
+        else:
+            script = self.chemin.read_text(encoding="utf-8")
+        return decouper_instructions(script)
+
+    def appliquer(self, connexion):
+        """Exécute la migration sur ``connexion`` (transaction ouverte)."""
+        for table, colonne, definition in self.colonnes():
+            ajouter_colonne(connexion, table, colonne, definition)
+        for instruction in self.instructions():
+            connexion.execute(instruction).fetchall()
+        if self.format == "py" and hasattr(self._charger_module(), "migrer"):
+            self._charger_module().migrer(connexion)
+
+    def _charger_module(self):
+        if self._module is not None:
+            return self._module
+        specification = importlib.util.spec_from_file_location(
+            f"blog.migrations_sql.m{self.version:04d}", self.chemin
+        )
+        module = importlib.util.module_from_spec(specification)
+        specification.loader.exec_module(module)
+        self._module = module
+        return module
+
+
+def decouper_instructions(script):
+    """Découpe un script SQL en instructions complètes (triggers compris)."""
+    instructions = []
+    tampon = ""
+    for ligne in script.splitlines(keepends=True):
+        if not tampon and (not ligne.strip() or ligne.lstrip().startswith("--")):
+            continue
+        tampon += ligne
+        if sqlite3.complete_statement(tampon):
+            instructions.append(tampon.strip())
+            tampon = ""
+    if tampon.strip():
+        raise ValueError(f"Instruction SQL incomplète: {tampon.strip()[:60]}")
+    return instructions
+
+
+def analyser_instruction(instruction):
+    """Retourne pourquoi ``instruction`` bloque les écritures, ou None."""
+    for motif, raison in INSTRUCTIONS_BLOQUANTES:
+        if motif.search(instruction):
+            return raison
+    return None
+
+
+# =============================================================================
+# PRÉREQUIS SQLITE
+# =============================================================================
+
+
+def verifier_fonctions_sql(connexion):
+    """
+    Vérifie que SQLite fournit les fonctions utilisées par le schéma.
+
+    Les triggers "tendances_*" appellent power(), disponible à partir de
+    SQLite 3.35 compilé avec SQLITE_ENABLE_MATH_FUNCTIONS (option par
+    défaut du script configure). Lève RuntimeError sinon: sans elle,
+    chaque vue ou téléchargement enregistré échouerait.
+    """
+    try:
+        connexion.execute("SELECT power(2.0, 1.0)").fetchone()
+    except sqlite3.OperationalError:
+        raise RuntimeError(
+            f"SQLite {sqlite3.sqlite_version} ne fournit pas power(): le "
+            "schéma exige SQLite 3.35+ compilé avec SQLITE_ENABLE_MATH_FUNCTIONS"
+        ) from None
+
+
+# =============================================================================
+# OUTILS POUR LES MIGRATIONS PYTHON
+# =============================================================================
+
+
+def colonne_existe(connexion, table, colonne):
+    """Indique si ``table`` possède la colonne ``colonne``."""
+    return any(
+        ligne[1] == colonne
+        for ligne in connexion.execute(f"PRAGMA table_info({table})")
+    )
+
+
+def ajouter_colonne(connexion, table, colonne, definition):
+    """
+    Ajoute une colonne si elle n'existe pas encore.
+
+    SQLite ajoute une colonne sans réécrire la table, à condition que sa
+    valeur par défaut soit constante (pas de CURRENT_TIMESTAMP).
+    """
+    if colonne_existe(connexion, table, colonne):
+        return False
+    connexion.execute(f"ALTER TABLE {table} ADD COLUMN {colonne} {definition}")
+    return True
+
+
+# =============================================================================
+# EXÉCUTION
+# =============================================================================
+
+
+def lister_migrations(repertoire=None):
+    """Retourne les migrations du répertoire, par numéro croissant."""
+    migrations = sorted(
+        (
+            Migration(chemin)
+            for chemin in Path(repertoire or REPERTOIRE_MIGRATIONS).iterdir()
+            if MOTIF_FICHIER.match(chemin.name)
+        ),
+        key=lambda migration: migration.version,
+    )
+    for precedente, migration in zip(migrations, migrations[1:]):
+        if precedente.version == migration.version:
+            raise ValueError(
+                f"Deux migrations portent le numéro {migration.version:04d}: "
+                f"{precedente.chemin.name}, {migration.chemin.name}"
+            )
+    return migrations
+
+
+def versions_appliquees(connexion):
+    """Numéros des migrations appliquées à la base."""
+    connexion.execute(TABLE_VERSIONS_SQL)
+    return {ligne[0] for ligne in connexion.execute("SELECT version FROM schema_version")}
+
+
+def migrations_en_attente(connexion, repertoire=None, cible=None):
+    """Migrations non appliquées, jusqu'à ``cible`` incluse."""
+    appliquees = versions_appliquees(connexion)
+    return [
+        migration
+        for migration in lister_migrations(repertoire)
+        if migration.version not in appliquees
+        and (cible is None or migration.version <= cible)
+    ]
+
+
+def appliquer_migrations(connexion, repertoire=None, cible=None, journal=None):
+    """
+    Applique les migrations en attente, une transaction par migration.
+
+    Une migration appliquée entre-temps par un autre processus est
+    ignorée. En cas d'erreur, la migration en cours est annulée et les
+    précédentes restent appliquées. ``journal`` reçoit une ligne par
+    migration. Retourne les migrations appliquées. Lève RuntimeError,
+    avant toute modification, si SQLite ne convient pas au schéma.
+    """
+    verifier_fonctions_sql(connexion)
+    journal = journal or logger.info
+    niveau_isolation = connexion.isolation_level
+    connexion.isolation_level = None
+    appliquees = []
+    try:
+        for migration in migrations_en_attente(connexion, repertoire, cible):
+            debut = time.perf_counter()
+            connexion.execute("BEGIN IMMEDIATE")
+            try:
+                if migration.version in versions_appliquees(connexion):
+                    connexion.execute("ROLLBACK")
+                    continue
+                migration.appliquer(connexion)
+                duree_ms = (time.perf_counter() - debut) * 1000
+                connexion.execute(
+                    "INSERT INTO schema_version (version, nom, duree_ms) VALUES (?, ?, ?)",
+                    (migration.version, migration.nom, duree_ms),
+                )
+                connexion.execute("COMMIT")
+            except Exception:
+                connexion.execute("ROLLBACK")
+                logger.error(f"Échec de la migration {migration.version:04d}_{migration.nom}")
+                raise
+            appliquees.append(migration)
+            journal(f"{migration.version:04d}_{migration.nom} appliquée en {duree_ms:.1f} ms")
+    finally:
+        connexion.isolation_level = niveau_isolation
+    return appliquees
+
+
+def marquer_migrations_appliquees(connexion, repertoire=None):
+    """Marque toutes les migrations comme appliquées (base créée par SCHEMA_SQL)."""
+    connexion.execute(TABLE_VERSIONS_SQL)
+    connexion.executemany(
+        "INSERT OR IGNORE INTO schema_version (version, nom, duree_ms) VALUES (?, ?, 0)",
+        [(migration.version, migration.nom) for migration in lister_migrations(repertoire)],
+    )
+    connexion.commit()
+
+
+def base_initialisee(connexion):
+    """Indique si la base contient déjà le schéma du blog."""
+    return (
+        connexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles'"
+        ).fetchone()
+        is not None
+    )
+
+
+# =============================================================================
+# INITIALISATION
+# =============================================================================
+
+
+def supprimer_tables(connexion):
+    """Supprime toutes les tables du schéma, données dérivées comprises."""
+    from blog.db_schema import TABLES_ANCIENNES, TABLES_SCHEMA
+
+    for table in TABLES_SCHEMA + TABLES_ANCIENNES:
+        connexion.execute(f"DROP TABLE IF EXISTS {table}")
+    connexion.commit()
+
+
+def initialiser_base(connexion, reset=False, demo=False, journal=None):
+    """
+    Crée ou met à jour le schéma, puis insère les données initiales.
+
+    Chemin commun des commandes init_db et initialiser_db. Une base
+    existante reçoit les migrations en attente; avec ``reset``, toutes
+    les tables du schéma (compteurs, versions, index plein texte et
+    historiques compris) sont d'abord supprimées et la base recréée par
+    ``SCHEMA_SQL``. Retourne le mode de journal de la base.
+    """
+    from blog.db_connexion import activer_journal_mode
+    from blog.db_schema import DONNEES_DEMO_SQL, DONNEES_INITIALES_SQL, SCHEMA_SQL
+
+    journal = journal or logger.info
+    verifier_fonctions_sql(connexion)
+
+    if reset:
+        journal("Suppression des tables existantes...")
+        supprimer_tables(connexion)
+
+    if not reset and base_initialisee(connexion):
+        # Base existante: mise à jour sans perte de données
+        journal("Application des migrations du schéma...")
+        appliquer_migrations(connexion, journal=lambda ligne: journal(f"  {ligne}"))
+    else:
+        journal("Création du schéma...")
+        connexion.executescript(SCHEMA_SQL)
+        connexion.commit()
+        marquer_migrations_appliquees(connexion)
+
+    journal("Insertion des données initiales...")
+    connexion.executescript(DONNEES_INITIALES_SQL)
+    if demo:
+        journal("Insertion des données de démonstration...")
+        connexion.executescript(DONNEES_DEMO_SQL)
+    connexion.commit()
+
+    # Mode de journal du profil (WAL), enregistré dans le fichier
+    return activer_journal_mode(connexion)
@@ -8,10 +8,27 @@ IMPORTANT: Ce projet n'utilise PAS l'ORM Django.
 Toutes les opérations sont effectuées en SQL brut.
 """
 
-import sqlite3
-from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+import base64
+import json
 import logging
+import re
+import sqlite3
+
+from blog.db_connexion import (
+    obtenir_pool,
+    obtenir_unite_courante,
+    unite_de_travail,
+)
+from blog.db_mappers import FORME_DICT, obtenir_mappeur
+from blog.cache import (
+    DOMAINE_CATALOGUE,
+    DOMAINE_CONFIGURATION,
+    DOMAINE_STATISTIQUES,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,40 +37,486 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 
 
-def obtenir_connexion():
-    """Obtient une connexion à la base de données."""
-    return sqlite3.connect(settings.DATABASES["default"]["NAME"])
-
-
-def executer_requete(
-    requete, parametres=None, fetchone=False, fetchall=False, commit=False
-):
-    """Exécute une requête SQL de manière sécurisée."""
-    connexion = obtenir_connexion()
+def _executer(connexion, requete, parametres, fetchone, fetchall, mappeur=None):
+    """Exécute une requête sur une connexion et retourne son résultat."""
     curseur = connexion.cursor()
-
     try:
         if parametres:
             curseur.execute(requete, parametres)
         else:
             curseur.execute(requete)
 
-        if commit:
-            connexion.commit()
-
         if fetchone:
-            return curseur.fetchone()
+            ligne = curseur.fetchone()
+            if mappeur is None or ligne is None:
+                return ligne
+            return mappeur(curseur.description)(ligne)
         elif fetchall:
-            return curseur.fetchall()
+            lignes = curseur.fetchall()
+            if mappeur is None:
+                return lignes
+            convertir = mappeur(curseur.description)
+            return [convertir(ligne) for ligne in lignes]
         else:
             return curseur.lastrowid
-
-    except Exception as e:
-        logger.error(f"Erreur SQL: {e}")
-        connexion.rollback()
-        raise
     finally:
-        connexion.close()
+        curseur.close()
+
+
+def executer_requete(
+    requete,
+    parametres=None,
+    fetchone=False,
+    fetchall=False,
+    commit=False,
+    mappeur=None,
+):
+    """
+    Exécute une requête SQL de manière sécurisée.
+
+    Dans une unité de travail (requête HTTP, voir ``blog.middleware``),
+    la connexion de l'unité est utilisée et ``commit`` est différé:
+    la transaction est validée une seule fois à la fin de l'unité.
+
+    ``mappeur`` reçoit ``cursor.description`` et retourne la fonction
+    de conversion des lignes (voir ``blog.db_mappers``).
+    """
+    unite = obtenir_unite_courante()
+    if unite is not None:
+        try:
+            return _executer(
+                unite.obtenir_connexion(),
+                requete,
+                parametres,
+                fetchone,
+                fetchall,
+                mappeur,
+            )
+        except Exception as e:
+            logger.error(f"Erreur SQL: {e}")
+            raise
+
+    with obtenir_pool().connexion() as connexion:
+        try:
+            resultat = _executer(
+                connexion, requete, parametres, fetchone, fetchall, mappeur
+            )
+            if commit:
+                connexion.commit()
+            return resultat
+
+        except Exception as e:
+            logger.error(f"Erreur SQL: {e}")
+            connexion.rollback()
+            raise
+
+
+def executer_lot(requete, liste_parametres, commit=False):
+    """
+    Exécute une même requête pour chaque jeu de paramètres (executemany).
+
+    Toutes les lignes sont écrites dans une seule transaction; dans une
+    unité de travail, la validation est différée comme pour
+    ``executer_requete``.
+    """
+    liste_parametres = list(liste_parametres)
+    if not liste_parametres:
+        return 0
+
+    dans_une_unite = obtenir_unite_courante() is not None
+    with unite_de_travail() as unite:
+        if not commit and not dans_une_unite:
+            unite.demander_annulation()
+
+        curseur = unite.obtenir_connexion().cursor()
+        try:
+            curseur.executemany(requete, liste_parametres)
+            return curseur.rowcount
+        except Exception as e:
+            logger.error(f"Erreur SQL: {e}")
+            raise
+        finally:
+            curseur.close()
+
+
+# =============================================================================
+# LECTURE
+# =============================================================================
+
+
+def _fabrique_mappeur(forme, defauts):
+    def mappeur(description):
+        return obtenir_mappeur(description, forme, defauts)
+
+    return mappeur
+
+
+def lire_lignes(requete, parametres=None, forme=FORME_DICT, defauts=None):
+    """
+    Exécute une lecture et retourne une liste de dictionnaires.
+
+    Les clés sont les noms de colonnes de la requête; ``forme`` et
+    ``defauts`` sont décrits dans ``blog.db_mappers``.
+    """
+    return executer_requete(
+        requete,
+        parametres,
+        fetchall=True,
+        mappeur=_fabrique_mappeur(forme, defauts),
+    )
+
+
+def lire_ligne(requete, parametres=None, forme=FORME_DICT, defauts=None):
+    """Exécute une lecture et retourne la première ligne, ou None."""
+    return executer_requete(
+        requete,
+        parametres,
+        fetchone=True,
+        mappeur=_fabrique_mappeur(forme, defauts),
+    )
+
+
+# =============================================================================
+# PROJECTIONS
+# =============================================================================
+
+# Colonnes lues selon l'usage: "carte" pour les listes publiques (sans le
+# corps du texte), "admin" pour les tableaux de l'administration et
+# "detail" pour la ligne complète. Sans extrait, la carte reçoit le début
+# du contenu (les templates l'affichent tronqué à 20 mots).
+PROJECTIONS_ARTICLES = {
+    "carte": """
+        a.id, a.titre, a.slug,
+        COALESCE(NULLIF(a.extrait, ''), SUBSTR(a.contenu, 1, 1000)) AS extrait,
+        a.type_article, a.image_url, a.auteur, a.temps_lecture,
+        a.est_vedette, a.est_populaire, a.est_nouveau, a.ordre_affichage,
+        a.date_publication, a.date_creation, a.categories_noms
+    """,
+    "admin": """
+        a.id, a.titre, a.slug, a.type_article, a.image_url, a.auteur,
+        a.temps_lecture, a.est_vedette, a.est_populaire, a.est_nouveau,
+        a.est_publie, a.ordre_affichage, a.date_publication, a.date_creation,
+        a.date_modification, a.categories_noms
+    """,
+    "detail": "a.*",
+}
+
+PROJECTIONS_LIVRES = {
+    "carte": """
+        l.id, l.titre, l.slug, l.extrait, l.auteur, l.annee_publication,
+        l.nombre_pages, l.langue, l.image_couverture, l.prix, l.devise,
+        l.est_gratuit, l.est_vedette, l.est_nouveau, l.ordre_affichage,
+        l.nombre_telechargements, l.date_creation, l.categories_noms
+    """,
+    "admin": """
+        l.id, l.titre, l.slug, l.auteur, l.image_couverture, l.prix, l.devise,
+        l.est_gratuit, l.est_vedette, l.est_nouveau, l.est_publie,
+        l.ordre_affichage, l.nombre_telechargements, l.date_creation,
+        l.date_modification, l.categories_noms
+    """,
+    "detail": "l.*",
+}
+
+
+def _colonnes(projections, projection):
+    """Retourne la liste de colonnes SQL d'une projection."""
+    try:
+        return projections[projection]
+    except KeyError:
+        raise ValueError(
+            f"Projection inconnue: {projection} "
+            f"(attendu: {', '.join(sorted(projections))})"
+        ) from None
+
+
+# =============================================================================
+# PAGINATION PAR CURSEUR
+# =============================================================================
+
+# Ordre des listes: (expression SQL, sens, colonne du résultat). L'id
+# termine chaque ordre pour que la position d'une ligne soit unique.
+ORDRE_ARTICLES = (
+    ("a.ordre_affichage", "ASC", "ordre_affichage"),
+    ("a.date_creation", "DESC", "date_creation"),
+    ("a.id", "DESC", "id"),
+)
+ORDRE_LIVRES = (
+    ("l.ordre_affichage", "ASC", "ordre_affichage"),
+    ("l.date_creation", "DESC", "date_creation"),
+    ("l.id", "DESC", "id"),
+)
+
+
+class PageCurseur:
+    """
+    Page d'une liste paginée par curseur, itérable comme une liste.
+
+    ``suivant`` et ``precedent`` sont les curseurs des pages voisines
+    (None au bout de la liste). ``numero`` et ``total`` sont indicatifs:
+    ils servent seulement à l'affichage « Page N sur M ».
+    """
+
+    def __init__(self, elements, suivant=None, precedent=None, par_page=12):
+        self.elements = elements
+        self.suivant = suivant
+        self.precedent = precedent
+        self.par_page = par_page
+        self.numero = 1
+        self.total = len(elements)
+
+    def __iter__(self):
+        return iter(self.elements)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __getitem__(self, index):
+        return self.elements[index]
+
+    @property
+    def nombre_pages(self):
+        return max(1, -(-self.total // self.par_page))
+
+
+def encoder_curseur(valeurs):
+    """Encode la position d'une ligne en jeton opaque pour les URL."""
+    brut = json.dumps(list(valeurs), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(brut).decode().rstrip("=")
+
+
+def decoder_curseur(curseur, longueur):
+    """Décode un jeton de ``encoder_curseur`` (None s'il est invalide)."""
+    if not curseur:
+        return None
+    try:
+        brut = base64.urlsafe_b64decode(curseur + "=" * (-len(curseur) % 4))
+        valeurs = json.loads(brut)
+    except (ValueError, TypeError):
+        logger.warning(f"Curseur de pagination invalide: {curseur!r}")
+        return None
+    if not isinstance(valeurs, list) or len(valeurs) != longueur:
+        return None
+    return valeurs
+
+
+def _tri(ordre, inverse=False):
+    """Clause ORDER BY de ``ordre`` (sens inversés si ``inverse``)."""
+    return ", ".join(
+        f"{expression} {sens if not inverse else ('DESC' if sens == 'ASC' else 'ASC')}"
+        for expression, sens, _ in ordre
+    )
+
+
+def _conditions_curseur(ordre, valeurs, inverse=False):
+    """
+    Conditions SQL des lignes situées après ``valeurs`` dans ``ordre``
+    (avant si ``inverse``), une par colonne du tri: égalité sur les
+    colonnes précédentes, inégalité stricte sur la colonne. Chacune est
+    un intervalle d'index, quels que soient les sens de tri.
+    """
+    conditions = []
+    for position, (expression, sens, _) in enumerate(ordre):
+        operateur = ">" if (sens == "ASC") != inverse else "<"
+        egalites = [f"{precedente} = ?" for precedente, _, _ in ordre[:position]]
+        conditions.append(
+            (
+                " AND ".join(egalites + [f"{expression} {operateur} ?"]),
+                list(valeurs[: position + 1]),
+            )
+        )
+    return conditions
+
+
+def _paginer(selection, parametres, habillage, ordre, par_page, apres=None, avant=None):
+    """
+    Lit une page après le curseur ``apres`` ou avant le curseur ``avant``.
+
+    ``selection`` (SELECT des colonnes de l'ordre ... WHERE ..., sans
+    ORDER BY) choisit les lignes de la page dans l'index de l'ordre. Avec
+    un curseur, elle est lue en une branche par condition de
+    ``_conditions_curseur``, chacune triée et limitée à une page: chaque
+    branche parcourt un intervalle de l'index de l'ordre de liste, et le
+    coût ne dépend pas de la profondeur de la page. ``habillage`` lit les
+    colonnes de la page autour de ``{page}`` et se termine par
+    ``ORDER BY {tri}``.
+    """
+    valeurs = decoder_curseur(avant or apres, len(ordre))
+    inverse = bool(avant) and valeurs is not None
+    alias = ordre[0][0].split(".")[0]
+    tri = _tri(ordre, inverse)
+    # Une ligne d'avance indique s'il existe une page suivante
+    limite = par_page + 1
+
+    if valeurs is None:
+        page = f"{selection} ORDER BY {tri} LIMIT ?"
+        parametres_page = [*parametres, limite]
+    else:
+        branches = []
+        parametres_page = []
+        for condition, parametres_condition in _conditions_curseur(
+            ordre, valeurs, inverse
+        ):
+            branches.append(
+                f"SELECT * FROM ({selection} AND {condition} ORDER BY {tri} LIMIT ?)"
+            )
+            parametres_page.extend([*parametres, *parametres_condition, limite])
+        page = (
+            f"SELECT * FROM ({' UNION ALL '.join(branches)}) {alias}"
+            f" ORDER BY {tri} LIMIT ?"
+        )
+        parametres_page.append(limite)
+
+    requete = habillage.format(page=page, tri=tri)
+    lignes = lire_lignes(requete, parametres_page)
+    encore = len(lignes) > par_page
+    lignes = lignes[:par_page]
+    if inverse:
+        lignes.reverse()
+
+    def curseur(ligne):
+        return encoder_curseur(ligne[colonne] for _, _, colonne in ordre)
+
+    if not lignes:
+        return PageCurseur([], par_page=par_page)
+    if inverse:
+        suivant, precedent = curseur(lignes[-1]), encore and curseur(lignes[0])
+    else:
+        suivant = encore and curseur(lignes[-1])
+        precedent = valeurs is not None and curseur(lignes[0])
+    return PageCurseur(
+        lignes, suivant or None, precedent or None, par_page=par_page
+    )
+
+
+# =============================================================================
+# VERSIONS DES CONTENUS
+# =============================================================================
+
+
+def obtenir_versions_contenu(domaines):
+    """Retourne les numéros de version des domaines (0 s'ils sont absents)."""
+    marqueurs = ", ".join("?" * len(domaines))
+    requete = f"SELECT cle, version FROM versions_contenu WHERE cle IN ({marqueurs})"
+    versions = dict(executer_requete(requete, tuple(domaines), fetchall=True))
+    return tuple(versions.get(domaine, 0) for domaine in domaines)
+
+
+def incrementer_version_contenu(domaine=DOMAINE_CATALOGUE):
+    """
+    Incrémente la version d'un domaine pour invalider les caches
+    (voir ``blog.cache``). À appeler dans la transaction de l'écriture.
+    """
+    requete = """
+        INSERT INTO versions_contenu (cle, version) VALUES (?, 1)
+        ON CONFLICT(cle) DO UPDATE SET
+            version = version + 1,
+            date_modification = CURRENT_TIMESTAMP
+    """
+    executer_requete(requete, (domaine,), commit=True)
+
+
+# =============================================================================
+# RECHERCHE PLEIN TEXTE
+# =============================================================================
+
+# Poids bm25 par colonne de l'index (titre d'abord)
+POIDS_BM25_ARTICLES = "10.0, 5.0, 1.0"  # titre, extrait, contenu
+POIDS_BM25_LIVRES = "10.0, 5.0, 1.0"  # titre, auteur, description
+
+# Extraits de résultats: nombre de mots et marqueurs des termes trouvés
+# (caractères à usage privé, remplacés par <mark> après échappement HTML)
+MOTS_EXTRAIT = 24
+MARQUE_DEBUT = "\ue000"
+MARQUE_FIN = "\ue001"
+
+
+def construire_expression_fts(terme):
+    """
+    Transforme la saisie de l'utilisateur en expression FTS5.
+
+    Chaque mot devient un préfixe entre guillemets (``"educ"*``): la
+    syntaxe FTS5 saisie par l'utilisateur n'est jamais interprétée et
+    les formes fléchies (pluriels, ...) sont trouvées. Tous les mots
+    sont requis. Retourne None si la saisie ne contient aucun mot.
+    """
+    mots = re.findall(r"\w+", terme or "")
+    if not mots:
+        return None
+    return " ".join(f'"{mot}"*' for mot in mots)
+
+
+def index_recherche_absent(erreur):
+    """
+    Indique si ``erreur`` signale un index plein texte absent (base non
+    mise à jour, SQLite sans FTS5): seul ce cas revient au LIKE. Une base
+    verrouillée, une erreur d'E/S ou de syntaxe FTS5 est propagée.
+    """
+    message = str(erreur)
+    return "no such module" in message or (
+        "no such table" in message and "_fts" in message
+    )
+
+
+def surligner_extrait(extrait):
+    """
+    Retourne l'extrait en HTML sûr, termes trouvés entre ``<mark>``.
+
+    Le texte est échappé morceau par morceau; un marqueur présent dans le
+    contenu lui-même et sans pendant est ignoré.
+    """
+    morceaux = []
+    ouvert = False
+    for morceau in re.split(f"([{MARQUE_DEBUT}{MARQUE_FIN}])", extrait or ""):
+        if morceau == MARQUE_DEBUT:
+            if not ouvert:
+                morceaux.append("<mark>")
+                ouvert = True
+        elif morceau == MARQUE_FIN:
+            if ouvert:
+                morceaux.append("</mark>")
+                ouvert = False
+        else:
+            morceaux.append(escape(morceau))
+    if ouvert:
+        morceaux.append("</mark>")
+    return mark_safe("".join(morceaux))
+
+
+def reconstruire_index_recherche():
+    """
+    Reconstruit les index plein texte depuis les tables de contenu
+    (commande reconstruire_recherche, après une désynchronisation).
+    """
+    with unite_de_travail():
+        executer_requete("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+        executer_requete("INSERT INTO livres_fts(livres_fts) VALUES ('rebuild')")
+
+
+def obtenir_entrees_autocompletion():
+    """
+    Retourne les contenus publiés indexés par l'autocomplétion
+    (``blog.autocompletion``), du plus récent au plus ancien: colonnes
+    affichées et catégories seulement.
+    """
+    articles = lire_lignes(
+        """
+        SELECT a.id, a.titre, a.slug, a.type_article, a.image_url, a.auteur,
+               a.categories_noms
+        FROM articles a
+        WHERE a.est_publie = 1
+        ORDER BY a.date_creation DESC
+        """
+    )
+    livres = lire_lignes(
+        """
+        SELECT l.id, l.titre, l.slug, l.image_couverture, l.auteur, l.prix,
+               l.est_gratuit, l.categories_noms
+        FROM livres l
+        WHERE l.est_publie = 1
+        ORDER BY l.date_creation DESC
+        """
+    )
+    return articles, livres
 
 
 # =============================================================================
@@ -62,412 +525,293 @@ def executer_requete(
 
 
 def obtenir_tous_articles(
-    limite=None, type_article=None, est_vedette=None, est_publie=None
+    limite=None,
+    type_article=None,
+    est_vedette=None,
+    est_publie=None,
+    projection="carte",
 ):
-    """Récupère tous les articles avec filtres optionnels."""
-    requete = """
-        SELECT a.*, GROUP_CONCAT(c.nom) as categories_noms
-        FROM articles a
-        LEFT JOIN article_categories ac ON a.id = ac.article_id
-        LEFT JOIN categories c ON ac.categorie_id = c.id
-        WHERE 1=1
     """
-    parametres = []
+    Récupère tous les articles avec filtres optionnels.
+
+    ``projection`` choisit les colonnes lues (voir PROJECTIONS_ARTICLES).
+    """
+    conditions, parametres = _filtres_articles(
+        type_article, est_publie, est_vedette=est_vedette
+    )
+    tri = _tri(ORDRE_ARTICLES)
+    page = f"SELECT a.id FROM articles a WHERE {conditions} ORDER BY {tri} LIMIT ?"
+    requete = _habillage_articles(projection).format(page=page, tri=tri)
+    return lire_lignes(requete, [*parametres, limite or -1])
+
 
+def _filtres_articles(
+    type_article=None, est_publie=None, slug_categorie=None, est_vedette=None
+):
+    """Conditions SQL et paramètres communs aux listes d'articles."""
+    conditions = ["1=1"]
+    parametres = []
     if type_article:
-        requete += " AND a.type_article = ?"
+        conditions.append("a.type_article = ?")
         parametres.append(type_article)
+    for colonne, valeur in (
+        ("a.est_publie", est_publie),
+        ("a.est_vedette", est_vedette),
+    ):
+        if valeur is not None:
+            conditions.append(f"{colonne} = ?")
+            parametres.append(valeur)
+    if slug_categorie:
+        conditions.append(
+            """a.id IN (
+                SELECT fc.article_id FROM article_categories fc
+                JOIN categories f ON fc.categorie_id = f.id
+                WHERE f.slug = ?
+            )"""
+        )
+        parametres.append(slug_categorie)
+    return " AND ".join(conditions), parametres
 
-    if est_vedette is not None:
-        requete += " AND a.est_vedette = ?"
-        parametres.append(est_vedette)
-
-    if est_publie is not None:
-        requete += " AND a.est_publie = ?"
-        parametres.append(est_publie)
 
-    requete += " GROUP BY a.id ORDER BY a.ordre_affichage ASC, a.date_creation DESC"
+def _habillage_articles(projection, colonnes_page=""):
+    """
+    Requête qui complète une page d'ids d'articles (``{page}``, triée et
+    limitée dans un index) avec les colonnes de ``projection``: seules
+    les lignes de la page sont lues dans la table.
+    """
+    return f"""
+        SELECT {_colonnes(PROJECTIONS_ARTICLES, projection)}{colonnes_page}
+        FROM ({{page}}) p
+        JOIN articles a ON a.id = p.id
+        ORDER BY {{tri}}
+    """
 
-    if limite:
-        requete += " LIMIT ?"
-        parametres.append(limite)
 
-    resultats = executer_requete(requete, parametres, fetchall=True)
+def paginer_articles(
+    par_page=12,
+    apres=None,
+    avant=None,
+    type_article=None,
+    est_publie=None,
+    slug_categorie=None,
+    projection="carte",
+):
+    """
+    Retourne une page d'articles (``PageCurseur``) dans l'ordre des
+    listes, après le curseur ``apres`` ou avant le curseur ``avant``.
+    """
+    conditions, parametres = _filtres_articles(type_article, est_publie, slug_categorie)
+    selection = (
+        "SELECT a.id, a.ordre_affichage, a.date_creation"
+        f" FROM articles a WHERE {conditions}"
+    )
+    return _paginer(
+        selection,
+        parametres,
+        _habillage_articles(projection),
+        ORDRE_ARTICLES,
+        par_page,
+        apres,
+        avant,
+    )
 
-    articles = []
-    for row in resultats:
-        article = {
-            "id": row[0],
-            "titre": row[1],
-            "slug": row[2],
-            "contenu": row[3],
-            "extrait": row[4],
-            "type_article": row[5],
-            "image_url": row[6],
-            "banniere_url": row[7],
-            "auteur": row[8],
-            "temps_lecture": row[9],
-            "est_vedette": row[10],
-            "est_populaire": row[11],
-            "est_nouveau": row[12],
-            "est_publie": row[13],
-            "ordre_affichage": row[14],
-            "meta_keywords": row[15],
-            "meta_description": row[16],
-            "date_publication": row[17],
-            "date_creation": row[18],
-            "date_modification": row[19],
-            "categories_noms": row[20] or "",
-        }
-        articles.append(article)
 
-    return articles
+def compter_articles(type_article=None, est_publie=None, slug_categorie=None):
+    """Compte les articles d'une liste (mêmes filtres que paginer_articles)."""
+    conditions, parametres = _filtres_articles(type_article, est_publie, slug_categorie)
+    requete = f"SELECT COUNT(*) FROM articles a WHERE {conditions}"
+    return executer_requete(requete, parametres, fetchone=True)[0]
 
 
 def obtenir_article_par_id(article_id):
     """Recupere un article par son ID."""
     requete = """
-        SELECT a.*, GROUP_CONCAT(c.nom) as categories_noms, GROUP_CONCAT(c.id) as categories_ids
-        FROM articles a
-        LEFT JOIN article_categories ac ON a.id = ac.article_id
-        LEFT JOIN categories c ON ac.categorie_id = c.id
+        SELECT a.* FROM articles a
         WHERE a.id = ?
-        GROUP BY a.id
     """
-    row = executer_requete(requete, (article_id,), fetchone=True)
-
-    if not row:
-        return None
-
-    return {
-        "id": row[0],
-        "titre": row[1],
-        "slug": row[2],
-        "contenu": row[3],
-        "extrait": row[4],
-        "type_article": row[5],
-        "image_url": row[6],
-        "banniere_url": row[7],
-        "auteur": row[8],
-        "temps_lecture": row[9],
-        "est_vedette": row[10],
-        "est_populaire": row[11],
-        "est_nouveau": row[12],
-        "est_publie": row[13],
-        "ordre_affichage": row[14],
-        "meta_keywords": row[15],
-        "meta_description": row[16],
-        "date_publication": row[17],
-        "date_creation": row[18],
-        "date_modification": row[19],
-        "categories_noms": row[20] or "",
-        "categories_ids": row[21] or "",
-    }
+    return lire_ligne(requete, (article_id,))
 
 
 def obtenir_article_par_slug(slug):
     """Recupere un article par son slug."""
     requete = """
-        SELECT a.*, GROUP_CONCAT(c.nom) as categories_noms, GROUP_CONCAT(c.id) as categories_ids
-        FROM articles a
-        LEFT JOIN article_categories ac ON a.id = ac.article_id
-        LEFT JOIN categories c ON ac.categorie_id = c.id
+        SELECT a.* FROM articles a
         WHERE a.slug = ? AND a.est_publie = 1
-        GROUP BY a.id
     """
-    row = executer_requete(requete, (slug,), fetchone=True)
+    return lire_ligne(requete, (slug,))
 
-    if not row:
-        return None
-
-    return {
-        "id": row[0],
-        "titre": row[1],
-        "slug": row[2],
-        "contenu": row[3],
-        "extrait": row[4],
-        "type_article": row[5],
-        "image_url": row[6],
-        "banniere_url": row[7],
-        "auteur": row[8],
-        "temps_lecture": row[9],
-        "est_vedette": row[10],
-        "est_populaire": row[11],
-        "est_nouveau": row[12],
-        "est_publie": row[13],
-        "ordre_affichage": row[14],
-        "meta_keywords": row[15],
-        "meta_description": row[16],
-        "date_publication": row[17],
-        "date_creation": row[18],
-        "date_modification": row[19],
-        "categories_noms": row[20] or "",
-        "categories_ids": row[21] or "",
-    }
 
-
-def obtenir_articles_vedettes(limite=6):
+def obtenir_articles_vedettes(limite=6, projection="carte"):
     """Recupere les articles vedettes."""
-    return obtenir_tous_articles(limite=limite, est_vedette=1, est_publie=1)
-
-
-def obtenir_articles_populaires(limite=6):
-    """Recupere les articles populaires."""
-    return obtenir_tous_articles(limite=limite, est_publie=1)
+    return obtenir_tous_articles(
+        limite=limite, est_vedette=1, est_publie=1, projection=projection
+    )
 
 
-def obtenir_articles_plus_lus(limite=6):
-    """Recupere les articles les plus lus."""
-    requete = """
-        SELECT a.*, GROUP_CONCAT(c.nom) as categories_noms,
-               COALESCE(SUM(sv.nombre_vues), 0) as total_vues
-        FROM articles a
-        LEFT JOIN article_categories ac ON a.id = ac.article_id
-        LEFT JOIN categories c ON ac.categorie_id = c.id
-        LEFT JOIN statistiques_vues sv ON a.id = sv.article_id
-        WHERE a.est_publie = 1
-        GROUP BY a.id
-        ORDER BY total_vues DESC, a.date_creation DESC
-        LIMIT ?
+def obtenir_articles_populaires(limite=6, projection="carte"):
     """
-    resultats = executer_requete(requete, (limite,), fetchall=True)
+    Recupere les articles populaires (vues récentes, voir ``score_tendance``).
 
-    articles = []
-    for row in resultats:
-        article = {
-            "id": row[0],
-            "titre": row[1],
-            "slug": row[2],
-            "contenu": row[3],
-            "extrait": row[4],
-            "type_article": row[5],
-            "image_url": row[6],
-            "banniere_url": row[7],
-            "auteur": row[8],
-            "temps_lecture": row[9],
-            "est_vedette": row[10],
-            "est_populaire": row[11],
-            "est_nouveau": row[12],
-            "est_publie": row[13],
-            "ordre_affichage": row[14],
-            "meta_keywords": row[15],
-            "meta_description": row[16],
-            "date_publication": row[17],
-            "date_creation": row[18],
-            "date_modification": row[19],
-            "categories_noms": row[20] or "",
-        }
-        articles.append(article)
+    La page est lue dans l'index idx_articles_tendance; sans vue, l'ordre
+    est celui des derniers articles.
+    """
+    tri = "a.score_tendance DESC, a.date_creation DESC, a.id DESC"
+    page = f"SELECT a.id FROM articles a WHERE a.est_publie = 1 ORDER BY {tri} LIMIT ?"
+    requete = _habillage_articles(projection).format(page=page, tri=tri)
+    return lire_lignes(requete, (limite,))
 
-    return articles
 
+def obtenir_articles_plus_lus(limite=6, projection="carte"):
+    """
+    Recupere les articles les plus lus.
 
-def obtenir_derniers_articles(limite=6):
-    """Recupere les derniers articles publies."""
-    requete = """
-        SELECT a.*, GROUP_CONCAT(c.nom) as categories_noms
-        FROM articles a
-        LEFT JOIN article_categories ac ON a.id = ac.article_id
-        LEFT JOIN categories c ON ac.categorie_id = c.id
-        WHERE a.est_publie = 1
-        GROUP BY a.id
-        ORDER BY a.date_creation DESC
-        LIMIT ?
+    ``articles.total_vues`` est tenu par les triggers "cumuls_*": la page
+    est lue dans l'index idx_articles_plus_lus, sans parcourir l'historique.
     """
-    resultats = executer_requete(requete, (limite,), fetchall=True)
+    tri = "a.total_vues DESC, a.date_creation DESC, a.id DESC"
+    page = f"SELECT a.id FROM articles a WHERE a.est_publie = 1 ORDER BY {tri} LIMIT ?"
+    requete = _habillage_articles(projection, ", a.total_vues").format(
+        page=page, tri=tri
+    )
+    return lire_lignes(requete, (limite,))
 
-    articles = []
-    for row in resultats:
-        article = {
-            "id": row[0],
-            "titre": row[1],
-            "slug": row[2],
-            "contenu": row[3],
-            "extrait": row[4],
-            "type_article": row[5],
-            "image_url": row[6],
-            "banniere_url": row[7],
-            "auteur": row[8],
-            "temps_lecture": row[9],
-            "est_vedette": row[10],
-            "est_populaire": row[11],
-            "est_nouveau": row[12],
-            "est_publie": row[13],
-            "ordre_affichage": row[14],
-            "meta_keywords": row[15],
-            "meta_description": row[16],
-            "date_publication": row[17],
-            "date_creation": row[18],
-            "date_modification": row[19],
-            "categories_noms": row[20] or "",
-        }
-        articles.append(article)
 
-    return articles
+def obtenir_derniers_articles(limite=6, projection="carte"):
+    """Recupere les derniers articles publies."""
+    tri = "a.date_creation DESC, a.id DESC"
+    page = f"SELECT a.id FROM articles a WHERE a.est_publie = 1 ORDER BY {tri} LIMIT ?"
+    requete = _habillage_articles(projection).format(page=page, tri=tri)
+    return lire_lignes(requete, (limite,))
 
 
-def rechercher_articles(terme, limite=20):
-    """Recherche des articles par terme."""
-    requete = """
-        SELECT a.*, GROUP_CONCAT(c.nom) as categories_noms
+def rechercher_articles(terme, limite=20, projection="carte"):
+    """
+    Recherche des articles par terme (index plein texte, classement bm25).
+
+    Sans index FTS5 (base non mise à jour), la recherche revient au LIKE.
+    """
+    expression = construire_expression_fts(terme)
+    if expression is None:
+        return []
+
+    requete = f"""
+        SELECT {_colonnes(PROJECTIONS_ARTICLES, projection)}
+        FROM (
+            SELECT articles_fts.rowid AS id,
+                   bm25(articles_fts, {POIDS_BM25_ARTICLES}) AS score
+            FROM articles_fts
+            JOIN articles ON articles.id = articles_fts.rowid
+            WHERE articles_fts MATCH ? AND articles.est_publie = 1
+            ORDER BY score
+            LIMIT ?
+        ) r
+        JOIN articles a ON a.id = r.id
+        ORDER BY r.score, a.date_creation DESC
+    """
+    try:
+        return lire_lignes(requete, (expression, limite))
+    except sqlite3.OperationalError as e:
+        if not index_recherche_absent(e):
+            raise
+        logger.warning(f"Recherche plein texte indisponible ({e}), repli sur LIKE")
+        return _rechercher_articles_like(terme, limite, projection)
+
+
+def _rechercher_articles_like(terme, limite, projection):
+    """Recherche des articles par LIKE (parcours complet de la table)."""
+    requete = f"""
+        SELECT {_colonnes(PROJECTIONS_ARTICLES, projection)}
         FROM articles a
-        LEFT JOIN article_categories ac ON a.id = ac.article_id
-        LEFT JOIN categories c ON ac.categorie_id = c.id
         WHERE a.est_publie = 1
           AND (a.titre LIKE ? OR a.contenu LIKE ? OR a.extrait LIKE ?)
-        GROUP BY a.id
         ORDER BY a.date_creation DESC
         LIMIT ?
     """
     pattern = f"%{terme}%"
-    resultats = executer_requete(
-        requete, (pattern, pattern, pattern, limite), fetchall=True
-    )
+    return lire_lignes(requete, (pattern, pattern, pattern, limite))
 
-    articles = []
-    for row in resultats:
-        article = {
-            "id": row[0],
-            "titre": row[1],
-            "slug": row[2],
-            "contenu": row[3],
-            "extrait": row[4],
-            "type_article": row[5],
-            "image_url": row[6],
-            "banniere_url": row[7],
-            "auteur": row[8],
-            "temps_lecture": row[9],
-            "est_vedette": row[10],
-            "est_populaire": row[11],
-            "est_nouveau": row[12],
-            "est_publie": row[13],
-            "ordre_affichage": row[14],
-            "meta_keywords": row[15],
-            "meta_description": row[16],
-            "date_publication": row[17],
-            "date_creation": row[18],
-            "date_modification": row[19],
-            "categories_noms": row[20] or "",
-        }
-        articles.append(article)
-
-    return articles
 
-
-def obtenir_articles_par_categorie(slug_categorie, limite=50):
+def obtenir_articles_par_categorie(slug_categorie, limite=50, projection="carte"):
     """Recupere les articles d'une categorie."""
-    requete = """
-        SELECT a.*, GROUP_CONCAT(c.nom) as categories_noms
+    requete = f"""
+        SELECT {_colonnes(PROJECTIONS_ARTICLES, projection)}
         FROM articles a
         JOIN article_categories ac ON a.id = ac.article_id
         JOIN categories c ON ac.categorie_id = c.id
         WHERE c.slug = ? AND a.est_publie = 1
-        GROUP BY a.id
         ORDER BY a.ordre_affichage ASC, a.date_creation DESC
         LIMIT ?
     """
-    resultats = executer_requete(requete, (slug_categorie, limite), fetchall=True)
-
-    articles = []
-    for row in resultats:
-        article = {
-            "id": row[0],
-            "titre": row[1],
-            "slug": row[2],
-            "contenu": row[3],
-            "extrait": row[4],
-            "type_article": row[5],
-            "image_url": row[6],
-            "banniere_url": row[7],
-            "auteur": row[8],
-            "temps_lecture": row[9],
-            "est_vedette": row[10],
-            "est_populaire": row[11],
-            "est_nouveau": row[12],
-            "est_publie": row[13],
-            "ordre_affichage": row[14],
-            "meta_keywords": row[15],
-            "meta_description": row[16],
-            "date_publication": row[17],
-            "date_creation": row[18],
-            "date_modification": row[19],
-            "categories_noms": row[20] or "",
-        }
-        articles.append(article)
-
-    return articles
+    return lire_lignes(requete, (slug_categorie, limite))
 
 
 def obtenir_categorie_par_slug(slug):
     """Recupere une categorie par son slug."""
     requete = "SELECT * FROM categories WHERE slug = ? AND est_active = 1"
-    row = executer_requete(requete, (slug,), fetchone=True)
+    return lire_ligne(requete, (slug,))
 
-    if not row:
-        return None
 
-    return {
-        "id": row[0],
-        "nom": row[1],
-        "slug": row[2],
-        "description": row[3],
-        "icone": row[4],
-        "ordre": row[5],
-        "est_active": row[6],
-        "date_creation": row[7],
-        "date_modification": row[8],
-    }
+# Une vue par (contenu, jour): l'UPSERT crée la ligne du jour ou incrémente
+# l'existante en une seule instruction atomique, sans course entre workers.
+REQUETE_VUES_ARTICLE = """
+    INSERT INTO statistiques_vues (article_id, nombre_vues, date_vue)
+    VALUES (?, ?, ?)
+    ON CONFLICT(article_id, date_vue)
+    DO UPDATE SET nombre_vues = nombre_vues + excluded.nombre_vues
+"""
+
+REQUETE_VUES_LIVRE = """
+    INSERT INTO statistiques_vues (livre_id, nombre_vues, date_vue)
+    VALUES (?, ?, ?)
+    ON CONFLICT(livre_id, date_vue)
+    DO UPDATE SET nombre_vues = nombre_vues + excluded.nombre_vues
+"""
 
 
 def incrementer_vues(article_id=None, livre_id=None):
-    """Incremente le compteur de vues pour un article ou un livre."""
+    """
+    Incremente le compteur de vues pour un article ou un livre.
+
+    Si le tampon de vues est actif (settings.BLOG_TAMPON_VUES), la vue
+    est agrégée en mémoire et écrite plus tard en lot: la page de détail
+    ne fait aucune écriture SQL.
+    """
+    from blog.compteurs import obtenir_tampon_vues
+
+    tampon = obtenir_tampon_vues()
+    if tampon is not None:
+        tampon.ajouter(article_id=article_id, livre_id=livre_id)
+        return
+
     from datetime import date
 
     aujourd_hui = date.today().isoformat()
+    verifier_epoque_tendances(aujourd_hui)
 
     if article_id:
-        requete_check = """
-            SELECT id, nombre_vues FROM statistiques_vues
-            WHERE article_id = ? AND date_vue = ?
-        """
-        existing = executer_requete(
-            requete_check, (article_id, aujourd_hui), fetchone=True
+        executer_requete(
+            REQUETE_VUES_ARTICLE, (article_id, 1, aujourd_hui), commit=True
         )
-
-        if existing:
-            requete_update = """
-                UPDATE statistiques_vues SET nombre_vues = nombre_vues + 1
-                WHERE id = ?
-            """
-            executer_requete(requete_update, (existing[0],), commit=True)
-        else:
-            requete_insert = """
-                INSERT INTO statistiques_vues (article_id, nombre_vues, date_vue)
-                VALUES (?, 1, ?)
-            """
-            executer_requete(requete_insert, (article_id, aujourd_hui), commit=True)
-
     elif livre_id:
-        requete_check = """
-            SELECT id, nombre_vues FROM statistiques_vues
-            WHERE livre_id = ? AND date_vue = ?
-        """
-        existing = executer_requete(
-            requete_check, (livre_id, aujourd_hui), fetchone=True
+        executer_requete(
+            REQUETE_VUES_LIVRE, (livre_id, 1, aujourd_hui), commit=True
         )
 
-        if existing:
-            requete_update = """
-                UPDATE statistiques_vues SET nombre_vues = nombre_vues + 1
-                WHERE id = ?
-            """
-            executer_requete(requete_update, (existing[0],), commit=True)
-        else:
-            requete_insert = """
-                INSERT INTO statistiques_vues (livre_id, nombre_vues, date_vue)
-                VALUES (?, 1, ?)
-            """
-            executer_requete(requete_insert, (livre_id, aujourd_hui), commit=True)
+
+def enregistrer_vues_en_lot(vues):
+    """
+    Ajoute des vues agrégées à statistiques_vues en une seule transaction.
+
+    ``vues`` contient des tuples ``(article_id, livre_id, date_vue, nombre)``.
+    """
+    vues_articles = [(a_id, n, jour) for a_id, _, jour, n in vues if a_id]
+    vues_livres = [(l_id, n, jour) for a_id, l_id, jour, n in vues if not a_id]
+
+    with unite_de_travail():
+        if vues:
+            verifier_epoque_tendances(max(jour for _, _, jour, _ in vues))
+        executer_lot(REQUETE_VUES_ARTICLE, vues_articles, commit=True)
+        executer_lot(REQUETE_VUES_LIVRE, vues_livres, commit=True)
 
 
 def creer_article(donnees):
@@ -498,7 +842,10 @@ def creer_article(donnees):
         donnees.get("meta_description"),
         donnees.get("date_publication"),
     )
-    return executer_requete(requete, parametres, commit=True)
+    with unite_de_travail():
+        article_id = executer_requete(requete, parametres, commit=True)
+        incrementer_version_contenu()
+    return article_id
 
 
 def modifier_article(article_id, donnees):
@@ -532,13 +879,17 @@ def modifier_article(article_id, donnees):
         donnees.get("date_publication"),
         article_id,
     )
-    executer_requete(requete, parametres, commit=True)
+    with unite_de_travail():
+        executer_requete(requete, parametres, commit=True)
+        incrementer_version_contenu()
 
 
 def supprimer_article(article_id):
     """Supprime un article."""
     requete = "DELETE FROM articles WHERE id = ?"
-    executer_requete(requete, (article_id,), commit=True)
+    with unite_de_travail():
+        executer_requete(requete, (article_id,), commit=True)
+        incrementer_version_contenu()
 
 
 # =============================================================================
@@ -547,290 +898,195 @@ def supprimer_article(article_id):
 
 
 def obtenir_tous_livres(
-    limite=None, est_gratuit=None, est_vedette=None, est_publie=None
+    limite=None,
+    est_gratuit=None,
+    est_vedette=None,
+    est_publie=None,
+    projection="carte",
 ):
-    """Récupère tous les livres avec filtres optionnels."""
-    requete = """
-        SELECT l.*, GROUP_CONCAT(c.nom) as categories_noms
-        FROM livres l
-        LEFT JOIN livre_categories lc ON l.id = lc.livre_id
-        LEFT JOIN categories c ON lc.categorie_id = c.id
-        WHERE 1=1
     """
-    parametres = []
-
-    if est_gratuit is not None:
-        requete += " AND l.est_gratuit = ?"
-        parametres.append(est_gratuit)
+    Récupère tous les livres avec filtres optionnels.
 
-    if est_vedette is not None:
-        requete += " AND l.est_vedette = ?"
-        parametres.append(est_vedette)
+    ``projection`` choisit les colonnes lues (voir PROJECTIONS_LIVRES).
+    """
+    conditions, parametres = _filtres_livres(
+        est_gratuit, est_publie=est_publie, est_vedette=est_vedette
+    )
+    tri = _tri(ORDRE_LIVRES)
+    page = f"SELECT l.id FROM livres l WHERE {conditions} ORDER BY {tri} LIMIT ?"
+    requete = _habillage_livres(projection).format(page=page, tri=tri)
+    return lire_lignes(requete, [*parametres, limite or -1])
 
-    if est_publie is not None:
-        requete += " AND l.est_publie = ?"
-        parametres.append(est_publie)
 
-    requete += " GROUP BY l.id ORDER BY l.ordre_affichage ASC, l.date_creation DESC"
+def _filtres_livres(est_gratuit=None, est_nouveau=None, est_publie=None, est_vedette=None):
+    """Conditions SQL et paramètres communs aux listes de livres."""
+    conditions = ["1=1"]
+    parametres = []
+    for colonne, valeur in (
+        ("l.est_gratuit", est_gratuit),
+        ("l.est_nouveau", est_nouveau),
+        ("l.est_publie", est_publie),
+        ("l.est_vedette", est_vedette),
+    ):
+        if valeur is not None:
+            conditions.append(f"{colonne} = ?")
+            parametres.append(valeur)
+    return " AND ".join(conditions), parametres
+
+
+def _habillage_livres(projection):
+    """
+    Requête qui complète une page d'ids de livres (``{page}``) avec les
+    colonnes de ``projection``.
+    """
+    return f"""
+        SELECT {_colonnes(PROJECTIONS_LIVRES, projection)}
+        FROM ({{page}}) p
+        JOIN livres l ON l.id = p.id
+        ORDER BY {{tri}}
+    """
 
-    if limite:
-        requete += " LIMIT ?"
-        parametres.append(limite)
 
-    resultats = executer_requete(requete, parametres, fetchall=True)
+def paginer_livres(
+    par_page=12,
+    apres=None,
+    avant=None,
+    est_gratuit=None,
+    est_nouveau=None,
+    est_publie=None,
+    projection="carte",
+):
+    """
+    Retourne une page de livres (``PageCurseur``) dans l'ordre des
+    listes, après le curseur ``apres`` ou avant le curseur ``avant``.
+    """
+    conditions, parametres = _filtres_livres(est_gratuit, est_nouveau, est_publie)
+    selection = (
+        "SELECT l.id, l.ordre_affichage, l.date_creation"
+        f" FROM livres l WHERE {conditions}"
+    )
+    return _paginer(
+        selection,
+        parametres,
+        _habillage_livres(projection),
+        ORDRE_LIVRES,
+        par_page,
+        apres,
+        avant,
+    )
 
-    livres = []
-    for row in resultats:
-        livre = {
-            "id": row[0],
-            "titre": row[1],
-            "slug": row[2],
-            "description": row[3],
-            "extrait": row[4],
-            "auteur": row[5],
-            "co_auteurs": row[6],
-            "isbn": row[7],
-            "editeur": row[8],
-            "annee_publication": row[9],
-            "nombre_pages": row[10],
-            "langue": row[11],
-            "image_couverture": row[12],
-            "fichier_pdf": row[13],
-            "fichier_preview": row[14],
-            "prix": row[15],
-            "devise": row[16],
-            "est_gratuit": row[17],
-            "est_vedette": row[18],
-            "est_nouveau": row[19],
-            "est_publie": row[20],
-            "ordre_affichage": row[21],
-            "nombre_telechargements": row[22],
-            "meta_keywords": row[23],
-            "meta_description": row[24],
-            "date_creation": row[25],
-            "date_modification": row[26],
-            "categories_noms": row[27] or "",
-        }
-        livres.append(livre)
 
-    return livres
+def compter_livres(est_gratuit=None, est_nouveau=None, est_publie=None):
+    """Compte les livres d'une liste (mêmes filtres que paginer_livres)."""
+    conditions, parametres = _filtres_livres(est_gratuit, est_nouveau, est_publie)
+    requete = f"SELECT COUNT(*) FROM livres l WHERE {conditions}"
+    return executer_requete(requete, parametres, fetchone=True)[0]
 
 
 def obtenir_livre_par_id(livre_id):
     """Recupere un livre par son ID."""
     requete = """
-        SELECT l.*, GROUP_CONCAT(c.nom) as categories_noms, GROUP_CONCAT(c.id) as categories_ids
-        FROM livres l
-        LEFT JOIN livre_categories lc ON l.id = lc.livre_id
-        LEFT JOIN categories c ON lc.categorie_id = c.id
+        SELECT l.* FROM livres l
         WHERE l.id = ?
-        GROUP BY l.id
     """
-    row = executer_requete(requete, (livre_id,), fetchone=True)
-
-    if not row:
-        return None
-
-    return {
-        "id": row[0],
-        "titre": row[1],
-        "slug": row[2],
-        "description": row[3],
-        "extrait": row[4],
-        "auteur": row[5],
-        "co_auteurs": row[6],
-        "isbn": row[7],
-        "editeur": row[8],
-        "annee_publication": row[9],
-        "nombre_pages": row[10],
-        "langue": row[11],
-        "image_couverture": row[12],
-        "fichier_pdf": row[13],
-        "fichier_preview": row[14],
-        "prix": row[15],
-        "devise": row[16],
-        "est_gratuit": row[17],
-        "est_vedette": row[18],
-        "est_nouveau": row[19],
-        "est_publie": row[20],
-        "ordre_affichage": row[21],
-        "nombre_telechargements": row[22],
-        "meta_keywords": row[23],
-        "meta_description": row[24],
-        "date_creation": row[25],
-        "date_modification": row[26],
-        "categories_noms": row[27] or "",
-        "categories_ids": row[28] or "",
-    }
+    return lire_ligne(requete, (livre_id,))
 
 
 def obtenir_livre_par_slug(slug):
     """Recupere un livre par son slug."""
     requete = """
-        SELECT l.*, GROUP_CONCAT(c.nom) as categories_noms, GROUP_CONCAT(c.id) as categories_ids
-        FROM livres l
-        LEFT JOIN livre_categories lc ON l.id = lc.livre_id
-        LEFT JOIN categories c ON lc.categorie_id = c.id
+        SELECT l.* FROM livres l
         WHERE l.slug = ? AND l.est_publie = 1
-        GROUP BY l.id
     """
-    row = executer_requete(requete, (slug,), fetchone=True)
+    return lire_ligne(requete, (slug,))
 
-    if not row:
-        return None
 
-    return {
-        "id": row[0],
-        "titre": row[1],
-        "slug": row[2],
-        "description": row[3],
-        "extrait": row[4],
-        "auteur": row[5],
-        "co_auteurs": row[6],
-        "isbn": row[7],
-        "editeur": row[8],
-        "annee_publication": row[9],
-        "nombre_pages": row[10],
-        "langue": row[11],
-        "image_couverture": row[12],
-        "fichier_pdf": row[13],
-        "fichier_preview": row[14],
-        "prix": row[15],
-        "devise": row[16],
-        "est_gratuit": row[17],
-        "est_vedette": row[18],
-        "est_nouveau": row[19],
-        "est_publie": row[20],
-        "ordre_affichage": row[21],
-        "nombre_telechargements": row[22],
-        "meta_keywords": row[23],
-        "meta_description": row[24],
-        "date_creation": row[25],
-        "date_modification": row[26],
-        "categories_noms": row[27] or "",
-        "categories_ids": row[28] or "",
-    }
-
-
-def obtenir_livres_vedettes(limite=4):
+def obtenir_livres_vedettes(limite=4, projection="carte"):
     """Recupere les livres vedettes."""
-    return obtenir_tous_livres(limite=limite, est_vedette=1, est_publie=1)
+    return obtenir_tous_livres(
+        limite=limite, est_vedette=1, est_publie=1, projection=projection
+    )
 
 
-def obtenir_livres_nouveaux(limite=4):
+def obtenir_livres_nouveaux(limite=4, projection="carte"):
     """Recupere les nouveaux livres."""
-    requete = """
-        SELECT l.*, GROUP_CONCAT(c.nom) as categories_noms
-        FROM livres l
-        LEFT JOIN livre_categories lc ON l.id = lc.livre_id
-        LEFT JOIN categories c ON lc.categorie_id = c.id
+    tri = "l.date_creation DESC, l.id DESC"
+    page = f"""
+        SELECT l.id FROM livres l
         WHERE l.est_publie = 1 AND l.est_nouveau = 1
-        GROUP BY l.id
-        ORDER BY l.date_creation DESC
-        LIMIT ?
+        ORDER BY {tri} LIMIT ?
     """
-    resultats = executer_requete(requete, (limite,), fetchall=True)
+    requete = _habillage_livres(projection).format(page=page, tri=tri)
+    return lire_lignes(requete, (limite,))
 
-    livres = []
-    for row in resultats:
-        livre = {
-            "id": row[0],
-            "titre": row[1],
-            "slug": row[2],
-            "description": row[3],
-            "extrait": row[4],
-            "auteur": row[5],
-            "co_auteurs": row[6],
-            "isbn": row[7],
-            "editeur": row[8],
-            "annee_publication": row[9],
-            "nombre_pages": row[10],
-            "langue": row[11],
-            "image_couverture": row[12],
-            "fichier_pdf": row[13],
-            "fichier_preview": row[14],
-            "prix": row[15],
-            "devise": row[16],
-            "est_gratuit": row[17],
-            "est_vedette": row[18],
-            "est_nouveau": row[19],
-            "est_publie": row[20],
-            "ordre_affichage": row[21],
-            "nombre_telechargements": row[22],
-            "meta_keywords": row[23],
-            "meta_description": row[24],
-            "date_creation": row[25],
-            "date_modification": row[26],
-            "categories_noms": row[27] or "",
-        }
-        livres.append(livre)
 
-    return livres
+def obtenir_livres_populaires(limite=4, projection="carte"):
+    """Recupere les livres populaires (vues et téléchargements récents)."""
+    tri = "l.score_tendance DESC, l.date_creation DESC, l.id DESC"
+    page = f"SELECT l.id FROM livres l WHERE l.est_publie = 1 ORDER BY {tri} LIMIT ?"
+    requete = _habillage_livres(projection).format(page=page, tri=tri)
+    return lire_lignes(requete, (limite,))
 
 
-def obtenir_livres_gratuits(limite=50):
+def obtenir_livres_gratuits(limite=50, projection="carte"):
     """Recupere les livres gratuits."""
-    return obtenir_tous_livres(limite=limite, est_gratuit=1, est_publie=1)
+    return obtenir_tous_livres(
+        limite=limite, est_gratuit=1, est_publie=1, projection=projection
+    )
 
 
-def obtenir_livres_payants(limite=50):
+def obtenir_livres_payants(limite=50, projection="carte"):
     """Recupere les livres payants."""
-    return obtenir_tous_livres(limite=limite, est_gratuit=0, est_publie=1)
+    return obtenir_tous_livres(
+        limite=limite, est_gratuit=0, est_publie=1, projection=projection
+    )
 
 
-def rechercher_livres(terme, limite=20):
-    """Recherche des livres par terme."""
-    requete = """
-        SELECT l.*, GROUP_CONCAT(c.nom) as categories_noms
+def rechercher_livres(terme, limite=20, projection="carte"):
+    """
+    Recherche des livres par terme (index plein texte, classement bm25).
+
+    Sans index FTS5 (base non mise à jour), la recherche revient au LIKE.
+    """
+    expression = construire_expression_fts(terme)
+    if expression is None:
+        return []
+
+    requete = f"""
+        SELECT {_colonnes(PROJECTIONS_LIVRES, projection)}
+        FROM (
+            SELECT livres_fts.rowid AS id,
+                   bm25(livres_fts, {POIDS_BM25_LIVRES}) AS score
+            FROM livres_fts
+            JOIN livres ON livres.id = livres_fts.rowid
+            WHERE livres_fts MATCH ? AND livres.est_publie = 1
+            ORDER BY score
+            LIMIT ?
+        ) r
+        JOIN livres l ON l.id = r.id
+        ORDER BY r.score, l.date_creation DESC
+    """
+    try:
+        return lire_lignes(requete, (expression, limite))
+    except sqlite3.OperationalError as e:
+        if not index_recherche_absent(e):
+            raise
+        logger.warning(f"Recherche plein texte indisponible ({e}), repli sur LIKE")
+        return _rechercher_livres_like(terme, limite, projection)
+
+
+def _rechercher_livres_like(terme, limite, projection):
+    """Recherche des livres par LIKE (parcours complet de la table)."""
+    requete = f"""
+        SELECT {_colonnes(PROJECTIONS_LIVRES, projection)}
         FROM livres l
-        LEFT JOIN livre_categories lc ON l.id = lc.livre_id
-        LEFT JOIN categories c ON lc.categorie_id = c.id
         WHERE l.est_publie = 1
           AND (l.titre LIKE ? OR l.description LIKE ? OR l.auteur LIKE ?)
-        GROUP BY l.id
         ORDER BY l.date_creation DESC
         LIMIT ?
     """
     pattern = f"%{terme}%"
-    resultats = executer_requete(
-        requete, (pattern, pattern, pattern, limite), fetchall=True
-    )
-
-    livres = []
-    for row in resultats:
-        livre = {
-            "id": row[0],
-            "titre": row[1],
-            "slug": row[2],
-            "description": row[3],
-            "extrait": row[4],
-            "auteur": row[5],
-            "co_auteurs": row[6],
-            "isbn": row[7],
-            "editeur": row[8],
-            "annee_publication": row[9],
-            "nombre_pages": row[10],
-            "langue": row[11],
-            "image_couverture": row[12],
-            "fichier_pdf": row[13],
-            "fichier_preview": row[14],
-            "prix": row[15],
-            "devise": row[16],
-            "est_gratuit": row[17],
-            "est_vedette": row[18],
-            "est_nouveau": row[19],
-            "est_publie": row[20],
-            "ordre_affichage": row[21],
-            "nombre_telechargements": row[22],
-            "meta_keywords": row[23],
-            "meta_description": row[24],
-            "date_creation": row[25],
-            "date_modification": row[26],
-            "categories_noms": row[27] or "",
-        }
-        livres.append(livre)
-
-    return livres
+    return lire_lignes(requete, (pattern, pattern, pattern, limite))
 
 
 def incrementer_telechargements(livre_id):
@@ -875,7 +1131,10 @@ def creer_livre(donnees):
         donnees.get("meta_keywords"),
         donnees.get("meta_description"),
     )
-    return executer_requete(requete, parametres, commit=True)
+    with unite_de_travail():
+        livre_id = executer_requete(requete, parametres, commit=True)
+        incrementer_version_contenu()
+    return livre_id
 
 
 def modifier_livre(livre_id, donnees):
@@ -916,13 +1175,17 @@ def modifier_livre(livre_id, donnees):
         donnees.get("meta_description"),
         livre_id,
     )
-    executer_requete(requete, parametres, commit=True)
+    with unite_de_travail():
+        executer_requete(requete, parametres, commit=True)
+        incrementer_version_contenu()
 
 
 def supprimer_livre(livre_id):
     """Supprime un livre."""
     requete = "DELETE FROM livres WHERE id = ?"
-    executer_requete(requete, (livre_id,), commit=True)
+    with unite_de_travail():
+        executer_requete(requete, (livre_id,), commit=True)
+        incrementer_version_contenu()
 
 
 # =============================================================================
@@ -950,32 +1213,7 @@ def obtenir_tous_achats(limite=None, statut=None):
         requete += " LIMIT ?"
         parametres.append(limite)
 
-    resultats = executer_requete(requete, parametres, fetchall=True)
-
-    achats = []
-    for row in resultats:
-        achat = {
-            "id": row[0],
-            "livre_id": row[1],
-            "nom_client": row[2],
-            "email_client": row[3],
-            "telephone_client": row[4],
-            "montant": row[5],
-            "devise": row[6],
-            "methode_paiement": row[7],
-            "reference_transaction": row[8],
-            "statut": row[9],
-            "token_telechargement": row[10],
-            "nombre_telechargements": row[11],
-            "max_telechargements": row[12],
-            "expire_le": row[13],
-            "notes": row[14],
-            "date_achat": row[15],
-            "livre_titre": row[16],
-        }
-        achats.append(achat)
-
-    return achats
+    return lire_lignes(requete, parametres)
 
 
 def obtenir_achat_par_id(achat_id):
@@ -986,31 +1224,7 @@ def obtenir_achat_par_id(achat_id):
         JOIN livres l ON a.livre_id = l.id
         WHERE a.id = ?
     """
-    row = executer_requete(requete, (achat_id,), fetchone=True)
-
-    if not row:
-        return None
-
-    return {
-        "id": row[0],
-        "livre_id": row[1],
-        "nom_client": row[2],
-        "email_client": row[3],
-        "telephone_client": row[4],
-        "montant": row[5],
-        "devise": row[6],
-        "methode_paiement": row[7],
-        "reference_transaction": row[8],
-        "statut": row[9],
-        "token_telechargement": row[10],
-        "nombre_telechargements": row[11],
-        "max_telechargements": row[12],
-        "expire_le": row[13],
-        "notes": row[14],
-        "date_achat": row[15],
-        "livre_titre": row[16],
-        "fichier_pdf": row[17],
-    }
+    return lire_ligne(requete, (achat_id,))
 
 
 def modifier_statut_achat(achat_id, nouveau_statut, reference=None):
@@ -1018,26 +1232,29 @@ def modifier_statut_achat(achat_id, nouveau_statut, reference=None):
     import secrets
     from datetime import datetime, timedelta
 
-    if nouveau_statut == "paye":
-        token = secrets.token_urlsafe(32)
-        expire_le = (datetime.now() + timedelta(days=7)).isoformat()
-
-        requete = """
-            UPDATE achats SET
-                statut = ?,
-                reference_transaction = ?,
-                token_telechargement = ?,
-                expire_le = ?
-            WHERE id = ?
-        """
-        executer_requete(
-            requete,
-            (nouveau_statut, reference, token, expire_le, achat_id),
-            commit=True,
-        )
-    else:
-        requete = "UPDATE achats SET statut = ? WHERE id = ?"
-        executer_requete(requete, (nouveau_statut, achat_id), commit=True)
+    with unite_de_travail():
+        if nouveau_statut == "paye":
+            token = secrets.token_urlsafe(32)
+            expire_le = (datetime.now() + timedelta(days=7)).isoformat()
+
+            requete = """
+                UPDATE achats SET
+                    statut = ?,
+                    reference_transaction = ?,
+                    token_telechargement = ?,
+                    expire_le = ?
+                WHERE id = ?
+            """
+            executer_requete(
+                requete,
+                (nouveau_statut, reference, token, expire_le, achat_id),
+                commit=True,
+            )
+        else:
+            requete = "UPDATE achats SET statut = ? WHERE id = ?"
+            executer_requete(requete, (nouveau_statut, achat_id), commit=True)
+
+        incrementer_version_contenu(DOMAINE_STATISTIQUES)
 
 
 def creer_achat(donnees):
@@ -1057,7 +1274,10 @@ def creer_achat(donnees):
         donnees.get("devise", "CFA"),
         donnees.get("statut", "en_attente"),
     )
-    return executer_requete(requete, parametres, commit=True)
+    with unite_de_travail():
+        achat_id = executer_requete(requete, parametres, commit=True)
+        incrementer_version_contenu(DOMAINE_STATISTIQUES)
+    return achat_id
 
 
 def obtenir_achat_par_token(token):
@@ -1068,36 +1288,17 @@ def obtenir_achat_par_token(token):
         JOIN livres l ON a.livre_id = l.id
         WHERE a.token_telechargement = ?
     """
-    row = executer_requete(requete, (token,), fetchone=True)
+    return lire_ligne(requete, (token,))
 
-    if not row:
-        return None
-
-    return {
-        "id": row[0],
-        "livre_id": row[1],
-        "nom_client": row[2],
-        "email_client": row[3],
-        "telephone_client": row[4],
-        "montant": row[5],
-        "devise": row[6],
-        "methode_paiement": row[7],
-        "reference_transaction": row[8],
-        "statut": row[9],
-        "token_telechargement": row[10],
-        "nombre_telechargements": row[11],
-        "max_telechargements": row[12],
-        "expire_le": row[13],
-        "notes": row[14],
-        "date_achat": row[15],
-        "livre_titre": row[16],
-        "fichier_pdf": row[17],
-        "livre_slug": row[18],
-    }
 
+def verifier_achat_valide(token, reprise=False):
+    """
+    Verifie si un achat est valide pour le telechargement.
 
-def verifier_achat_valide(token):
-    """Verifie si un achat est valide pour le telechargement."""
+    ``reprise``: la requête poursuit un téléchargement déjà compté (plage
+    qui ne commence pas au premier octet); elle est acceptée jusqu'au
+    dernier téléchargement autorisé inclus.
+    """
     from datetime import datetime
 
     achat = obtenir_achat_par_token(token)
@@ -1108,7 +1309,10 @@ def verifier_achat_valide(token):
     if achat["statut"] != "paye":
         return None
 
-    if achat["nombre_telechargements"] >= achat["max_telechargements"]:
+    if reprise:
+        if not 0 < achat["nombre_telechargements"] <= achat["max_telechargements"]:
+            return None
+    elif achat["nombre_telechargements"] >= achat["max_telechargements"]:
         return None
 
     if achat["expire_le"]:
@@ -1122,14 +1326,67 @@ def verifier_achat_valide(token):
     return achat
 
 
-def incrementer_telechargement_achat(achat_id):
-    """Incremente le compteur de telechargements d'un achat."""
-    requete = "UPDATE achats SET nombre_telechargements = nombre_telechargements + 1 WHERE id = ?"
-    executer_requete(requete, (achat_id,), commit=True)
+def consommer_telechargement(token, ip=None, user_agent=None):
+    """
+    Consomme un téléchargement d'un achat, en une seule transaction.
+
+    Le statut, l'expiration et le quota sont vérifiés par l'UPDATE
+    conditionnel qui incrémente le compteur: deux requêtes simultanées
+    ne peuvent pas dépasser ``max_telechargements``. Le compteur du
+    livre est écrit dans la même transaction (l'historique peut être
+    différé, voir ``enregistrer_telechargement``).
+    Retourne l'achat (comme ``obtenir_achat_par_token``) ou None.
+    """
+    from datetime import datetime
+
+    requete = """
+        UPDATE achats
+        SET nombre_telechargements = nombre_telechargements + 1
+        WHERE token_telechargement = ?
+          AND statut = 'paye'
+          AND nombre_telechargements < max_telechargements
+          AND COALESCE(julianday(expire_le) > julianday(?), 1)
+        RETURNING id, livre_id
+    """
+    with unite_de_travail():
+        ligne = executer_requete(
+            requete, (token, datetime.now().isoformat()), fetchone=True, commit=True
+        )
+        if ligne is None:
+            return None
+
+        achat_id, livre_id = ligne
+        incrementer_telechargements(livre_id)
+        enregistrer_telechargement(livre_id, achat_id, ip, user_agent)
+        return lire_ligne(
+            """
+            SELECT a.*, l.titre as livre_titre, l.fichier_pdf, l.slug as livre_slug
+            FROM achats a
+            JOIN livres l ON a.livre_id = l.id
+            WHERE a.id = ?
+            """,
+            (achat_id,),
+        )
 
 
 def enregistrer_telechargement(livre_id, achat_id=None, ip=None, user_agent=None):
-    """Enregistre un telechargement dans l'historique."""
+    """
+    Enregistre un telechargement dans l'historique.
+
+    Si le journal différé est actif (settings.BLOG_JOURNAL_TELECHARGEMENTS),
+    l'entrée est écrite plus tard en lot: le téléchargement n'attend pas
+    le verrou d'écriture de la base.
+    """
+    from blog.journal import obtenir_journal_telechargements
+
+    journal = obtenir_journal_telechargements()
+    if journal is not None:
+        journal.ajouter(livre_id, achat_id, ip, user_agent)
+        return
+
+    from datetime import date
+
+    verifier_epoque_tendances(date.today().isoformat())
     requete = """
         INSERT INTO telechargements (livre_id, achat_id, ip_address, user_agent)
         VALUES (?, ?, ?, ?)
@@ -1137,6 +1394,24 @@ def enregistrer_telechargement(livre_id, achat_id=None, ip=None, user_agent=None
     executer_requete(requete, (livre_id, achat_id, ip, user_agent), commit=True)
 
 
+def enregistrer_telechargements_en_lot(telechargements):
+    """
+    Ajoute des entrées à l'historique en une seule transaction.
+
+    ``telechargements`` contient des tuples
+    ``(livre_id, achat_id, ip, user_agent, date_telechargement)``.
+    """
+    requete = """
+        INSERT INTO telechargements
+            (livre_id, achat_id, ip_address, user_agent, date_telechargement)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    with unite_de_travail():
+        if telechargements:
+            verifier_epoque_tendances(max(ligne[4] for ligne in telechargements))
+        executer_lot(requete, telechargements, commit=True)
+
+
 # =============================================================================
 # OPÉRATIONS SUR LES MESSAGES
 # =============================================================================
@@ -1157,28 +1432,15 @@ def obtenir_messages_contact(limite=None, est_lu=None):
         requete += " LIMIT ?"
         parametres.append(limite)
 
-    resultats = executer_requete(requete, parametres, fetchall=True)
-
-    messages = []
-    for row in resultats:
-        message = {
-            "id": row[0],
-            "nom": row[1],
-            "email": row[2],
-            "sujet": row[3],
-            "message": row[4],
-            "est_lu": row[5],
-            "date_creation": row[6],
-        }
-        messages.append(message)
-
-    return messages
+    return lire_lignes(requete, parametres)
 
 
 def marquer_message_lu(message_id):
     """Marque un message comme lu."""
     requete = "UPDATE messages_contact SET est_lu = 1 WHERE id = ?"
-    executer_requete(requete, (message_id,), commit=True)
+    with unite_de_travail():
+        executer_requete(requete, (message_id,), commit=True)
+        incrementer_version_contenu(DOMAINE_STATISTIQUES)
 
 
 # =============================================================================
@@ -1189,20 +1451,7 @@ def marquer_message_lu(message_id):
 def obtenir_abonnes_newsletter():
     """Récupère tous les abonnés à la newsletter."""
     requete = "SELECT * FROM abonnes_newsletter WHERE est_actif = 1 ORDER BY date_inscription DESC"
-    resultats = executer_requete(requete, fetchall=True)
-
-    abonnes = []
-    for row in resultats:
-        abonne = {
-            "id": row[0],
-            "email": row[1],
-            "nom": row[2],
-            "est_actif": row[3],
-            "date_inscription": row[4],
-        }
-        abonnes.append(abonne)
-
-    return abonnes
+    return lire_lignes(requete)
 
 
 # =============================================================================
@@ -1215,54 +1464,60 @@ def obtenir_toutes_categories():
     requete = (
         "SELECT * FROM categories WHERE est_active = 1 ORDER BY ordre ASC, nom ASC"
     )
-    resultats = executer_requete(requete, fetchall=True)
+    return lire_lignes(requete)
 
-    categories = []
-    for row in resultats:
-        categorie = {
-            "id": row[0],
-            "nom": row[1],
-            "slug": row[2],
-            "description": row[3],
-            "icone": row[4],
-            "ordre": row[5],
-            "est_active": row[6],
-            "date_creation": row[7],
-            "date_modification": row[8],
+
+def _synchroniser_categories(table, colonne, contenu_id, categorie_ids):
+    """
+    Aligne les associations d'un contenu sur ``categorie_ids``.
+
+    Seules les différences avec les associations existantes sont écrites
+    (une requête par lot), dans une seule transaction. Retourne les
+    identifiants ajoutés et retirés.
+    """
+    voulues = list(
+        dict.fromkeys(int(categorie_id) for categorie_id in categorie_ids or ())
+    )
+    with unite_de_travail():
+        actuelles = {
+            ligne[0]
+            for ligne in executer_requete(
+                f"SELECT categorie_id FROM {table} WHERE {colonne} = ?",
+                (contenu_id,),
+                fetchall=True,
+            )
         }
-        categories.append(categorie)
+        ajoutees = [
+            categorie_id for categorie_id in voulues if categorie_id not in actuelles
+        ]
+        retirees = sorted(actuelles.difference(voulues))
+
+        executer_lot(
+            f"DELETE FROM {table} WHERE {colonne} = ? AND categorie_id = ?",
+            [(contenu_id, categorie_id) for categorie_id in retirees],
+        )
+        executer_lot(
+            f"INSERT INTO {table} ({colonne}, categorie_id) VALUES (?, ?)",
+            [(contenu_id, categorie_id) for categorie_id in ajoutees],
+        )
+        if ajoutees or retirees:
+            incrementer_version_contenu()
 
-    return categories
+    return {"ajoutees": ajoutees, "retirees": retirees}
 
 
 def associer_categories(contenu_id, categorie_ids):
-    """Associe des catégories à un article."""
-    # Supprimer les associations existantes
-    requete_delete = "DELETE FROM article_categories WHERE article_id = ?"
-    executer_requete(requete_delete, (contenu_id,), commit=True)
-
-    # Ajouter les nouvelles associations
-    if categorie_ids:
-        requete_insert = (
-            "INSERT INTO article_categories (article_id, categorie_id) VALUES (?, ?)"
-        )
-        for cat_id in categorie_ids:
-            executer_requete(requete_insert, (contenu_id, cat_id), commit=True)
+    """Associe des catégories à un article (seules les différences sont écrites)."""
+    return _synchroniser_categories(
+        "article_categories", "article_id", contenu_id, categorie_ids
+    )
 
 
 def associer_categories_livre(livre_id, categorie_ids):
-    """Associe des catégories à un livre."""
-    # Supprimer les associations existantes
-    requete_delete = "DELETE FROM livre_categories WHERE livre_id = ?"
-    executer_requete(requete_delete, (livre_id,), commit=True)
-
-    # Ajouter les nouvelles associations
-    if categorie_ids:
-        requete_insert = (
-            "INSERT INTO livre_categories (livre_id, categorie_id) VALUES (?, ?)"
-        )
-        for cat_id in categorie_ids:
-            executer_requete(requete_insert, (livre_id, cat_id), commit=True)
+    """Associe des catégories à un livre (seules les différences sont écrites)."""
+    return _synchroniser_categories(
+        "livre_categories", "livre_id", livre_id, categorie_ids
+    )
 
 
 # =============================================================================
@@ -1270,49 +1525,72 @@ def associer_categories_livre(livre_id, categorie_ids):
 # =============================================================================
 
 
-def obtenir_statistiques_globales():
-    """Récupère les statistiques globales du site."""
-    stats = {}
-
-    # Nombre total d'articles
-    requete = "SELECT COUNT(*) FROM articles WHERE est_publie = 1"
-    stats["total_articles"] = executer_requete(requete, fetchone=True)[0]
-
-    # Nombre total de livres
-    requete = "SELECT COUNT(*) FROM livres WHERE est_publie = 1"
-    stats["total_livres"] = executer_requete(requete, fetchone=True)[0]
+# Colonnes de compteurs_globaux, dans l'ordre de la table
+COMPTEURS_GLOBAUX = (
+    "total_articles",
+    "total_livres",
+    "total_categories",
+    "total_achats",
+    "messages_non_lus",
+    "total_abonnes",
+    "revenus_totaux",
+    "total_vues",
+)
 
-    # Nombre total de catégories
-    requete = "SELECT COUNT(*) FROM categories WHERE est_active = 1"
-    stats["total_categories"] = executer_requete(requete, fetchone=True)[0]
 
-    # Nombre total d'achats
-    requete = "SELECT COUNT(*) FROM achats"
-    stats["total_achats"] = executer_requete(requete, fetchone=True)[0]
+def obtenir_statistiques_globales():
+    """
+    Récupère les statistiques globales du site.
 
-    # Nombre de messages non lus
-    requete = "SELECT COUNT(*) FROM messages_contact WHERE est_lu = 0"
-    stats["messages_non_lus"] = executer_requete(requete, fetchone=True)[0]
+    Les compteurs sont matérialisés dans ``compteurs_globaux`` par des
+    triggers: une seule lecture, quelle que soit la taille des tables.
+    """
+    requete = f"""
+        SELECT {", ".join(COMPTEURS_GLOBAUX)}
+        FROM compteurs_globaux WHERE id = 1
+    """
+    stats = lire_ligne(requete) or recalculer_statistiques_globales()
 
-    # Nombre d'abonnés newsletter
-    requete = "SELECT COUNT(*) FROM abonnes_newsletter WHERE est_actif = 1"
-    stats["total_abonnes"] = executer_requete(requete, fetchone=True)[0]
+    # Nombre total de lecteurs (abonnés newsletter actifs)
+    stats["total_lecteurs"] = stats["total_abonnes"]
+    return stats
 
-    # Revenus totaux
-    requete = "SELECT SUM(montant) FROM achats WHERE statut = 'paye'"
-    result = executer_requete(requete, fetchone=True)[0]
-    stats["revenus_totaux"] = result if result else 0
 
-    # Nombre total de vues
-    requete = "SELECT SUM(nombre_vues) FROM statistiques_vues"
-    result = executer_requete(requete, fetchone=True)[0]
-    stats["total_vues"] = result if result else 0
+def recalculer_statistiques_globales():
+    """Recalcule les statistiques globales à partir des tables (une requête)."""
+    requete = """
+        SELECT
+            (SELECT COUNT(*) FROM articles WHERE est_publie = 1) AS total_articles,
+            (SELECT COUNT(*) FROM livres WHERE est_publie = 1) AS total_livres,
+            (SELECT COUNT(*) FROM categories WHERE est_active = 1)
+                AS total_categories,
+            (SELECT COUNT(*) FROM achats) AS total_achats,
+            (SELECT COUNT(*) FROM messages_contact WHERE est_lu = 0)
+                AS messages_non_lus,
+            (SELECT COUNT(*) FROM abonnes_newsletter WHERE est_actif = 1)
+                AS total_abonnes,
+            (SELECT COALESCE(SUM(montant), 0) FROM achats WHERE statut = 'paye')
+                AS revenus_totaux,
+            (SELECT COALESCE(SUM(nombre_vues), 0) FROM statistiques_vues)
+            + (SELECT COALESCE(SUM(nombre_vues), 0)
+               FROM statistiques_vues_mensuelles) AS total_vues
+    """
+    return lire_ligne(requete)
 
-    # Nombre total de lecteurs (abonnés newsletter actifs)
-    requete = "SELECT COUNT(*) FROM abonnes_newsletter WHERE est_actif = 1"
-    stats["total_lecteurs"] = executer_requete(requete, fetchone=True)[0]
 
-    return stats
+def corriger_compteurs_globaux():
+    """Réécrit compteurs_globaux avec les valeurs recalculées."""
+    valeurs = recalculer_statistiques_globales()
+    requete = f"""
+        INSERT INTO compteurs_globaux (id, {", ".join(COMPTEURS_GLOBAUX)})
+        VALUES (1, {", ".join("?" * len(COMPTEURS_GLOBAUX))})
+        ON CONFLICT(id) DO UPDATE SET
+            {", ".join(f"{nom} = excluded.{nom}" for nom in COMPTEURS_GLOBAUX)}
+    """
+    executer_requete(
+        requete, tuple(valeurs[nom] for nom in COMPTEURS_GLOBAUX), commit=True
+    )
+    return valeurs
 
 
 def obtenir_toutes_configurations():
@@ -1330,7 +1608,287 @@ def obtenir_toutes_configurations():
 def modifier_configuration(cle, valeur):
     """Modifie une configuration."""
     requete = "UPDATE configuration_site SET valeur = ? WHERE cle = ?"
-    executer_requete(requete, (valeur, cle), commit=True)
+    with unite_de_travail():
+        executer_requete(requete, (valeur, cle), commit=True)
+        incrementer_version_contenu(DOMAINE_CONFIGURATION)
+
+
+# =============================================================================
+# HISTORIQUE DES VUES ET DES TÉLÉCHARGEMENTS
+# =============================================================================
+
+
+CONFIGURATION_HISTORIQUE_DEFAUT = {
+    # Jours d'historique détaillé gardés (au-delà: regroupés par mois)
+    "JOURS_VUES": 90,
+    "JOURS_TELECHARGEMENTS": 365,
+}
+
+
+def obtenir_configuration_historique():
+    """Retourne la configuration (défauts + settings.BLOG_HISTORIQUE)."""
+    from django.conf import settings
+
+    configuration = dict(CONFIGURATION_HISTORIQUE_DEFAUT)
+    configuration.update(getattr(settings, "BLOG_HISTORIQUE", {}))
+    return configuration
+
+
+# Les lignes détaillées d'un mois écoulé sont regroupées en une ligne par
+# contenu et par mois; les triggers "cumuls_*" et "compteurs_*" retirent les
+# vues supprimées et ajoutent les vues regroupées: les totaux ne changent pas.
+REQUETES_COMPACTION_VUES = (
+    """
+    INSERT INTO statistiques_vues_mensuelles (article_id, mois, nombre_vues)
+    SELECT article_id, SUBSTR(date_vue, 1, 7), SUM(nombre_vues)
+    FROM statistiques_vues
+    WHERE date_vue >= ? AND date_vue < ? AND article_id IS NOT NULL
+    GROUP BY article_id, SUBSTR(date_vue, 1, 7)
+    ON CONFLICT(article_id, mois)
+    DO UPDATE SET nombre_vues = nombre_vues + excluded.nombre_vues
+    """,
+    """
+    INSERT INTO statistiques_vues_mensuelles (livre_id, mois, nombre_vues)
+    SELECT livre_id, SUBSTR(date_vue, 1, 7), SUM(nombre_vues)
+    FROM statistiques_vues
+    WHERE date_vue >= ? AND date_vue < ? AND livre_id IS NOT NULL
+    GROUP BY livre_id, SUBSTR(date_vue, 1, 7)
+    ON CONFLICT(livre_id, mois)
+    DO UPDATE SET nombre_vues = nombre_vues + excluded.nombre_vues
+    """,
+    "DELETE FROM statistiques_vues WHERE date_vue >= ? AND date_vue < ?",
+)
+
+# Les téléchargements regroupés ne gardent ni l'adresse IP ni le user agent
+REQUETES_COMPACTION_TELECHARGEMENTS = (
+    """
+    INSERT INTO telechargements_mensuels (livre_id, mois, nombre_telechargements)
+    SELECT livre_id, SUBSTR(date_telechargement, 1, 7), COUNT(*)
+    FROM telechargements
+    WHERE date_telechargement >= ? AND date_telechargement < ?
+    GROUP BY livre_id, SUBSTR(date_telechargement, 1, 7)
+    ON CONFLICT(livre_id, mois)
+    DO UPDATE SET nombre_telechargements =
+        nombre_telechargements + excluded.nombre_telechargements
+    """,
+    """
+    DELETE FROM telechargements
+    WHERE date_telechargement >= ? AND date_telechargement < ?
+    """,
+)
+
+# Table détaillée -> (colonne de date, requêtes de compaction d'un mois)
+HISTORIQUES = {
+    "statistiques_vues": ("date_vue", REQUETES_COMPACTION_VUES),
+    "telechargements": ("date_telechargement", REQUETES_COMPACTION_TELECHARGEMENTS),
+}
+
+
+def _mois_suivant(jour):
+    """Premier jour du mois qui suit ``jour`` (date)."""
+    from datetime import timedelta
+
+    return (jour.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def lister_mois_a_compacter(table, limite, lots=None):
+    """
+    Mois de ``table`` dont toutes les lignes sont antérieures à ``limite``.
+
+    Retourne des couples ``(debut, fin)`` de dates ISO (fin exclue), du
+    plus ancien au plus récent, au plus ``lots`` mois. ``limite`` (date)
+    est ramenée au premier jour de son mois: un mois n'est regroupé que
+    lorsqu'il est entièrement sorti de la fenêtre détaillée.
+    """
+    from datetime import date
+
+    colonne, _ = HISTORIQUES[table]
+    limite = limite.replace(day=1)
+    mois = []
+    debut = lire_ligne(f"SELECT MIN({colonne}) AS debut FROM {table}")["debut"]
+    if debut is None:
+        return mois
+
+    jour = date.fromisoformat(str(debut)[:10]).replace(day=1)
+    while jour < limite and (lots is None or len(mois) < lots):
+        suivant = _mois_suivant(jour)
+        mois.append((jour.isoformat(), suivant.isoformat()))
+        jour = suivant
+    return mois
+
+
+def compacter_mois(table, debut, fin):
+    """
+    Regroupe par mois les lignes de ``table`` datées de [debut, fin), en
+    une transaction. Retourne le nombre de lignes détaillées supprimées.
+    """
+    _, requetes = HISTORIQUES[table]
+    with unite_de_travail():
+        for requete in requetes:
+            executer_requete(requete, (debut, fin), commit=True)
+        # changes() porte sur la dernière instruction: la suppression
+        return executer_requete("SELECT changes()", fetchone=True)[0]
+
+
+# =============================================================================
+# SCORES DE TENDANCE
+# =============================================================================
+
+
+CONFIGURATION_TENDANCES_DEFAUT = {
+    # Jours après lesquels une vue ne compte plus que pour moitié
+    "DEMI_VIE": 7.0,
+    # Un téléchargement vaut ce nombre de vues (score des livres)
+    "POIDS_TELECHARGEMENT": 5.0,
+    # Écart maximal (en demi-vies) entre l'époque et les vues écrites: au-delà,
+    # les écritures en lot recalent l'époque (un REAL déborde à 2^1024)
+    "RECALAGE_DEMI_VIES": 60,
+}
+
+
+def obtenir_configuration_tendances():
+    """Retourne la configuration (défauts + settings.BLOG_TENDANCES)."""
+    from django.conf import settings
+
+    configuration = dict(CONFIGURATION_TENDANCES_DEFAUT)
+    configuration.update(getattr(settings, "BLOG_TENDANCES", {}))
+    return configuration
+
+
+# Scores recalculés sur tout l'historique avec les paramètres de
+# parametres_tendances. Les mois regroupés comptent au 15 du mois; seules
+# les lignes dont le score change sont écrites.
+REQUETES_SCORES_TENDANCE = (
+    """
+    UPDATE articles SET score_tendance = s.score
+    FROM (
+        SELECT v.article_id AS id,
+               SUM(v.nombre * power(2.0, (julianday(v.jour) - julianday(p.epoque)) / p.demi_vie)) AS score
+        FROM (
+            SELECT article_id, nombre_vues AS nombre, date_vue AS jour
+            FROM statistiques_vues WHERE article_id IS NOT NULL
+            UNION ALL
+            SELECT article_id, nombre_vues, mois || '-15'
+            FROM statistiques_vues_mensuelles WHERE article_id IS NOT NULL
+        ) AS v, parametres_tendances AS p
+        GROUP BY v.article_id
+    ) AS s
+    WHERE articles.id = s.id AND s.score != 0
+    """,
+    """
+    UPDATE livres SET score_tendance = s.score
+    FROM (
+        SELECT v.livre_id AS id,
+               SUM(v.nombre * power(2.0, (julianday(v.jour) - julianday(p.epoque)) / p.demi_vie)) AS score
+        FROM (
+            SELECT livre_id, nombre_vues AS nombre, date_vue AS jour
+            FROM statistiques_vues WHERE livre_id IS NOT NULL
+            UNION ALL
+            SELECT livre_id, nombre_vues, mois || '-15'
+            FROM statistiques_vues_mensuelles WHERE livre_id IS NOT NULL
+            UNION ALL
+            SELECT t.livre_id, p.poids_telechargement, t.date_telechargement
+            FROM telechargements AS t, parametres_tendances AS p
+            UNION ALL
+            SELECT m.livre_id, p.poids_telechargement * m.nombre_telechargements, m.mois || '-15'
+            FROM telechargements_mensuels AS m, parametres_tendances AS p
+        ) AS v, parametres_tendances AS p
+        GROUP BY v.livre_id
+    ) AS s
+    WHERE livres.id = s.id AND s.score != 0
+    """,
+)
+
+
+def recalculer_tendances(epoque=None):
+    """
+    Recalcule les scores de tendance à partir de l'historique, en une
+    transaction, avec la configuration courante et l'époque ``epoque``
+    (date ISO, aujourd'hui par défaut).
+
+    Les triggers "tendances_*" tiennent les scores entre deux appels. Le
+    poids d'une vue double tous les ``DEMI_VIE`` jours après l'époque;
+    les écritures en lot la recalent d'elles-mêmes
+    (``verifier_epoque_tendances``). Retourne les paramètres enregistrés.
+    """
+    from datetime import date
+
+    configuration = obtenir_configuration_tendances()
+    parametres = {
+        "epoque": epoque or date.today().isoformat(),
+        "demi_vie": float(configuration["DEMI_VIE"]),
+        "poids_telechargement": float(configuration["POIDS_TELECHARGEMENT"]),
+    }
+    with unite_de_travail():
+        executer_requete(
+            """
+            INSERT INTO parametres_tendances
+                (id, epoque, demi_vie, poids_telechargement)
+            VALUES (1, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                epoque = excluded.epoque,
+                demi_vie = excluded.demi_vie,
+                poids_telechargement = excluded.poids_telechargement
+            """,
+            tuple(parametres.values()),
+            commit=True,
+        )
+        for table in ("articles", "livres"):
+            executer_requete(
+                f"UPDATE {table} SET score_tendance = 0 WHERE score_tendance != 0",
+                commit=True,
+            )
+        for requete in REQUETES_SCORES_TENDANCE:
+            executer_requete(requete, commit=True)
+    return parametres
+
+
+def recaler_epoque_tendances(epoque):
+    """
+    Ramène les scores de tendance à l'époque ``epoque`` (date ISO) sans
+    relire l'historique.
+
+    Chaque score est multiplié par 2^((ancienne - nouvelle) / demi_vie):
+    les rapports entre scores, donc les classements, ne changent pas.
+    """
+    facteur = """
+        (SELECT power(2.0, (julianday(epoque) - julianday(?)) / demi_vie)
+         FROM parametres_tendances)
+    """
+    with unite_de_travail():
+        for table in ("articles", "livres"):
+            executer_requete(
+                f"UPDATE {table} SET score_tendance = score_tendance * {facteur}"
+                " WHERE score_tendance != 0",
+                (epoque,),
+                commit=True,
+            )
+        executer_requete(
+            "UPDATE parametres_tendances SET epoque = ?", (epoque,), commit=True
+        )
+
+
+def verifier_epoque_tendances(jour):
+    """
+    Recale l'époque à ``jour`` si le poids des vues de ce jour dépasse
+    2^RECALAGE_DEMI_VIES (voir ``CONFIGURATION_TENDANCES_DEFAUT``).
+
+    Appelée avant chaque écriture de vues ou de téléchargements (date la
+    plus récente du lot): les scores restent de taille raisonnable sans
+    recalcul manuel.
+    Retourne True si l'époque a été recalée.
+    """
+    ligne = lire_ligne(
+        "SELECT epoque, (julianday(?) - julianday(epoque)) / demi_vie AS ecart"
+        " FROM parametres_tendances",
+        (jour,),
+    )
+    seuil = obtenir_configuration_tendances()["RECALAGE_DEMI_VIES"]
+    if ligne is None or ligne["ecart"] is None or ligne["ecart"] < seuil:
+        return False
+    recaler_epoque_tendances(jour[:10])
+    logger.info(f"Époque des tendances recalée du {ligne['epoque']} au {jour[:10]}")
+    return True
 
 
 # =============================================================================
@@ -1338,18 +1896,182 @@ def modifier_configuration(cle, valeur):
 # =============================================================================
 
 
+# Classement commun des articles et des livres (score entre 0 et 1)
+POIDS_PERTINENCE = 0.7  # bm25 relatif au meilleur résultat du même type
+POIDS_RECENCE = 0.15
+POIDS_POPULARITE = 0.15
+DEMI_VIE_RECENCE = 180.0  # jours: un contenu de cet âge garde la moitié du bonus
+PIVOT_POPULARITE = 100.0  # vues (+ téléchargements) donnant la moitié du bonus
+# Meilleures correspondances bm25 classées par type avant le score final
+CANDIDATS_RECHERCHE = 200
+
+REQUETE_RECHERCHE_CONTENUS = f"""
+    WITH candidats AS (
+        SELECT * FROM (
+            SELECT 'article' AS type, a.id, a.titre, a.slug,
+                   a.image_url AS image, a.type_article AS sous_type,
+                   NULL AS prix, NULL AS devise, NULL AS est_gratuit,
+                   a.date_creation,
+                   bm25(articles_fts, {POIDS_BM25_ARTICLES}) AS rang,
+                   a.total_vues AS popularite
+            FROM articles_fts
+            JOIN articles a ON a.id = articles_fts.rowid
+            WHERE articles_fts MATCH ?1 AND a.est_publie = 1
+            ORDER BY rang
+            LIMIT ?2
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'livre', l.id, l.titre, l.slug,
+                   l.image_couverture, NULL,
+                   l.prix, l.devise, l.est_gratuit,
+                   l.date_creation,
+                   bm25(livres_fts, {POIDS_BM25_LIVRES}) AS rang,
+                   COALESCE(l.nombre_telechargements, 0) + l.total_vues
+            FROM livres_fts
+            JOIN livres l ON l.id = livres_fts.rowid
+            WHERE livres_fts MATCH ?1 AND l.est_publie = 1
+            ORDER BY rang
+            LIMIT ?2
+        )
+    ),
+    classement AS (
+        SELECT *,
+            {POIDS_PERTINENCE}
+                * COALESCE(rang / NULLIF(MIN(rang) OVER (PARTITION BY type), 0), 1)
+            + {POIDS_RECENCE} * {DEMI_VIE_RECENCE} / ({DEMI_VIE_RECENCE}
+                + MAX(julianday('now') - julianday(date_creation), 0))
+            + {POIDS_POPULARITE} * popularite / (popularite + {PIVOT_POPULARITE})
+                AS score,
+            COUNT(*) OVER () AS total
+        FROM candidats
+        ORDER BY score DESC, date_creation DESC
+        LIMIT ?3 OFFSET ?4
+    )
+    SELECT type, id, titre, slug, image, sous_type, prix, devise, est_gratuit,
+           date_creation, popularite, score, total,
+           CASE type
+               WHEN 'article' THEN (
+                   SELECT snippet(articles_fts, 2, ?5, ?6, '…', {MOTS_EXTRAIT})
+                   FROM articles_fts
+                   WHERE articles_fts MATCH ?1 AND rowid = classement.id)
+               ELSE (
+                   SELECT snippet(livres_fts, 2, ?5, ?6, '…', {MOTS_EXTRAIT})
+                   FROM livres_fts
+                   WHERE livres_fts MATCH ?1 AND rowid = classement.id)
+           END AS extrait
+    FROM classement
+    ORDER BY score DESC, date_creation DESC
+"""
+
+
+def rechercher_contenus(terme, page=1, par_page=12):
+    """
+    Recherche classée commune aux articles et aux livres.
+
+    Le score combine la pertinence bm25 (titre et auteur favorisés), la
+    récence et la popularité (vues, téléchargements). Seule la page
+    demandée est lue. L'extrait de chaque résultat est produit par
+    l'index (``MOTS_EXTRAIT`` mots autour des termes trouvés, surlignés
+    par ``surligner_extrait``): les textes complets ne sont jamais lus.
+    Retourne ``{"resultats", "total", "page", "nombre_pages"}``; le
+    total est borné à ``CANDIDATS_RECHERCHE`` contenus par type.
+    """
+    page = max(1, int(page))
+    vide = {"resultats": [], "total": 0, "page": page, "nombre_pages": 0}
+    expression = construire_expression_fts(terme)
+    if expression is None:
+        return vide
+
+    try:
+        resultats = lire_lignes(
+            REQUETE_RECHERCHE_CONTENUS,
+            (
+                expression,
+                CANDIDATS_RECHERCHE,
+                par_page,
+                (page - 1) * par_page,
+                MARQUE_DEBUT,
+                MARQUE_FIN,
+            ),
+        )
+    except sqlite3.OperationalError as e:
+        if not index_recherche_absent(e):
+            raise
+        logger.warning(f"Recherche plein texte indisponible ({e}), repli sur LIKE")
+        resultats = _rechercher_contenus_like(terme, page, par_page)
+
+    if not resultats:
+        return vide
+    for resultat in resultats:
+        resultat["extrait"] = surligner_extrait(resultat["extrait"])
+    total = resultats[0]["total"]
+    return {
+        "resultats": resultats,
+        "total": total,
+        "page": page,
+        "nombre_pages": -(-total // par_page),
+    }
+
+
 def rechercher_global(terme, limite=50):
-    """Recherche globale dans les articles et les livres."""
-    articles = rechercher_articles(terme, limite=limite)
-    livres = rechercher_livres(terme, limite=limite)
+    """
+    Recherche globale dans les articles et les livres.
 
+    Les ``limite`` meilleurs résultats de ``rechercher_contenus``,
+    répartis par type.
+    """
+    resultats = rechercher_contenus(terme, par_page=limite)["resultats"]
     return {
-        "articles": articles,
-        "livres": livres,
-        "total": len(articles) + len(livres),
+        "articles": [r for r in resultats if r["type"] == "article"],
+        "livres": [r for r in resultats if r["type"] == "livre"],
+        "total": len(resultats),
     }
 
 
+def _rechercher_contenus_like(terme, page, par_page):
+    """Repli sans index plein texte: résultats LIKE fusionnés par date."""
+    contenus = [
+        {
+            "type": "article",
+            "id": a["id"],
+            "titre": a["titre"],
+            "slug": a["slug"],
+            "image": a["image_url"],
+            "sous_type": a["type_article"],
+            "prix": None,
+            "devise": None,
+            "est_gratuit": None,
+            "date_creation": a["date_creation"],
+            "extrait": a["extrait"],
+        }
+        for a in _rechercher_articles_like(terme, CANDIDATS_RECHERCHE, "carte")
+    ] + [
+        {
+            "type": "livre",
+            "id": l["id"],
+            "titre": l["titre"],
+            "slug": l["slug"],
+            "image": l["image_couverture"],
+            "sous_type": None,
+            "prix": l["prix"],
+            "devise": l["devise"],
+            "est_gratuit": l["est_gratuit"],
+            "date_creation": l["date_creation"],
+            "extrait": l["extrait"],
+        }
+        for l in _rechercher_livres_like(terme, CANDIDATS_RECHERCHE, "carte")
+    ]
+    contenus.sort(key=lambda contenu: contenu["date_creation"] or "", reverse=True)
+    total = len(contenus)
+    debut = (page - 1) * par_page
+    contenus = contenus[debut:debut + par_page]
+    for contenu in contenus:
+        contenu["total"] = total
+        contenu["extrait"] = Truncator(contenu["extrait"] or "").words(MOTS_EXTRAIT)
+    return contenus
+
+
 # =============================================================================
 # NEWSLETTER
 # =============================================================================
@@ -1364,7 +2086,9 @@ def inscrire_newsletter(email, nom=None):
         return False
 
     requete = "INSERT INTO abonnes_newsletter (email, nom) VALUES (?, ?)"
-    executer_requete(requete, (email, nom), commit=True)
+    with unite_de_travail():
+        executer_requete(requete, (email, nom), commit=True)
+        incrementer_version_contenu(DOMAINE_STATISTIQUES)
     return True
 
 
@@ -1385,4 +2109,7 @@ def creer_message_contact(donnees):
         donnees.get("sujet", ""),
         donnees["message"],
     )
-    return executer_requete(requete, parametres, commit=True)
+    with unite_de_travail():
+        message_id = executer_requete(requete, parametres, commit=True)
+        incrementer_version_contenu(DOMAINE_STATISTIQUES)
+    return message_id
@@ -6,6 +6,11 @@ la structure de la base de données SQLite.
 
 IMPORTANT: Ce projet n'utilise PAS l'ORM Django.
 Toutes les opérations sont effectuées en SQL brut.
+
+SCHEMA_SQL crée le schéma complet d'une nouvelle base. Toute modification
+du schéma est aussi ajoutée comme migration numérotée dans
+blog/migrations_sql (voir blog.db_migrations), qui met à jour les bases
+existantes.
 """
 
 # =============================================================================
@@ -53,7 +58,14 @@ CREATE TABLE IF NOT EXISTS articles (
     meta_description TEXT,
     date_publication DATE,
     date_creation TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    date_modification TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    date_modification TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Catégories recopiées par les triggers "categories_*" (listes sans jointure)
+    categories_noms TEXT NOT NULL DEFAULT '',
+    categories_ids TEXT NOT NULL DEFAULT '',
+    -- Total des vues (jours et mois) tenu par les triggers "cumuls_*"
+    total_vues INTEGER NOT NULL DEFAULT 0,
+    -- Vues et téléchargements amortis: triggers "tendances_*"
+    score_tendance REAL NOT NULL DEFAULT 0
 );
 
 -- ============================================================================
@@ -100,7 +112,14 @@ CREATE TABLE IF NOT EXISTS livres (
     meta_keywords TEXT,
     meta_description TEXT,
     date_creation TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    date_modification TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    date_modification TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Catégories recopiées par les triggers "categories_*" (listes sans jointure)
+    categories_noms TEXT NOT NULL DEFAULT '',
+    categories_ids TEXT NOT NULL DEFAULT '',
+    -- Total des vues (jours et mois) tenu par les triggers "cumuls_*"
+    total_vues INTEGER NOT NULL DEFAULT 0,
+    -- Vues et téléchargements amortis: triggers "tendances_*"
+    score_tendance REAL NOT NULL DEFAULT 0
 );
 
 -- ============================================================================
@@ -212,6 +231,52 @@ CREATE TABLE IF NOT EXISTS statistiques_vues (
     UNIQUE(livre_id, date_vue)
 );
 
+-- ============================================================================
+-- TABLE: statistiques_vues_mensuelles
+-- Description: Vues regroupées par mois, au-delà de la fenêtre détaillée
+-- de statistiques_vues (python manage.py compacter_historique)
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS statistiques_vues_mensuelles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    article_id INTEGER,
+    livre_id INTEGER,
+    mois CHAR(7) NOT NULL,
+    nombre_vues INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE,
+    FOREIGN KEY (livre_id) REFERENCES livres(id) ON DELETE CASCADE,
+    UNIQUE(article_id, mois),
+    UNIQUE(livre_id, mois)
+);
+
+-- ============================================================================
+-- TABLE: telechargements_mensuels
+-- Description: Téléchargements regroupés par livre et par mois, au-delà de
+-- la fenêtre détaillée de telechargements
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS telechargements_mensuels (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    livre_id INTEGER NOT NULL,
+    mois CHAR(7) NOT NULL,
+    nombre_telechargements INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (livre_id) REFERENCES livres(id) ON DELETE CASCADE,
+    UNIQUE(livre_id, mois)
+);
+
+-- ============================================================================
+-- TABLE: parametres_tendances
+-- Description: Référence des scores de tendance (une seule ligne). Une vue
+-- du jour J vaut 2^((J - epoque) / demi_vie): l'ordre des scores est celui
+-- des vues amorties à tout instant, sans recalcul quotidien.
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS parametres_tendances (
+    id INTEGER PRIMARY KEY CHECK(id = 1),
+    epoque DATE NOT NULL,
+    demi_vie REAL NOT NULL DEFAULT 7.0,
+    poids_telechargement REAL NOT NULL DEFAULT 5.0
+);
+
+INSERT OR IGNORE INTO parametres_tendances (id, epoque) VALUES (1, DATE('now'));
+
 -- ============================================================================
 -- TABLE: messages_contact
 -- Description: Messages reçus via le formulaire de contact
@@ -238,28 +303,139 @@ CREATE TABLE IF NOT EXISTS abonnes_newsletter (
     date_inscription TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- ============================================================================
+-- TABLE: versions_contenu
+-- Description: Numéros de version des contenus (invalidation des caches)
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS versions_contenu (
+    cle VARCHAR(50) PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    date_modification TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ============================================================================
+-- TABLE: compteurs_globaux
+-- Description: Statistiques globales matérialisées (une seule ligne),
+-- tenues à jour par les triggers "compteurs_*" ci-dessous
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS compteurs_globaux (
+    id INTEGER PRIMARY KEY CHECK(id = 1),
+    total_articles INTEGER NOT NULL DEFAULT 0,
+    total_livres INTEGER NOT NULL DEFAULT 0,
+    total_categories INTEGER NOT NULL DEFAULT 0,
+    total_achats INTEGER NOT NULL DEFAULT 0,
+    messages_non_lus INTEGER NOT NULL DEFAULT 0,
+    total_abonnes INTEGER NOT NULL DEFAULT 0,
+    revenus_totaux DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    total_vues INTEGER NOT NULL DEFAULT 0
+);
+
+-- Valeurs initiales calculées sur les données existantes
+INSERT OR IGNORE INTO compteurs_globaux (
+    id, total_articles, total_livres, total_categories, total_achats,
+    messages_non_lus, total_abonnes, revenus_totaux, total_vues
+) SELECT
+    1,
+    (SELECT COUNT(*) FROM articles WHERE est_publie = 1),
+    (SELECT COUNT(*) FROM livres WHERE est_publie = 1),
+    (SELECT COUNT(*) FROM categories WHERE est_active = 1),
+    (SELECT COUNT(*) FROM achats),
+    (SELECT COUNT(*) FROM messages_contact WHERE est_lu = 0),
+    (SELECT COUNT(*) FROM abonnes_newsletter WHERE est_actif = 1),
+    (SELECT COALESCE(SUM(montant), 0) FROM achats WHERE statut = 'paye'),
+    (SELECT COALESCE(SUM(nombre_vues), 0) FROM statistiques_vues)
+      + (SELECT COALESCE(SUM(nombre_vues), 0) FROM statistiques_vues_mensuelles);
+
+-- ============================================================================
+-- RECHERCHE PLEIN TEXTE (FTS5)
+-- Description: Index externes sur articles et livres, synchronisés par les
+-- triggers "recherche_*". unicode61 + remove_diacritics: "education"
+-- trouve "Éducation"; les index de préfixes accélèrent les requêtes "mot*".
+-- ============================================================================
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    titre, extrait, contenu,
+    content='articles', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS livres_fts USING fts5(
+    titre, auteur, description,
+    content='livres', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+-- Reconstruction depuis les tables de contenu (bases existantes)
+INSERT INTO articles_fts(articles_fts) VALUES ('rebuild');
+INSERT INTO livres_fts(livres_fts) VALUES ('rebuild');
+
 -- ============================================================================
 -- INDEX pour optimiser les requêtes
 -- ============================================================================
-CREATE INDEX IF NOT EXISTS idx_articles_type ON articles(type_article);
-CREATE INDEX IF NOT EXISTS idx_articles_vedette ON articles(est_vedette);
-CREATE INDEX IF NOT EXISTS idx_articles_populaire ON articles(est_populaire);
-CREATE INDEX IF NOT EXISTS idx_articles_publie ON articles(est_publie);
-CREATE INDEX IF NOT EXISTS idx_articles_slug ON articles(slug);
-CREATE INDEX IF NOT EXISTS idx_categories_slug ON categories(slug);
-CREATE INDEX IF NOT EXISTS idx_livres_slug ON livres(slug);
-CREATE INDEX IF NOT EXISTS idx_livres_gratuit ON livres(est_gratuit);
-CREATE INDEX IF NOT EXISTS idx_livres_vedette ON livres(est_vedette);
-CREATE INDEX IF NOT EXISTS idx_achats_statut ON achats(statut);
-CREATE INDEX IF NOT EXISTS idx_achats_token ON achats(token_telechargement);
+-- Index d'une seule colonne remplacés par les index composites ci-dessous
+-- (les slugs et le token sont déjà indexés par leur contrainte UNIQUE)
+DROP INDEX IF EXISTS idx_articles_type;
+DROP INDEX IF EXISTS idx_articles_vedette;
+DROP INDEX IF EXISTS idx_articles_populaire;
+DROP INDEX IF EXISTS idx_articles_publie;
+DROP INDEX IF EXISTS idx_articles_slug;
+DROP INDEX IF EXISTS idx_categories_slug;
+DROP INDEX IF EXISTS idx_livres_slug;
+DROP INDEX IF EXISTS idx_livres_gratuit;
+DROP INDEX IF EXISTS idx_livres_vedette;
+DROP INDEX IF EXISTS idx_achats_statut;
+DROP INDEX IF EXISTS idx_achats_token;
+DROP INDEX IF EXISTS idx_messages_lu;
+DROP INDEX IF EXISTS idx_statistiques_vues_article;
+DROP INDEX IF EXISTS idx_statistiques_vues_livre;
+
+-- Listes dans l'ordre (ordre_affichage, date, id): toutes, par type ou
+-- par prix, et vedettes / nouveautés (index partiels, peu de lignes)
+CREATE INDEX IF NOT EXISTS idx_articles_liste ON articles(ordre_affichage, date_creation DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_type_liste ON articles(type_article, ordre_affichage, date_creation DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_vedettes ON articles(ordre_affichage, date_creation DESC, id DESC) WHERE est_vedette = 1 AND est_publie = 1;
+CREATE INDEX IF NOT EXISTS idx_articles_recents ON articles(date_creation DESC, id DESC) WHERE est_publie = 1;
+CREATE INDEX IF NOT EXISTS idx_livres_liste ON livres(ordre_affichage, date_creation DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_livres_gratuit_liste ON livres(est_gratuit, ordre_affichage, date_creation DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_livres_vedettes ON livres(ordre_affichage, date_creation DESC, id DESC) WHERE est_vedette = 1 AND est_publie = 1;
+CREATE INDEX IF NOT EXISTS idx_livres_nouveaux ON livres(date_creation DESC, id DESC) WHERE est_nouveau = 1 AND est_publie = 1;
+
+-- Tables de liaison lues par catégorie (le sens contenu -> catégorie est
+-- couvert par leur contrainte UNIQUE)
+CREATE INDEX IF NOT EXISTS idx_article_categories_categorie ON article_categories(categorie_id, article_id);
+CREATE INDEX IF NOT EXISTS idx_livre_categories_categorie ON livre_categories(categorie_id, livre_id);
+
+-- Classement « les plus lus » lu dans l'index (total_vues matérialisé)
+CREATE INDEX IF NOT EXISTS idx_articles_plus_lus ON articles(total_vues DESC, date_creation DESC, id DESC) WHERE est_publie = 1;
+
+-- Classements « populaires » (score de tendance) lus dans l'index
+CREATE INDEX IF NOT EXISTS idx_articles_tendance ON articles(score_tendance DESC, date_creation DESC, id DESC) WHERE est_publie = 1;
+CREATE INDEX IF NOT EXISTS idx_livres_tendance ON livres(score_tendance DESC, date_creation DESC, id DESC) WHERE est_publie = 1;
+
+-- Compaction de l'historique, du plus ancien au plus récent
+CREATE INDEX IF NOT EXISTS idx_statistiques_vues_date ON statistiques_vues(date_vue);
+CREATE INDEX IF NOT EXISTS idx_telechargements_date ON telechargements(date_telechargement);
+
+CREATE INDEX IF NOT EXISTS idx_telechargements_livre ON telechargements(livre_id, date_telechargement);
+CREATE INDEX IF NOT EXISTS idx_telechargements_achat ON telechargements(achat_id) WHERE achat_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_achats_livre ON achats(livre_id);
+CREATE INDEX IF NOT EXISTS idx_achats_date ON achats(date_achat DESC);
+CREATE INDEX IF NOT EXISTS idx_achats_statut_date ON achats(statut, date_achat DESC);
 CREATE INDEX IF NOT EXISTS idx_achats_email ON achats(email_client);
-CREATE INDEX IF NOT EXISTS idx_messages_lu ON messages_contact(est_lu);
+CREATE INDEX IF NOT EXISTS idx_messages_date ON messages_contact(date_creation DESC);
+CREATE INDEX IF NOT EXISTS idx_messages_lu_date ON messages_contact(est_lu, date_creation DESC);
+CREATE INDEX IF NOT EXISTS idx_abonnes_actifs ON abonnes_newsletter(date_inscription DESC) WHERE est_actif = 1;
 
 -- ============================================================================
 -- TRIGGERS pour mise à jour automatique des dates
 -- ============================================================================
 CREATE TRIGGER IF NOT EXISTS maj_articles_modification
 AFTER UPDATE ON articles
+WHEN NEW.total_vues IS OLD.total_vues
+ AND NEW.score_tendance IS OLD.score_tendance
+ AND NEW.categories_noms IS OLD.categories_noms
+ AND NEW.categories_ids IS OLD.categories_ids
 BEGIN
     UPDATE articles SET date_modification = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
@@ -272,11 +448,567 @@ END;
 
 CREATE TRIGGER IF NOT EXISTS maj_livres_modification
 AFTER UPDATE ON livres
+WHEN NEW.total_vues IS OLD.total_vues
+ AND NEW.score_tendance IS OLD.score_tendance
+ AND NEW.categories_noms IS OLD.categories_noms
+ AND NEW.categories_ids IS OLD.categories_ids
 BEGIN
     UPDATE livres SET date_modification = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
+-- ============================================================================
+-- TRIGGERS des compteurs globaux (table compteurs_globaux)
+-- ============================================================================
+CREATE TRIGGER IF NOT EXISTS compteurs_articles_insertion
+AFTER INSERT ON articles
+BEGIN
+    UPDATE compteurs_globaux SET total_articles = total_articles + (NEW.est_publie = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_articles_suppression
+AFTER DELETE ON articles
+BEGIN
+    UPDATE compteurs_globaux SET total_articles = total_articles - (OLD.est_publie = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_articles_modification
+AFTER UPDATE OF est_publie ON articles
+BEGIN
+    UPDATE compteurs_globaux
+    SET total_articles = total_articles + (NEW.est_publie = 1) - (OLD.est_publie = 1)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_livres_insertion
+AFTER INSERT ON livres
+BEGIN
+    UPDATE compteurs_globaux SET total_livres = total_livres + (NEW.est_publie = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_livres_suppression
+AFTER DELETE ON livres
+BEGIN
+    UPDATE compteurs_globaux SET total_livres = total_livres - (OLD.est_publie = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_livres_modification
+AFTER UPDATE OF est_publie ON livres
+BEGIN
+    UPDATE compteurs_globaux
+    SET total_livres = total_livres + (NEW.est_publie = 1) - (OLD.est_publie = 1)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_categories_insertion
+AFTER INSERT ON categories
+BEGIN
+    UPDATE compteurs_globaux SET total_categories = total_categories + (NEW.est_active = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_categories_suppression
+AFTER DELETE ON categories
+BEGIN
+    UPDATE compteurs_globaux SET total_categories = total_categories - (OLD.est_active = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_categories_modification
+AFTER UPDATE OF est_active ON categories
+BEGIN
+    UPDATE compteurs_globaux
+    SET total_categories = total_categories + (NEW.est_active = 1) - (OLD.est_active = 1)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_achats_insertion
+AFTER INSERT ON achats
+BEGIN
+    UPDATE compteurs_globaux SET
+        total_achats = total_achats + 1,
+        revenus_totaux = revenus_totaux
+            + (CASE WHEN NEW.statut = 'paye' THEN NEW.montant ELSE 0 END)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_achats_suppression
+AFTER DELETE ON achats
+BEGIN
+    UPDATE compteurs_globaux SET
+        total_achats = total_achats - 1,
+        revenus_totaux = revenus_totaux
+            - (CASE WHEN OLD.statut = 'paye' THEN OLD.montant ELSE 0 END)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_achats_modification
+AFTER UPDATE OF statut, montant ON achats
+BEGIN
+    UPDATE compteurs_globaux SET
+        revenus_totaux = revenus_totaux
+            + (CASE WHEN NEW.statut = 'paye' THEN NEW.montant ELSE 0 END)
+            - (CASE WHEN OLD.statut = 'paye' THEN OLD.montant ELSE 0 END)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_messages_contact_insertion
+AFTER INSERT ON messages_contact
+BEGIN
+    UPDATE compteurs_globaux SET messages_non_lus = messages_non_lus + (NEW.est_lu = 0) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_messages_contact_suppression
+AFTER DELETE ON messages_contact
+BEGIN
+    UPDATE compteurs_globaux SET messages_non_lus = messages_non_lus - (OLD.est_lu = 0) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_messages_contact_modification
+AFTER UPDATE OF est_lu ON messages_contact
+BEGIN
+    UPDATE compteurs_globaux
+    SET messages_non_lus = messages_non_lus + (NEW.est_lu = 0) - (OLD.est_lu = 0)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_abonnes_newsletter_insertion
+AFTER INSERT ON abonnes_newsletter
+BEGIN
+    UPDATE compteurs_globaux SET total_abonnes = total_abonnes + (NEW.est_actif = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_abonnes_newsletter_suppression
+AFTER DELETE ON abonnes_newsletter
+BEGIN
+    UPDATE compteurs_globaux SET total_abonnes = total_abonnes - (OLD.est_actif = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_abonnes_newsletter_modification
+AFTER UPDATE OF est_actif ON abonnes_newsletter
+BEGIN
+    UPDATE compteurs_globaux
+    SET total_abonnes = total_abonnes + (NEW.est_actif = 1) - (OLD.est_actif = 1)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_statistiques_vues_insertion
+AFTER INSERT ON statistiques_vues
+BEGIN
+    UPDATE compteurs_globaux SET total_vues = total_vues + (COALESCE(NEW.nombre_vues, 0)) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_statistiques_vues_suppression
+AFTER DELETE ON statistiques_vues
+BEGIN
+    UPDATE compteurs_globaux SET total_vues = total_vues - (COALESCE(OLD.nombre_vues, 0)) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_statistiques_vues_modification
+AFTER UPDATE OF nombre_vues ON statistiques_vues
+BEGIN
+    UPDATE compteurs_globaux
+    SET total_vues = total_vues + (COALESCE(NEW.nombre_vues, 0)) - (COALESCE(OLD.nombre_vues, 0))
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_statistiques_vues_mensuelles_insertion
+AFTER INSERT ON statistiques_vues_mensuelles
+BEGIN
+    UPDATE compteurs_globaux SET total_vues = total_vues + NEW.nombre_vues WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_statistiques_vues_mensuelles_suppression
+AFTER DELETE ON statistiques_vues_mensuelles
+BEGIN
+    UPDATE compteurs_globaux SET total_vues = total_vues - OLD.nombre_vues WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_statistiques_vues_mensuelles_modification
+AFTER UPDATE OF nombre_vues ON statistiques_vues_mensuelles
+BEGIN
+    UPDATE compteurs_globaux
+    SET total_vues = total_vues + NEW.nombre_vues - OLD.nombre_vues
+    WHERE id = 1;
+END;
+
+
+-- ============================================================================
+-- TRIGGERS des cumuls de vues (articles.total_vues, livres.total_vues)
+-- Description: total des vues par jour et par mois de chaque contenu; la
+-- compaction déplace des vues des jours vers les mois sans changer le total.
+-- ============================================================================
+
+CREATE TRIGGER IF NOT EXISTS cumuls_vues_insertion
+AFTER INSERT ON statistiques_vues
+BEGIN
+    UPDATE articles SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0)
+    WHERE id = NEW.article_id;
+    UPDATE livres SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0)
+    WHERE id = NEW.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS cumuls_vues_suppression
+AFTER DELETE ON statistiques_vues
+BEGIN
+    UPDATE articles SET total_vues = total_vues - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = OLD.article_id;
+    UPDATE livres SET total_vues = total_vues - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = OLD.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS cumuls_vues_modification
+AFTER UPDATE OF nombre_vues ON statistiques_vues
+BEGIN
+    UPDATE articles
+    SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0) - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = NEW.article_id;
+    UPDATE livres
+    SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0) - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = NEW.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS cumuls_vues_mensuelles_insertion
+AFTER INSERT ON statistiques_vues_mensuelles
+BEGIN
+    UPDATE articles SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0)
+    WHERE id = NEW.article_id;
+    UPDATE livres SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0)
+    WHERE id = NEW.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS cumuls_vues_mensuelles_suppression
+AFTER DELETE ON statistiques_vues_mensuelles
+BEGIN
+    UPDATE articles SET total_vues = total_vues - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = OLD.article_id;
+    UPDATE livres SET total_vues = total_vues - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = OLD.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS cumuls_vues_mensuelles_modification
+AFTER UPDATE OF nombre_vues ON statistiques_vues_mensuelles
+BEGIN
+    UPDATE articles
+    SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0) - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = NEW.article_id;
+    UPDATE livres
+    SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0) - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = NEW.livre_id;
+END;
+
+-- ============================================================================
+-- TRIGGERS des scores de tendance (articles.score_tendance, livres.score_tendance)
+-- Description: chaque vue ajoute son poids du jour (voir parametres_tendances),
+-- chaque téléchargement poids_telechargement fois ce poids. La compaction de
+-- l'historique ne retire rien: les scores ne suivent que les ajouts.
+-- ============================================================================
+CREATE TRIGGER IF NOT EXISTS tendances_vues_insertion
+AFTER INSERT ON statistiques_vues
+BEGIN
+    UPDATE articles SET score_tendance = score_tendance + COALESCE(NEW.nombre_vues, 0)
+        * COALESCE((
+            SELECT power(2.0, (julianday(NEW.date_vue) - julianday(epoque)) / demi_vie)
+            FROM parametres_tendances WHERE id = 1
+        ), 0)
+    WHERE id = NEW.article_id;
+    UPDATE livres SET score_tendance = score_tendance + COALESCE(NEW.nombre_vues, 0)
+        * COALESCE((
+            SELECT power(2.0, (julianday(NEW.date_vue) - julianday(epoque)) / demi_vie)
+            FROM parametres_tendances WHERE id = 1
+        ), 0)
+    WHERE id = NEW.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tendances_vues_modification
+AFTER UPDATE OF nombre_vues ON statistiques_vues
+BEGIN
+    UPDATE articles SET score_tendance = score_tendance
+        + (COALESCE(NEW.nombre_vues, 0) - COALESCE(OLD.nombre_vues, 0))
+        * COALESCE((
+            SELECT power(2.0, (julianday(NEW.date_vue) - julianday(epoque)) / demi_vie)
+            FROM parametres_tendances WHERE id = 1
+        ), 0)
+    WHERE id = NEW.article_id;
+    UPDATE livres SET score_tendance = score_tendance
+        + (COALESCE(NEW.nombre_vues, 0) - COALESCE(OLD.nombre_vues, 0))
+        * COALESCE((
+            SELECT power(2.0, (julianday(NEW.date_vue) - julianday(epoque)) / demi_vie)
+            FROM parametres_tendances WHERE id = 1
+        ), 0)
+    WHERE id = NEW.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tendances_telechargements_insertion
+AFTER INSERT ON telechargements
+BEGIN
+    UPDATE livres SET score_tendance = score_tendance
+        + COALESCE((
+            SELECT poids_telechargement * power(
+                2.0, (julianday(NEW.date_telechargement) - julianday(epoque)) / demi_vie
+            )
+            FROM parametres_tendances WHERE id = 1
+        ), 0)
+    WHERE id = NEW.livre_id;
+END;
+
+-- ============================================================================
+-- TRIGGERS de l'index de recherche (tables articles_fts et livres_fts)
+-- ============================================================================
+CREATE TRIGGER IF NOT EXISTS recherche_articles_insertion
+AFTER INSERT ON articles
+BEGIN
+    INSERT INTO articles_fts(rowid, titre, extrait, contenu)
+    VALUES (NEW.id, NEW.titre, NEW.extrait, NEW.contenu);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recherche_articles_suppression
+AFTER DELETE ON articles
+BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, titre, extrait, contenu)
+    VALUES ('delete', OLD.id, OLD.titre, OLD.extrait, OLD.contenu);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recherche_articles_modification
+AFTER UPDATE OF titre, extrait, contenu ON articles
+BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, titre, extrait, contenu)
+    VALUES ('delete', OLD.id, OLD.titre, OLD.extrait, OLD.contenu);
+    INSERT INTO articles_fts(rowid, titre, extrait, contenu)
+    VALUES (NEW.id, NEW.titre, NEW.extrait, NEW.contenu);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recherche_livres_insertion
+AFTER INSERT ON livres
+BEGIN
+    INSERT INTO livres_fts(rowid, titre, auteur, description)
+    VALUES (NEW.id, NEW.titre, NEW.auteur, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recherche_livres_suppression
+AFTER DELETE ON livres
+BEGIN
+    INSERT INTO livres_fts(livres_fts, rowid, titre, auteur, description)
+    VALUES ('delete', OLD.id, OLD.titre, OLD.auteur, OLD.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recherche_livres_modification
+AFTER UPDATE OF titre, auteur, description ON livres
+BEGIN
+    INSERT INTO livres_fts(livres_fts, rowid, titre, auteur, description)
+    VALUES ('delete', OLD.id, OLD.titre, OLD.auteur, OLD.description);
+    INSERT INTO livres_fts(rowid, titre, auteur, description)
+    VALUES (NEW.id, NEW.titre, NEW.auteur, NEW.description);
+END;
+
+-- ============================================================================
+-- TRIGGERS des catégories recopiées sur les contenus
+-- Description: articles.categories_noms / categories_ids (et ceux des
+-- livres) sont recalculés quand une association est ajoutée ou supprimée,
+-- et quand une catégorie est renommée, déplacée ou supprimée.
+-- ============================================================================
+
+CREATE TRIGGER IF NOT EXISTS categories_articles_insertion
+AFTER INSERT ON article_categories
+BEGIN
+    UPDATE articles SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = NEW.article_id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = NEW.article_id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id = NEW.article_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_articles_suppression
+AFTER DELETE ON article_categories
+BEGIN
+    UPDATE articles SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = OLD.article_id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = OLD.article_id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id = OLD.article_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_livres_insertion
+AFTER INSERT ON livre_categories
+BEGIN
+    UPDATE livres SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = NEW.livre_id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = NEW.livre_id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id = NEW.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_livres_suppression
+AFTER DELETE ON livre_categories
+BEGIN
+    UPDATE livres SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = OLD.livre_id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = OLD.livre_id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id = OLD.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_contenus_modification
+AFTER UPDATE OF nom, ordre ON categories
+BEGIN
+    UPDATE articles SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = articles.id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = articles.id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id IN (SELECT article_id FROM article_categories WHERE categorie_id = NEW.id);
+    UPDATE livres SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = livres.id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = livres.id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id IN (SELECT livre_id FROM livre_categories WHERE categorie_id = NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_contenus_suppression
+AFTER DELETE ON categories
+BEGIN
+    UPDATE articles SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = articles.id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = articles.id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id IN (SELECT article_id FROM article_categories WHERE categorie_id = OLD.id);
+    UPDATE livres SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = livres.id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = livres.id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id IN (SELECT livre_id FROM livre_categories WHERE categorie_id = OLD.id);
+END;
 """
 
+# Tables du schéma (et schema_version), dans l'ordre de suppression par
+# init_db --reset: leurs index et triggers disparaissent avec elles. Les
+# tables de Django (auth, sessions) partagent le fichier et sont gardées.
+TABLES_SCHEMA = [
+    "articles_fts",
+    "livres_fts",
+    "telechargements_mensuels",
+    "statistiques_vues_mensuelles",
+    "statistiques_vues",
+    "telechargements",
+    "achats",
+    "livre_categories",
+    "article_categories",
+    "livres",
+    "articles",
+    "categories",
+    "liens_footer",
+    "configuration_site",
+    "reseaux_sociaux",
+    "messages_contact",
+    "abonnes_newsletter",
+    "versions_contenu",
+    "compteurs_globaux",
+    "parametres_tendances",
+    "schema_version",
+]
+
+# Tables d'anciennes versions du schéma, supprimées aussi par --reset
+TABLES_ANCIENNES = ["contenu_categories", "contenus", "services", "rendez_vous"]
+
 # =============================================================================
 # DONNÉES INITIALES
 # =============================================================================
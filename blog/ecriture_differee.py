@@ -0,0 +1,173 @@
+"""
+Écritures différées en lot pour le Blog Académique.
+
+Base commune du tampon des vues (``blog.compteurs``) et du journal des
+téléchargements (``blog.journal``): les entrées sont gardées en mémoire
+pendant la requête, puis un thread d'arrière-plan les écrit en lot
+toutes les N secondes ou dès que N entrées sont en attente. En cas
+d'échec, elles sont réinjectées pour la prochaine tentative.
+
+Chaque processus a sa propre instance (``InstanceProcessus``): elle est
+vidée à l'arrêt du worker (atexit) et repart à vide dans un processus
+enfant, les entrées du parent restant écrites par le parent.
+"""
+
+import atexit
+import os
+import threading
+import logging
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+
+class EcritureDifferee(ABC):
+    """
+    Entrées en attente écrites en lot par un thread d'arrière-plan.
+
+    ``ecrire`` reçoit la liste de lignes produite par ``_lignes``. Les
+    sous-classes définissent la structure en attente
+    (``_reinitialiser_file``, ``_taille_file``), sa conversion en lignes
+    et sa réinjection après un échec d'écriture (``_reinjecter``): une
+    sous-classe incomplète ne peut pas être instanciée.
+    """
+
+    # Nom du thread d'arrière-plan
+    NOM_FIL = "blog-ecriture-differee"
+    # Clé de obtenir_statistiques() pour le nombre d'entrées en attente
+    CLE_EN_ATTENTE = "entrees_en_attente"
+    # Début du message d'erreur quand ``ecrire`` échoue
+    DESCRIPTION = "Écriture en lot"
+
+    def __init__(self, ecrire, intervalle, seuil, compteurs=()):
+        self.ecrire = ecrire
+        self.intervalle = intervalle
+        self.seuil = seuil
+
+        self._verrou = threading.Lock()
+        self._reveil = threading.Event()
+        self._arret = threading.Event()
+        self._fil = None
+        self._compteurs = dict.fromkeys(compteurs, 0)
+        self._compteurs.update(vidages=0, lignes_ecrites=0, echecs=0)
+        self._reinitialiser_file()
+
+    @abstractmethod
+    def _reinitialiser_file(self):
+        """Remplace les entrées en attente par une file vide (sous verrou)."""
+
+    @abstractmethod
+    def _taille_file(self):
+        """Nombre d'entrées en attente (sous verrou)."""
+
+    @abstractmethod
+    def _lignes(self, en_attente):
+        """Lignes passées à ``ecrire`` pour les entrées ``en_attente``."""
+
+    @abstractmethod
+    def _reinjecter(self, en_attente, lignes):
+        """Remet en attente les entrées d'une écriture échouée (sous verrou)."""
+
+    def _signaler_ajout(self, seuil_atteint):
+        """À appeler hors verrou après un ajout: démarre ou réveille le thread."""
+        self._demarrer()
+        if seuil_atteint:
+            self._reveil.set()
+
+    def vider(self):
+        """Écrit toutes les entrées en attente. Retourne le nombre de lignes."""
+        with self._verrou:
+            en_attente = self._en_attente
+            self._reinitialiser_file()
+
+        if not en_attente:
+            return 0
+
+        lignes = self._lignes(en_attente)
+        try:
+            self.ecrire(lignes)
+        except Exception as e:
+            logger.error(f"{self.DESCRIPTION} impossible: {e}")
+            with self._verrou:
+                self._compteurs["echecs"] += 1
+                self._reinjecter(en_attente, lignes)
+            return 0
+
+        with self._verrou:
+            self._compteurs["vidages"] += 1
+            self._compteurs["lignes_ecrites"] += len(lignes)
+        return len(lignes)
+
+    def arreter(self):
+        """Arrête le thread d'arrière-plan et écrit les entrées restantes."""
+        self._arret.set()
+        self._reveil.set()
+        if self._fil is not None and self._fil.is_alive():
+            self._fil.join(timeout=self.intervalle + 5)
+        self.vider()
+
+    def obtenir_statistiques(self):
+        """Retourne les compteurs et le nombre d'entrées en attente."""
+        with self._verrou:
+            statistiques = dict(self._compteurs)
+            statistiques[self.CLE_EN_ATTENTE] = self._taille_file()
+        return statistiques
+
+    def reinitialiser_apres_fork(self):
+        """Processus enfant: les entrées du parent seront écrites par le parent."""
+        self._verrou = threading.Lock()
+        self._reveil = threading.Event()
+        self._arret = threading.Event()
+        self._fil = None
+        self._reinitialiser_file()
+
+    def _demarrer(self):
+        """Démarre le thread d'écriture (une fois par processus)."""
+        if self._fil is not None:
+            return
+
+        with self._verrou:
+            if self._fil is not None:
+                return
+            self._arret.clear()
+            self._fil = threading.Thread(
+                target=self._boucle, name=self.NOM_FIL, daemon=True
+            )
+            self._fil.start()
+
+    def _boucle(self):
+        while not self._arret.is_set():
+            self._reveil.wait(self.intervalle)
+            self._reveil.clear()
+            if self._arret.is_set():
+                break
+            self.vider()
+
+
+class InstanceProcessus:
+    """
+    Écriture différée unique du processus, créée à la première demande.
+
+    ``creer`` construit l'instance; elle est alors vidée à l'arrêt du
+    processus et réinitialisée dans les processus enfants (fork).
+    """
+
+    def __init__(self, creer):
+        self.creer = creer
+        self._instance = None
+        self._verrou = threading.Lock()
+
+    def obtenir(self):
+        if self._instance is not None:
+            return self._instance
+
+        with self._verrou:
+            if self._instance is None:
+                instance = self.creer()
+                atexit.register(instance.arreter)
+                if hasattr(os, "register_at_fork"):
+                    os.register_at_fork(
+                        after_in_child=instance.reinitialiser_apres_fork
+                    )
+                self._instance = instance
+        return self._instance
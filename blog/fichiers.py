@@ -0,0 +1,337 @@
+"""
+Livraison des fichiers PDF des livres pour le Blog Académique.
+
+Les PDF sont rangés hors des fichiers publics (``BLOG_FICHIERS['RACINE']``)
+et ne sont envoyés qu'après le contrôle du lien de téléchargement:
+l'emplacement du fichier n'est jamais communiqué au navigateur. La
+colonne ``livres.fichier_pdf`` contient le chemin relatif à la racine.
+
+Modes de livraison (``BLOG_FICHIERS['MODE']``):
+
+    django      le worker envoie le fichier (FileResponse); gunicorn le
+                transmet par os.sendfile, sans copie en mémoire
+    x-accel     nginx envoie le fichier (en-tête X-Accel-Redirect vers un
+                emplacement ``internal``): le worker est libéré aussitôt
+    x-sendfile  même principe pour Apache (mod_xsendfile) et lighttpd
+
+En mode django, une requête ``Range`` (reprise d'un téléchargement,
+lecture progressive du PDF) reçoit une réponse 206 avec la seule tranche
+demandée. L'ETag est fort: il permet les reprises ``If-Range`` et les
+réponses 304. En mode x-accel ou x-sendfile, le serveur web s'en charge.
+
+``preparer_pdf`` trouve le fichier et détermine la réponse réellement
+servie avant que la vue ne compte le téléchargement: un fichier absent
+ne consomme rien, et seule une tranche qui ne commence pas au premier
+octet est une reprise gratuite.
+"""
+
+import logging
+import os
+import re
+from pathlib import Path
+from urllib.parse import quote, urlparse
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.shortcuts import redirect
+from django.utils.http import content_disposition_header
+
+logger = logging.getLogger(__name__)
+
+CONFIGURATION_FICHIERS_DEFAUT = {
+    # Répertoire des PDF (hors de MEDIA_ROOT et STATIC_ROOT)
+    "RACINE": None,
+    # django, x-accel ou x-sendfile
+    "MODE": "django",
+    # Emplacement nginx « internal » qui correspond à RACINE (mode x-accel)
+    "PREFIXE_X_ACCEL": "/fichiers-proteges/",
+    # Taille des lectures quand le fichier n'est pas envoyé par sendfile
+    "TAILLE_BLOC": 256 * 1024,
+}
+
+MODES_LIVRAISON = ("django", "x-accel", "x-sendfile")
+
+MOTIF_PLAGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class PlageNonSatisfiable(Exception):
+    """La plage demandée commence après la fin du fichier (réponse 416)."""
+
+
+def obtenir_configuration_fichiers():
+    """Retourne la configuration de livraison (défauts + settings.BLOG_FICHIERS)."""
+    configuration = dict(CONFIGURATION_FICHIERS_DEFAUT)
+    configuration.update(getattr(settings, "BLOG_FICHIERS", {}))
+    if configuration["RACINE"] is None:
+        configuration["RACINE"] = Path(settings.BASE_DIR) / "fichiers"
+    if configuration["MODE"] not in MODES_LIVRAISON:
+        raise ValueError(f"Mode de livraison inconnu: {configuration['MODE']}")
+    return configuration
+
+
+# =============================================================================
+# FICHIERS ET EN-TÊTES
+# =============================================================================
+
+
+def est_url_externe(fichier_pdf):
+    """Indique si ``fichier_pdf`` est une URL (fichier hébergé ailleurs)."""
+    return urlparse(fichier_pdf).scheme in ("http", "https")
+
+
+def resoudre_chemin(fichier_pdf, racine):
+    """
+    Chemin absolu du fichier sous ``racine``, ou None.
+
+    Les anciennes valeurs préfixées par MEDIA_URL sont acceptées; un
+    chemin qui sort de la racine (``..``, lien symbolique) est refusé.
+    """
+    relatif = fichier_pdf.strip()
+    if relatif.startswith(settings.MEDIA_URL):
+        relatif = relatif[len(settings.MEDIA_URL):]
+    racine = Path(racine).resolve()
+    chemin = (racine / relatif.lstrip("/")).resolve()
+    if racine not in chemin.parents:
+        return None
+    return chemin
+
+
+def trouver_pdf(fichier_pdf, racine):
+    """
+    Chemin du PDF existant, sous ``racine`` ou à défaut sous MEDIA_ROOT.
+
+    Les PDF enregistrés avant BLOG_FICHIERS (valeurs ``/media/...``) sont
+    restés dans MEDIA_ROOT: ils sont encore servis, avec un avertissement,
+    jusqu'à ce qu'ils soient déplacés sous la racine.
+    """
+    for base in (racine, settings.MEDIA_ROOT):
+        if not base:
+            continue
+        chemin = resoudre_chemin(fichier_pdf, base)
+        if chemin is not None and chemin.is_file():
+            if base is not racine:
+                logger.warning(
+                    f"PDF servi depuis MEDIA_ROOT, à déplacer: {fichier_pdf}"
+                )
+            return chemin
+    return None
+
+
+def calculer_etag(etat):
+    """ETag fort d'un fichier: taille et date de modification (ns)."""
+    return f'"{etat.st_size:x}-{etat.st_mtime_ns:x}"'
+
+
+def analyser_plage(entete, taille):
+    """
+    Analyse un en-tête ``Range`` pour un fichier de ``taille`` octets.
+
+    Retourne ``(debut, fin)`` (fin incluse), ou None pour envoyer le
+    fichier entier (pas d'en-tête, syntaxe invalide ou plages multiples,
+    que le RFC 9110 permet d'ignorer). Lève ``PlageNonSatisfiable`` si la
+    plage commence après la fin du fichier.
+    """
+    correspondance = MOTIF_PLAGE.match((entete or "").replace(" ", ""))
+    if correspondance is None:
+        return None
+    debut, fin = correspondance.groups()
+    if not debut:
+        # bytes=-N: les N derniers octets
+        if not fin:
+            return None
+        longueur = int(fin)
+        if longueur == 0:
+            raise PlageNonSatisfiable(entete)
+        return max(0, taille - longueur), taille - 1
+    debut = int(debut)
+    fin = min(int(fin), taille - 1) if fin else taille - 1
+    if fin < debut:
+        if debut >= taille:
+            raise PlageNonSatisfiable(entete)
+        return None
+    return debut, fin
+
+
+class TrancheFichier:
+    """
+    Fichier ouvert limité à ``longueur`` octets à partir de ``debut``.
+
+    ``fileno()`` reste disponible: gunicorn envoie la tranche par
+    os.sendfile depuis la position courante, sur Content-Length octets.
+    """
+
+    def __init__(self, fichier, debut, longueur):
+        self.fichier = fichier
+        self.restant = longueur
+        fichier.seek(debut)
+
+    def read(self, taille=-1):
+        if taille < 0 or taille > self.restant:
+            taille = self.restant
+        donnees = self.fichier.read(taille)
+        self.restant -= len(donnees)
+        return donnees
+
+    def fileno(self):
+        return self.fichier.fileno()
+
+    def close(self):
+        self.fichier.close()
+
+
+# =============================================================================
+# RÉPONSES
+# =============================================================================
+
+
+def _reponse_deleguee(chemin, configuration, nom):
+    """Réponse vide: le serveur web envoie le fichier (x-accel, x-sendfile)."""
+    reponse = HttpResponse(content_type="application/pdf")
+    if configuration["MODE"] == "x-accel":
+        relatif = chemin.relative_to(Path(configuration["RACINE"]).resolve())
+        prefixe = configuration["PREFIXE_X_ACCEL"].rstrip("/")
+        reponse["X-Accel-Redirect"] = f"{prefixe}/{quote(relatif.as_posix())}"
+    else:
+        reponse["X-Sendfile"] = str(chemin)
+    reponse["Content-Disposition"] = content_disposition_header(True, nom)
+    return reponse
+
+
+class LivraisonPdf:
+    """
+    Envoi d'un PDF préparé par ``preparer_pdf``.
+
+    ``statut`` est celui de la réponse qui sera servie, If-Range compris:
+    302 (fichier hébergé ailleurs), 200, 206, 304 ou 416. La vue décide du
+    comptage avant d'appeler ``reponse``, ou ``fermer`` si elle refuse
+    l'envoi.
+    """
+
+    def __init__(self, statut, chemin=None, configuration=None, etag=None,
+                 taille=None, plage=None, fichier=None, url=None):
+        self.statut = statut
+        self.chemin = chemin
+        self.configuration = configuration
+        self.etag = etag
+        self.taille = taille
+        self.plage = plage
+        self.fichier = fichier
+        self.url = url
+
+    @property
+    def est_reprise(self):
+        """Tranche qui ne commence pas au premier octet (réponse 206)."""
+        return self.statut == 206 and self.plage[0] > 0
+
+    @property
+    def compte_comme_telechargement(self):
+        """Le fichier est envoyé depuis son premier octet (302, 200, 206 à 0)."""
+        return self.statut in (200, 206, 302) and not self.est_reprise
+
+    def fermer(self):
+        if self.fichier is not None:
+            self.fichier.close()
+            self.fichier = None
+
+    def reponse(self, nom):
+        """Réponse HTTP qui envoie le PDF sous le nom ``nom``."""
+        if self.url is not None:
+            return redirect(self.url)
+
+        if self.statut == 304:
+            reponse = HttpResponseNotModified()
+            reponse["ETag"] = self.etag
+            return reponse
+
+        if self.statut == 416:
+            reponse = HttpResponse(status=416)
+            reponse["Content-Range"] = f"bytes */{self.taille}"
+            return reponse
+
+        if self.fichier is None:
+            return _reponse_deleguee(self.chemin, self.configuration, nom)
+
+        if self.plage is None:
+            reponse = FileResponse(self.fichier, as_attachment=True, filename=nom)
+        else:
+            debut, fin = self.plage
+            reponse = FileResponse(
+                TrancheFichier(self.fichier, debut, fin - debut + 1),
+                as_attachment=True,
+                filename=nom,
+                status=206,
+            )
+            reponse["Content-Range"] = f"bytes {debut}-{fin}/{self.taille}"
+            reponse["Content-Length"] = fin - debut + 1
+        self.fichier = None
+
+        reponse.block_size = self.configuration["TAILLE_BLOC"]
+        reponse["Content-Type"] = "application/pdf"
+        reponse["Accept-Ranges"] = "bytes"
+        reponse["ETag"] = self.etag
+        reponse["Cache-Control"] = "private, no-transform"
+        return reponse
+
+
+def preparer_pdf(request, fichier_pdf):
+    """
+    Prépare l'envoi du PDF ``fichier_pdf`` en réponse à ``request``.
+
+    Retourne None si le fichier est introuvable. Un fichier hébergé
+    ailleurs (URL) ne peut pas être protégé: la réponse y redirigera.
+    """
+    if est_url_externe(fichier_pdf):
+        logger.warning(f"PDF hébergé hors du site, lien exposé: {fichier_pdf}")
+        return LivraisonPdf(302, url=fichier_pdf)
+
+    configuration = obtenir_configuration_fichiers()
+    chemin = trouver_pdf(fichier_pdf, configuration["RACINE"])
+    if chemin is None:
+        logger.error(f"Fichier PDF introuvable: {fichier_pdf}")
+        return None
+
+    # Un PDF resté dans MEDIA_ROOT n'est pas sous l'emplacement du serveur web
+    delegue = (
+        configuration["MODE"] != "django"
+        and Path(configuration["RACINE"]).resolve() in chemin.parents
+    )
+    fichier = None
+    try:
+        if delegue:
+            etat = chemin.stat()
+        else:
+            fichier = open(chemin, "rb")
+            etat = os.fstat(fichier.fileno())
+    except OSError as e:
+        logger.error(f"Fichier PDF illisible: {fichier_pdf} ({e})")
+        return None
+    etag = calculer_etag(etat)
+    taille = etat.st_size
+
+    statut, plage = 200, None
+    si_plage = request.headers.get("If-Range")
+    if not delegue and etag in request.headers.get("If-None-Match", ""):
+        statut = 304
+    elif si_plage is None or (not delegue and si_plage == etag):
+        # Le serveur web compare If-Range à son propre ETag: en mode
+        # délégué, une reprise conditionnelle compte comme un envoi complet.
+        try:
+            plage = analyser_plage(request.headers.get("Range"), taille)
+        except PlageNonSatisfiable:
+            statut = 416
+        else:
+            if plage is not None:
+                statut = 206
+
+    if statut not in (200, 206) and fichier is not None:
+        fichier.close()
+        fichier = None
+    return LivraisonPdf(
+        statut,
+        chemin=chemin,
+        configuration=configuration,
+        etag=etag,
+        taille=taille,
+        plage=plage,
+        fichier=fichier,
+    )
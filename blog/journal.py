@@ -0,0 +1,144 @@
+"""
+Journal différé des téléchargements pour le Blog Académique.
+
+L'historique des téléchargements (table ``telechargements``) n'est plus
+écrit pendant la requête: chaque téléchargement est ajouté à une file
+en mémoire, qu'un thread d'arrière-plan écrit en lot toutes les N
+secondes ou dès que N entrées sont en attente (voir
+``blog.ecriture_differee``).
+
+La file est bornée (``CAPACITE``): si l'écriture ne suit plus (base
+verrouillée, disque plein), les nouvelles entrées sont abandonnées et
+comptées comme perdues au lieu de ralentir les téléchargements. Les
+compteurs de quota (``consommer_telechargement``) restent écrits dans
+la requête: seul l'historique est différé.
+"""
+
+import logging
+from collections import deque
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+from blog.ecriture_differee import EcritureDifferee, InstanceProcessus
+
+logger = logging.getLogger(__name__)
+
+CONFIGURATION_JOURNAL_DEFAUT = {
+    "ACTIF": True,
+    # Délai maximal (secondes) entre deux écritures en lot
+    "INTERVALLE": 2.0,
+    # Nombre d'entrées en attente déclenchant une écriture anticipée
+    "SEUIL": 200,
+    # Nombre maximal d'entrées en attente (au-delà, elles sont perdues)
+    "CAPACITE": 10000,
+}
+
+# Les user agents au-delà de cette longueur sont tronqués
+LONGUEUR_MAX_USER_AGENT = 512
+
+
+class JournalTelechargements(EcritureDifferee):
+    """
+    File bornée d'entrées d'historique, écrites en lot.
+
+    ``ecrire`` reçoit une liste de tuples
+    ``(livre_id, achat_id, ip, user_agent, date_telechargement)``.
+    """
+
+    NOM_FIL = "blog-journal-telechargements"
+    DESCRIPTION = "Écriture du journal des téléchargements"
+
+    def __init__(self, ecrire, intervalle=2.0, seuil=200, capacite=10000):
+        self.capacite = capacite
+        super().__init__(
+            ecrire, intervalle, seuil, compteurs=("entrees_recues", "perdues")
+        )
+
+    def ajouter(self, livre_id, achat_id=None, ip=None, user_agent=None):
+        """
+        Ajoute un téléchargement à la file (aucune écriture SQL).
+
+        Retourne False si la file est pleine: l'entrée est perdue.
+        """
+        entree = (
+            livre_id,
+            achat_id,
+            ip,
+            (user_agent or "")[:LONGUEUR_MAX_USER_AGENT] or None,
+            datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        with self._verrou:
+            self._compteurs["entrees_recues"] += 1
+            if len(self._en_attente) >= self.capacite:
+                self._compteurs["perdues"] += 1
+                return False
+            self._en_attente.append(entree)
+            seuil_atteint = len(self._en_attente) >= self.seuil
+
+        self._signaler_ajout(seuil_atteint)
+        return True
+
+    def arreter(self):
+        """Arrête le thread, écrit les entrées restantes et signale les pertes."""
+        super().arreter()
+        with self._verrou:
+            perdues = self._compteurs["perdues"] + len(self._en_attente)
+        if perdues:
+            logger.warning(f"{perdues} téléchargement(s) absent(s) de l'historique")
+
+    def _reinitialiser_file(self):
+        self._en_attente = deque()
+
+    def _taille_file(self):
+        return len(self._en_attente)
+
+    def _lignes(self, en_attente):
+        return list(en_attente)
+
+    def _reinjecter(self, en_attente, lignes):
+        # En tête de file, dans la limite de capacité
+        place = max(0, self.capacite - len(self._en_attente))
+        gardees = lignes[:place]
+        self._compteurs["perdues"] += len(lignes) - len(gardees)
+        self._en_attente.extendleft(reversed(gardees))
+
+
+# =============================================================================
+# JOURNAL DU PROCESSUS
+# =============================================================================
+
+
+def obtenir_configuration_journal():
+    """Retourne la configuration (défauts + settings.BLOG_JOURNAL_TELECHARGEMENTS)."""
+    configuration = dict(CONFIGURATION_JOURNAL_DEFAUT)
+    configuration.update(getattr(settings, "BLOG_JOURNAL_TELECHARGEMENTS", {}))
+    return configuration
+
+
+def _creer_journal():
+    from blog.db_operations import enregistrer_telechargements_en_lot
+
+    configuration = obtenir_configuration_journal()
+    return JournalTelechargements(
+        enregistrer_telechargements_en_lot,
+        intervalle=configuration["INTERVALLE"],
+        seuil=configuration["SEUIL"],
+        capacite=configuration["CAPACITE"],
+    )
+
+
+_journal = InstanceProcessus(_creer_journal)
+
+
+def obtenir_journal_telechargements():
+    """Retourne le journal du processus, ou None s'il est désactivé."""
+    if not obtenir_configuration_journal()["ACTIF"]:
+        return None
+    return _journal.obtenir()
+
+
+def obtenir_statistiques_journal():
+    """Compteurs du journal de ce processus (vides s'il est désactivé)."""
+    journal = obtenir_journal_telechargements()
+    return journal.obtenir_statistiques() if journal is not None else {}
@@ -0,0 +1,670 @@
+"""
+Commande de mesure des performances de la couche SQL brut.
+
+Usage:
+    python manage.py benchmark_db --scenario pool
+    python manage.py benchmark_db --scenario pool --threads 8 --iterations 2000
+    python manage.py benchmark_db --scenario lecture_concurrente --duree 5
+    python manage.py benchmark_db --scenario mappers --iterations 200
+    python manage.py benchmark_db --scenario projection --corpus 5000
+    python manage.py benchmark_db --scenario requetes_page
+    python manage.py benchmark_db --scenario recherche --corpus 100000
+    python manage.py benchmark_db --scenario autocompletion --corpus 20000
+    python manage.py benchmark_db --scenario pagination --corpus 100000
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Mesure les performances de la couche d'accès aux données"
+
+    SCENARIOS = {
+        "pool": "scenario_pool",
+        "lecture_concurrente": "scenario_lecture_concurrente",
+        "mappers": "scenario_mappers",
+        "projection": "scenario_projection",
+        "requetes_page": "scenario_requetes_page",
+        "recherche": "scenario_recherche",
+        "autocompletion": "scenario_autocompletion",
+        "pagination": "scenario_pagination",
+    }
+
+    # Vocabulaire des corpus variés (recherche plein texte)
+    VOCABULAIRE = (
+        "éducation société histoire économie pédagogie université recherche "
+        "développement culture politique enseignement méthode analyse théorie "
+        "langue littérature philosophie science numérique santé environnement "
+        "démocratie mémoire réforme école étudiant professeur savoir critique"
+    ).split()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            choices=sorted(self.SCENARIOS),
+            default="pool",
+            help="Scénario de mesure à exécuter",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=4,
+            help="Nombre de threads concurrents",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=1000,
+            help="Nombre d'opérations par thread",
+        )
+        parser.add_argument(
+            "--duree",
+            type=float,
+            default=3.0,
+            help="Durée (secondes) des scénarios chronométrés",
+        )
+        parser.add_argument(
+            "--corpus",
+            type=int,
+            default=2000,
+            help="Nombre de contenus générés pour les scénarios sur corpus",
+        )
+
+    def handle(self, *args, **options):
+        getattr(self, self.SCENARIOS[options["scenario"]])(options)
+
+    # =========================================================================
+    # OUTILS
+    # =========================================================================
+
+    def executer_en_parallele(self, fonction, threads, iterations):
+        """Exécute ``fonction`` en parallèle et retourne la durée totale."""
+
+        def travailleur():
+            for _ in range(iterations):
+                fonction()
+
+        fils = [threading.Thread(target=travailleur) for _ in range(threads)]
+        debut = time.perf_counter()
+        for fil in fils:
+            fil.start()
+        for fil in fils:
+            fil.join()
+        return time.perf_counter() - debut
+
+    def copier_base(self):
+        """Copie la base configurée dans un fichier temporaire."""
+        from blog.db_connexion import obtenir_chemin_db
+
+        descripteur, chemin = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(descripteur)
+        source = sqlite3.connect(obtenir_chemin_db())
+        destination = sqlite3.connect(chemin)
+        try:
+            source.backup(destination)
+        finally:
+            source.close()
+            destination.close()
+        return chemin
+
+    def supprimer_base(self, chemin):
+        for suffixe in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(chemin + suffixe):
+                os.remove(chemin + suffixe)
+
+    def creer_base_corpus(self, nombre_articles, taille_contenu=20000, varie=False):
+        """
+        Crée une base temporaire contenant des articles longs.
+
+        Avec ``varie``, titres et débuts de contenu sont tirés du
+        vocabulaire (graine fixe) pour que chaque terme recherché ne
+        corresponde qu'à une partie du corpus.
+        """
+        from blog.db_schema import SCHEMA_SQL, DONNEES_INITIALES_SQL
+
+        descripteur, chemin = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(descripteur)
+        paragraphe = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+        hasard = random.Random(42)
+
+        def texte(taille):
+            remplissage = paragraphe * (taille // len(paragraphe))
+            if not varie:
+                return remplissage
+            return " ".join(hasard.sample(self.VOCABULAIRE, 2)) + " " + remplissage
+
+        def titre(numero):
+            if not varie:
+                return f"Article {numero}"
+            return " ".join(hasard.sample(self.VOCABULAIRE, 3)).capitalize()
+
+        connexion = sqlite3.connect(chemin)
+        try:
+            connexion.executescript(SCHEMA_SQL)
+            connexion.executescript(DONNEES_INITIALES_SQL)
+            connexion.executemany(
+                """
+                INSERT INTO articles (
+                    titre, slug, contenu, extrait, type_article, image_url,
+                    temps_lecture, est_publie, est_vedette
+                ) VALUES (?, ?, ?, ?, 'article', ?, 10, 1, ?)
+                """,
+                (
+                    (
+                        titre(numero),
+                        f"article-{numero}",
+                        texte(taille_contenu),
+                        f"Extrait de l'article {numero}",
+                        f"https://example.com/{numero}.jpg",
+                        int(numero % 50 == 0),
+                    )
+                    for numero in range(nombre_articles)
+                ),
+            )
+            connexion.execute(
+                """
+                INSERT INTO article_categories (article_id, categorie_id)
+                SELECT a.id, c.id FROM articles a, categories c
+                WHERE c.id = 1 + a.id % 3
+                """
+            )
+            connexion.commit()
+        finally:
+            connexion.close()
+        return chemin
+
+    def afficher_latences(self, libelle, latences):
+        """Affiche p50, p99 et maximum d'une liste de durées (secondes)."""
+        latences = sorted(latences)
+
+        def centile(rang):
+            return latences[min(len(latences) - 1, int(len(latences) * rang))]
+
+        self.stdout.write(
+            f"  {libelle:<28} p50 {centile(0.50) * 1e6:>9.1f} µs"
+            f"  p99 {centile(0.99) * 1e6:>9.1f} µs"
+            f"  max {latences[-1] * 1e6:>9.1f} µs"
+        )
+
+    def afficher_debit(self, libelle, operations, duree):
+        self.stdout.write(
+            f"  {libelle:<28} {operations / duree:>10.0f} op/s  ({duree:.2f} s)"
+        )
+
+    # =========================================================================
+    # SCÉNARIOS
+    # =========================================================================
+
+    def scenario_pool(self, options):
+        """Compare une connexion par requête avec le pool de connexions."""
+        from blog.db_connexion import obtenir_chemin_db, obtenir_statistiques_pool
+        from blog.db_operations import executer_requete
+
+        requete = "SELECT COUNT(*) FROM categories WHERE est_active = 1"
+        chemin = obtenir_chemin_db()
+        threads, iterations = options["threads"], options["iterations"]
+        operations = threads * iterations
+
+        def sans_pool():
+            connexion = sqlite3.connect(chemin)
+            try:
+                connexion.execute(requete).fetchone()
+            finally:
+                connexion.close()
+
+        def avec_pool():
+            executer_requete(requete, fetchone=True)
+
+        self.stdout.write(f"Base: {chemin}")
+        self.stdout.write(f"{threads} threads x {iterations} requêtes")
+        self.afficher_debit(
+            "Connexion par requête",
+            operations,
+            self.executer_en_parallele(sans_pool, threads, iterations),
+        )
+        self.afficher_debit(
+            "Pool de connexions",
+            operations,
+            self.executer_en_parallele(avec_pool, threads, iterations),
+        )
+
+        statistiques = obtenir_statistiques_pool()
+        self.stdout.write("Compteurs du pool:")
+        for cle, valeur in statistiques.items():
+            if isinstance(valeur, float):
+                valeur = f"{valeur:.2%}"
+            self.stdout.write(f"  {cle:<20} {valeur}")
+
+    def scenario_lecture_concurrente(self, options):
+        """Débit de lecture pendant des écritures continues (DELETE vs WAL)."""
+        from blog.db_connexion import (
+            activer_journal_mode,
+            obtenir_connexion,
+            obtenir_profil_db,
+        )
+
+        lecture = """
+            SELECT a.id, a.titre, a.total_vues
+            FROM articles a
+            WHERE a.est_publie = 1
+            ORDER BY a.total_vues DESC, a.date_creation DESC, a.id DESC
+            LIMIT 6
+        """
+        ecriture = """
+            INSERT INTO statistiques_vues (article_id, nombre_vues, date_vue)
+            VALUES (?, 1, ?)
+            ON CONFLICT(article_id, date_vue)
+            DO UPDATE SET nombre_vues = nombre_vues + 1
+        """
+        duree = options["duree"]
+        self.stdout.write(
+            f"{options['threads']} lecteurs + 1 écrivain pendant {duree:.1f} s"
+        )
+
+        for mode in ("DELETE", "WAL"):
+            chemin = self.copier_base()
+            profil = obtenir_profil_db()
+            connexion = obtenir_connexion(chemin, profil)
+            activer_journal_mode(connexion, mode)
+            connexion.close()
+            compteurs = {"lectures": 0, "ecritures": 0, "verrous": 0}
+            verrou = threading.Lock()
+            # Connexions ouvertes (PRAGMAs appliqués) avant le départ commun
+            depart = threading.Barrier(options["threads"] + 1)
+            fin = time.monotonic() + duree
+
+            def compter(cle):
+                with verrou:
+                    compteurs[cle] += 1
+
+            def lecteur():
+                connexion = obtenir_connexion(chemin, profil)
+                depart.wait()
+                while time.monotonic() < fin:
+                    try:
+                        connexion.execute(lecture).fetchall()
+                        compter("lectures")
+                    except sqlite3.OperationalError:
+                        compter("verrous")
+                connexion.close()
+
+            def ecrivain():
+                connexion = obtenir_connexion(chemin, profil)
+                depart.wait()
+                jour = 0
+                while time.monotonic() < fin:
+                    try:
+                        connexion.execute(ecriture, (1, f"bench-{jour % 30}"))
+                        connexion.commit()
+                        compter("ecritures")
+                    except sqlite3.OperationalError:
+                        connexion.rollback()
+                        compter("verrous")
+                    jour += 1
+                connexion.close()
+
+            fils = [threading.Thread(target=lecteur) for _ in range(options["threads"])]
+            fils.append(threading.Thread(target=ecrivain))
+            for fil in fils:
+                fil.start()
+            for fil in fils:
+                fil.join()
+            self.supprimer_base(chemin)
+
+            self.stdout.write(
+                f"  journal_mode={mode:<7} "
+                f"{compteurs['lectures'] / duree:>9.0f} lectures/s  "
+                f"{compteurs['ecritures'] / duree:>7.0f} écritures/s  "
+                f"{compteurs['verrous']} erreurs de verrou"
+            )
+
+    def scenario_mappers(self, options):
+        """Compare les dictionnaires positionnels et les mappeurs générés."""
+        from blog.db_connexion import obtenir_connexion
+        from blog.db_mappers import (
+            FORME_DICT,
+            FORME_ENREGISTREMENT,
+            obtenir_mappeur,
+        )
+
+        requete = "SELECT a.* FROM articles a"
+
+        def positionnel(description):
+            # Ancienne construction à la main (référence)
+            def convertir(row):
+                return {
+                    "id": row[0],
+                    "titre": row[1],
+                    "slug": row[2],
+                    "contenu": row[3],
+                    "extrait": row[4],
+                    "type_article": row[5],
+                    "image_url": row[6],
+                    "banniere_url": row[7],
+                    "auteur": row[8],
+                    "temps_lecture": row[9],
+                    "est_vedette": row[10],
+                    "est_populaire": row[11],
+                    "est_nouveau": row[12],
+                    "est_publie": row[13],
+                    "ordre_affichage": row[14],
+                    "meta_keywords": row[15],
+                    "meta_description": row[16],
+                    "date_publication": row[17],
+                    "date_creation": row[18],
+                    "date_modification": row[19],
+                    "categories_noms": row[20],
+                    "categories_ids": row[21],
+                }
+
+            return convertir
+
+        variantes = [
+            ("Dictionnaire positionnel", positionnel),
+            (
+                "Mappeur dict",
+                lambda d: obtenir_mappeur(d, FORME_DICT),
+            ),
+            (
+                "Mappeur __slots__",
+                lambda d: obtenir_mappeur(d, FORME_ENREGISTREMENT),
+            ),
+        ]
+
+        connexion = obtenir_connexion()
+        try:
+            curseur = connexion.execute(requete)
+            lignes = curseur.fetchall()
+            description = curseur.description
+        finally:
+            connexion.close()
+
+        if not lignes:
+            self.stdout.write(self.style.WARNING("Aucun article dans la base."))
+            return
+
+        # Au moins 1000 lignes par passe pour mesurer le coût par ligne
+        lignes = lignes * max(1, 1000 // len(lignes))
+        iterations = options["iterations"]
+        self.stdout.write(
+            f"{len(lignes)} lignes x {iterations} passes (conversion seule)"
+        )
+        for libelle, fabrique in variantes:
+            debut = time.perf_counter()
+            for _ in range(iterations):
+                convertir = fabrique(description)
+                [convertir(ligne) for ligne in lignes]
+            duree = time.perf_counter() - debut
+
+            convertir = fabrique(description)
+            tracemalloc.start()
+            resultats = [convertir(ligne) for ligne in lignes]
+            memoire, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del resultats
+
+            self.stdout.write(
+                f"  {libelle:<28} {len(lignes) * iterations / duree:>10.0f} lignes/s"
+                f"  {memoire / len(lignes):>6.0f} octets/ligne"
+            )
+
+    def scenario_projection(self, options):
+        """Octets lus et latence des pages de liste selon la projection."""
+        from blog.db_connexion import unite_de_travail, obtenir_pool
+        from blog.db_operations import (
+            obtenir_tous_articles,
+            obtenir_derniers_articles,
+            obtenir_articles_vedettes,
+        )
+
+        pages = [
+            (
+                "Liste (100 articles)",
+                lambda p: obtenir_tous_articles(limite=100, est_publie=1, projection=p),
+            ),
+            (
+                "Accueil derniers (6)",
+                lambda p: obtenir_derniers_articles(limite=6, projection=p),
+            ),
+            (
+                "Accueil vedettes (6)",
+                lambda p: obtenir_articles_vedettes(limite=6, projection=p),
+            ),
+        ]
+
+        chemin = self.creer_base_corpus(options["corpus"])
+        iterations = max(1, options["iterations"] // 10)
+        self.stdout.write(
+            f"{options['corpus']} articles de ~20 Ko, {iterations} passes par page"
+        )
+        try:
+            for libelle, page in pages:
+                for projection in ("detail", "carte"):
+                    with unite_de_travail(chemin):
+                        page(projection)  # préchauffage du cache SQLite
+                        debut = time.perf_counter()
+                        for _ in range(iterations):
+                            lignes = page(projection)
+                        duree = time.perf_counter() - debut
+
+                    octets = sum(
+                        len(valeur.encode()) if isinstance(valeur, str) else 8
+                        for ligne in lignes
+                        for valeur in ligne.values()
+                        if valeur is not None
+                    )
+                    self.stdout.write(
+                        f"  {libelle:<22} {projection:<7}"
+                        f" {duree / iterations * 1000:>8.2f} ms/page"
+                        f" {octets / 1024:>10.1f} Kio/page"
+                    )
+        finally:
+            obtenir_pool(chemin).vider()
+            self.supprimer_base(chemin)
+
+    def scenario_requetes_page(self, options):
+        """Requêtes SQL par page, sans puis avec le cache versionné."""
+        from django.test import Client, override_settings
+        from blog.cache import obtenir_cache, obtenir_configuration_cache
+
+        pages = ["/", "/articles/", "/livres/", "/a-propos/", "/contact/"]
+        configuration = obtenir_configuration_cache()
+
+        self.stdout.write(f"  {'page':<16} {'sans cache':>10} {'avec cache':>10}")
+        resultats = {}
+        for actif in (False, True):
+            obtenir_cache().vider()
+            with override_settings(
+                ALLOWED_HOSTS=["*"],
+                BLOG_COMPTER_REQUETES=True,
+                BLOG_CACHE=dict(configuration, ACTIF=actif),
+            ):
+                client = Client(raise_request_exception=False)
+                for page in pages:
+                    client.get(page)  # remplissage du cache
+                    reponse = client.get(page)
+                    resultats[page, actif] = reponse.get("X-Requetes-SQL", "-")
+
+        for page in pages:
+            self.stdout.write(
+                f"  {page:<16} {resultats[page, False]:>10} {resultats[page, True]:>10}"
+            )
+
+    def scenario_recherche(self, options):
+        """Latence de la recherche: LIKE, FTS5 et recherche classée commune."""
+        from blog.db_connexion import unite_de_travail, obtenir_pool
+        from blog.db_operations import (
+            _rechercher_articles_like,
+            rechercher_articles,
+            rechercher_contenus,
+        )
+
+        termes = ["éducation", "pédagogie numérique", "réfor", "introuvable"]
+        variantes = [
+            ("LIKE", lambda t: _rechercher_articles_like(t, 20, "carte")),
+            ("FTS5 bm25", lambda t: rechercher_articles(t, limite=20)),
+            ("classée", lambda t: rechercher_contenus(t)["resultats"]),
+        ]
+
+        debut = time.perf_counter()
+        chemin = self.creer_base_corpus(options["corpus"], 2000, varie=True)
+        self.stdout.write(
+            f"{options['corpus']} articles de ~2 Ko "
+            f"(création et indexation: {time.perf_counter() - debut:.1f} s)"
+        )
+        iterations = max(1, options["iterations"] // 100)
+        try:
+            for terme in termes:
+                for libelle, rechercher in variantes:
+                    with unite_de_travail(chemin):
+                        lignes = rechercher(terme)  # préchauffage
+                        debut = time.perf_counter()
+                        for _ in range(iterations):
+                            rechercher(terme)
+                        duree = time.perf_counter() - debut
+                    octets = sum(
+                        len(valeur.encode()) if isinstance(valeur, str) else 8
+                        for ligne in lignes
+                        for valeur in ligne.values()
+                        if valeur is not None
+                    )
+                    self.stdout.write(
+                        f"  {terme!r:<24} {libelle:<10}"
+                        f" {duree / iterations * 1000:>9.2f} ms"
+                        f" {len(lignes):>4} résultats"
+                        f" {octets / max(1, len(lignes)):>7.0f} octets/résultat"
+                    )
+        finally:
+            obtenir_pool(chemin).vider()
+            self.supprimer_base(chemin)
+
+    def scenario_autocompletion(self, options):
+        """Test de charge de l'autocomplétion: index mémoire contre SQL."""
+        from blog import autocompletion
+        from blog.db_connexion import unite_de_travail, obtenir_pool
+        from blog.db_operations import rechercher_articles, rechercher_livres
+
+        hasard = random.Random(7)
+        saisies = [
+            mot[: hasard.randint(2, len(mot))]
+            for mot in hasard.choices(self.VOCABULAIRE, k=1000)
+        ]
+        chemin = self.creer_base_corpus(options["corpus"], 500, varie=True)
+        threads = options["threads"]
+        iterations = max(1, options["iterations"] // 10)
+
+        def mesurer(rechercher, iterations):
+            latences = []
+            verrou = threading.Lock()
+
+            def travailleur():
+                mesures = []
+                with unite_de_travail(chemin):
+                    for numero in range(iterations):
+                        saisie = saisies[numero % len(saisies)]
+                        debut = time.perf_counter()
+                        rechercher(saisie)
+                        mesures.append(time.perf_counter() - debut)
+                with verrou:
+                    latences.extend(mesures)
+
+            duree = self.executer_en_parallele(travailleur, threads, 1)
+            return latences, duree
+
+        variantes = [
+            (
+                "SQL (FTS5 articles + livres)",
+                lambda t: (rechercher_articles(t, 5), rechercher_livres(t, 5)),
+                max(1, iterations // 10),
+            ),
+            ("autocompleter()", autocompletion.autocompleter, iterations),
+        ]
+        try:
+            autocompletion._index = autocompletion._version_index = None
+            with unite_de_travail(chemin):
+                debut = time.perf_counter()
+                index = autocompletion.obtenir_index_autocompletion()
+                construction = time.perf_counter() - debut
+            self.stdout.write(
+                f"{len(index)} contenus indexés en {construction * 1000:.0f} ms, "
+                f"{threads} threads"
+            )
+            for libelle, rechercher, nombre in variantes:
+                latences, duree = mesurer(rechercher, nombre)
+                self.afficher_latences(libelle, latences)
+                self.afficher_debit("  débit", len(latences), duree)
+
+            debut = time.perf_counter()
+            latences = []
+            for saisie in saisies * max(1, iterations // len(saisies)):
+                avant = time.perf_counter()
+                index.rechercher(saisie)
+                latences.append(time.perf_counter() - avant)
+            self.afficher_latences("index.rechercher() seul", latences)
+        finally:
+            autocompletion._index = autocompletion._version_index = None
+            obtenir_pool(chemin).vider()
+            self.supprimer_base(chemin)
+
+    def scenario_pagination(self, options):
+        """Coût d'une page selon sa profondeur: OFFSET contre curseur."""
+        from blog.db_connexion import unite_de_travail, obtenir_pool
+        from blog.db_operations import (
+            PROJECTIONS_ARTICLES,
+            encoder_curseur,
+            executer_requete,
+            lire_lignes,
+            paginer_articles,
+        )
+
+        par_page = 12
+        requete_offset = f"""
+            SELECT {PROJECTIONS_ARTICLES["carte"]}
+            FROM articles a
+            ORDER BY a.ordre_affichage ASC, a.date_creation DESC, a.id DESC
+            LIMIT ? OFFSET ?
+        """
+        chemin = self.creer_base_corpus(options["corpus"], 500)
+        iterations = max(1, options["iterations"] // 100)
+        self.stdout.write(f"{options['corpus']} articles, {par_page} par page")
+        try:
+            with unite_de_travail(chemin):
+                for profondeur in (0, 0.5, 0.99):
+                    position = int(options["corpus"] * profondeur)
+                    curseur = None
+                    if position:
+                        ligne = executer_requete(
+                            """
+                            SELECT ordre_affichage, date_creation, id FROM articles
+                            ORDER BY ordre_affichage ASC, date_creation DESC, id DESC
+                            LIMIT 1 OFFSET ?
+                            """,
+                            (position - 1,),
+                            fetchone=True,
+                        )
+                        curseur = encoder_curseur(tuple(ligne))
+
+                    for libelle, lire in (
+                        ("OFFSET", lambda: lire_lignes(requete_offset, (par_page, position))),
+                        ("curseur", lambda: paginer_articles(par_page, apres=curseur)),
+                    ):
+                        lire()
+                        debut = time.perf_counter()
+                        for _ in range(iterations):
+                            lire()
+                        duree = time.perf_counter() - debut
+                        self.stdout.write(
+                            f"  page {position // par_page + 1:>7} {libelle:<8}"
+                            f" {duree / iterations * 1000:>9.2f} ms"
+                        )
+        finally:
+            obtenir_pool(chemin).vider()
+            self.supprimer_base(chemin)
@@ -0,0 +1,87 @@
+"""
+Commande de compaction de l'historique des vues et des téléchargements.
+
+Regroupe par mois les lignes de statistiques_vues et de telechargements
+sorties de la fenêtre détaillée (settings.BLOG_HISTORIQUE), un mois par
+transaction, du plus ancien au plus récent. Les totaux (articles.total_vues,
+livres.total_vues, compteurs_globaux) ne changent pas. La commande peut
+être interrompue et relancée, par exemple chaque nuit par cron.
+
+Usage:
+    python manage.py compacter_historique
+    python manage.py compacter_historique --simulation
+    python manage.py compacter_historique --lots 3
+    python manage.py compacter_historique --jours-vues 30
+"""
+
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Regroupe par mois l'historique détaillé des vues et des téléchargements"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--jours-vues",
+            type=int,
+            default=None,
+            help="Jours de vues détaillées gardés (défaut: BLOG_HISTORIQUE)",
+        )
+        parser.add_argument(
+            "--jours-telechargements",
+            type=int,
+            default=None,
+            help="Jours de téléchargements détaillés gardés (défaut: BLOG_HISTORIQUE)",
+        )
+        parser.add_argument(
+            "--lots",
+            type=int,
+            default=None,
+            help="Nombre maximal de mois regroupés par table",
+        )
+        parser.add_argument(
+            "--simulation",
+            action="store_true",
+            help="Affiche les mois à regrouper sans rien modifier",
+        )
+
+    def handle(self, *args, **options):
+        from blog.db_operations import (
+            compacter_mois,
+            lister_mois_a_compacter,
+            obtenir_configuration_historique,
+        )
+
+        configuration = obtenir_configuration_historique()
+        fenetres = {
+            "statistiques_vues": options["jours_vues"] or configuration["JOURS_VUES"],
+            "telechargements": (
+                options["jours_telechargements"]
+                or configuration["JOURS_TELECHARGEMENTS"]
+            ),
+        }
+
+        total = 0
+        for table, jours in fenetres.items():
+            limite = date.today() - timedelta(days=jours)
+            mois = lister_mois_a_compacter(table, limite, options["lots"])
+            self.stdout.write(
+                f"{table}: {len(mois)} mois avant {limite.replace(day=1)} "
+                f"({jours} jours détaillés)"
+            )
+            for debut, fin in mois:
+                if options["simulation"]:
+                    self.stdout.write(f"  {debut[:7]}")
+                    continue
+                lignes = compacter_mois(table, debut, fin)
+                total += lignes
+                self.stdout.write(f"  {debut[:7]}: {lignes} ligne(s) regroupée(s)")
+
+        if options["simulation"]:
+            self.stdout.write("Simulation: aucune ligne modifiée.")
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"{total} ligne(s) détaillée(s) regroupée(s).")
+            )
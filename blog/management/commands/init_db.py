@@ -23,58 +23,21 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        from blog.db_schema import SCHEMA_SQL, DONNEES_INITIALES_SQL, DONNEES_DEMO_SQL
+        from blog.db_migrations import initialiser_base
         
         chemin_db = settings.DATABASES['default']['NAME']
         self.stdout.write(f'Base de données: {chemin_db}')
         
         connexion = sqlite3.connect(chemin_db)
-        curseur = connexion.cursor()
         
         try:
-            if options['reset']:
-                self.stdout.write('Suppression des tables existantes...')
-                tables = [
-                    'statistiques_vues',
-                    'article_categories',
-                    'articles',
-                    'services',
-                    'categories',
-                    'liens_footer',
-                    'configuration_site',
-                    'reseaux_sociaux',
-                    'rendez_vous',
-                    'messages_contact',
-                    # anciennes tables
-                    'contenu_categories',
-                    'contenus',
-                ]
-                for table in tables:
-                    try:
-                        curseur.execute(f'DROP TABLE IF EXISTS {table}')
-                    except Exception:
-                        pass
-                connexion.commit()
-                self.stdout.write(self.style.SUCCESS('Tables supprimées.'))
-            
-            # Créer le schéma
-            self.stdout.write('Création du schéma...')
-            curseur.executescript(SCHEMA_SQL)
-            connexion.commit()
-            self.stdout.write(self.style.SUCCESS('Schéma créé avec succès.'))
-            
-            # Insérer les données initiales
-            self.stdout.write('Insertion des données initiales...')
-            curseur.executescript(DONNEES_INITIALES_SQL)
-            connexion.commit()
-            self.stdout.write(self.style.SUCCESS('Données initiales insérées.'))
-            
-            # Données de démo si demandé
-            if options['demo']:
-                self.stdout.write('Insertion des données de démonstration...')
-                curseur.executescript(DONNEES_DEMO_SQL)
-                connexion.commit()
-                self.stdout.write(self.style.SUCCESS('Données de démonstration insérées.'))
+            mode = initialiser_base(
+                connexion,
+                reset=options['reset'],
+                demo=options['demo'],
+                journal=self.stdout.write,
+            )
+            self.stdout.write(f'Mode de journal: {mode}')
             
             self.stdout.write(self.style.SUCCESS('✅ Base de données initialisée avec succès!'))
             
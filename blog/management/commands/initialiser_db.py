@@ -30,66 +30,39 @@ class Command(BaseCommand):
         )
     
     def handle(self, *args, **options):
-        from blog.db_schema import (
-            SCHEMA_SQL,
-            DONNEES_INITIALES_SQL,
-            DONNEES_DEMO_SQL
-        )
+        from blog.db_migrations import initialiser_base
         
         chemin_db = settings.DATABASES['default']['NAME']
         self.stdout.write(f"Initialisation de la base de données: {chemin_db}")
         
+        conn = sqlite3.connect(chemin_db)
         try:
-            conn = sqlite3.connect(chemin_db)
-            curseur = conn.cursor()
-            
-            # Option de reset
-            if options['reset']:
-                self.stdout.write(self.style.WARNING('Suppression des tables existantes...'))
-                tables = [
-                    'statistiques_vues',
-                    'contenu_categories',
-                    'contenus',
-                    'categories',
-                    'liens_footer',
-                    'configuration_site',
-                    'reseaux_sociaux',
-                ]
-                for table in tables:
-                    curseur.execute(f"DROP TABLE IF EXISTS {table}")
-                conn.commit()
-            
-            # Création du schéma
-            self.stdout.write('Création des tables...')
-            curseur.executescript(SCHEMA_SQL)
-            conn.commit()
-            self.stdout.write(self.style.SUCCESS('✓ Tables créées avec succès'))
-            
-            # Données initiales
-            self.stdout.write('Insertion des données initiales...')
-            curseur.executescript(DONNEES_INITIALES_SQL)
-            conn.commit()
-            self.stdout.write(self.style.SUCCESS('✓ Données initiales insérées'))
-            
-            # Données de démonstration
-            if options['demo']:
-                self.stdout.write('Insertion des données de démonstration...')
-                curseur.executescript(DONNEES_DEMO_SQL)
-                conn.commit()
-                self.stdout.write(self.style.SUCCESS('✓ Données de démonstration insérées'))
+            # Même chemin que init_db (schéma, migrations, mode de journal)
+            mode = initialiser_base(
+                conn,
+                reset=options['reset'],
+                demo=options['demo'],
+                journal=self.stdout.write,
+            )
             
             # Afficher les statistiques
+            curseur = conn.cursor()
             curseur.execute("SELECT COUNT(*) FROM categories")
             nb_categories = curseur.fetchone()[0]
             
-            curseur.execute("SELECT COUNT(*) FROM contenus")
-            nb_contenus = curseur.fetchone()[0]
+            curseur.execute("SELECT COUNT(*) FROM articles")
+            nb_articles = curseur.fetchone()[0]
+            
+            curseur.execute("SELECT COUNT(*) FROM livres")
+            nb_livres = curseur.fetchone()[0]
             
             self.stdout.write('')
             self.stdout.write(self.style.SUCCESS('═' * 50))
             self.stdout.write(self.style.SUCCESS('Base de données initialisée avec succès!'))
             self.stdout.write(f'  • {nb_categories} catégories')
-            self.stdout.write(f'  • {nb_contenus} contenus')
+            self.stdout.write(f'  • {nb_articles} articles')
+            self.stdout.write(f'  • {nb_livres} livres')
+            self.stdout.write(f'  • mode de journal: {mode}')
             self.stdout.write(self.style.SUCCESS('═' * 50))
             
         except Exception as e:
@@ -0,0 +1,109 @@
+"""
+Commande d'application des migrations du schéma SQL brut.
+
+Applique les migrations de blog/migrations_sql absentes de la table
+schema_version, une transaction par migration, sans arrêter le site.
+
+Usage:
+    python manage.py migrer_db
+    python manage.py migrer_db --simulation
+    python manage.py migrer_db --etat
+    python manage.py migrer_db --jusqua 4
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Applique les migrations du schéma SQL en attente"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--simulation",
+            action="store_true",
+            help="Affiche les instructions en attente sans les exécuter",
+        )
+        parser.add_argument(
+            "--etat",
+            action="store_true",
+            help="Liste les migrations appliquées et en attente",
+        )
+        parser.add_argument(
+            "--jusqua",
+            type=int,
+            default=None,
+            help="Numéro de la dernière migration à appliquer",
+        )
+
+    def handle(self, *args, **options):
+        from blog.db_connexion import (
+            activer_journal_mode,
+            obtenir_chemin_db,
+            obtenir_connexion,
+        )
+        from blog.db_migrations import (
+            analyser_instruction,
+            appliquer_migrations,
+            lister_migrations,
+            migrations_en_attente,
+            versions_appliquees,
+        )
+
+        self.stdout.write(f"Base de données: {obtenir_chemin_db()}")
+        connexion = obtenir_connexion()
+        try:
+            if options["etat"]:
+                appliquees = versions_appliquees(connexion)
+                for migration in lister_migrations():
+                    marque = "x" if migration.version in appliquees else " "
+                    self.stdout.write(
+                        f"  [{marque}] {migration.version:04d}_{migration.nom}"
+                        f"  {migration.description}"
+                    )
+                return
+
+            en_attente = migrations_en_attente(connexion, cible=options["jusqua"])
+            if not en_attente:
+                activer_journal_mode(connexion)
+                self.stdout.write(self.style.SUCCESS("Schéma à jour."))
+                return
+
+            if options["simulation"]:
+                for migration in en_attente:
+                    self.afficher(migration, analyser_instruction)
+                self.stdout.write(
+                    f"{len(en_attente)} migration(s) en attente (simulation)."
+                )
+                return
+
+            try:
+                appliquees = appliquer_migrations(
+                    connexion,
+                    cible=options["jusqua"],
+                    journal=lambda ligne: self.stdout.write(f"  {ligne}"),
+                )
+            except Exception as e:
+                raise CommandError(f"Migration interrompue: {e}") from e
+            self.stdout.write(
+                self.style.SUCCESS(f"{len(appliquees)} migration(s) appliquée(s).")
+            )
+            self.stdout.write(f"Mode de journal: {activer_journal_mode(connexion)}")
+        finally:
+            connexion.close()
+
+    def afficher(self, migration, analyser_instruction):
+        """Affiche une migration en attente et ses instructions."""
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"{migration.version:04d}_{migration.nom}: {migration.description}"
+            )
+        )
+        for table, colonne, definition in migration.colonnes():
+            self.stdout.write(f"  ALTER TABLE {table} ADD COLUMN {colonne} {definition}")
+        for instruction in migration.instructions():
+            self.stdout.write(f"  {' '.join(instruction.split())[:110]}")
+            raison = analyser_instruction(instruction)
+            if raison:
+                self.stdout.write(self.style.WARNING(f"    ! bloque les écritures: {raison}"))
+        if migration.format == "py":
+            self.stdout.write(f"  (code Python de {migration.chemin.name})")
@@ -0,0 +1,56 @@
+"""
+Commande affichant le profil SQLite actif de la base du blog.
+
+Compare les PRAGMAs configurés (settings.BLOG_DB_PROFIL) avec les
+valeurs effectivement actives sur une connexion ouverte par le blog.
+
+Usage:
+    python manage.py profil_db
+"""
+
+import sqlite3
+
+from django.core.management.base import BaseCommand
+
+
+# Valeurs numériques renvoyées par SQLite pour les PRAGMAs énumérés
+VALEURS_SYMBOLIQUES = {
+    "synchronous": {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"},
+    "temp_store": {0: "DEFAULT", 1: "FILE", 2: "MEMORY"},
+}
+
+
+class Command(BaseCommand):
+    help = "Affiche les PRAGMAs configurés et actifs de la base SQLite"
+
+    def handle(self, *args, **options):
+        from blog.db_connexion import (
+            obtenir_chemin_db,
+            obtenir_connexion,
+            obtenir_profil_db,
+            lire_profil,
+            PRAGMAS_AUTORISES,
+        )
+
+        profil = obtenir_profil_db()
+        self.stdout.write(f"Base de données: {obtenir_chemin_db()}")
+        self.stdout.write(f"Version SQLite: {sqlite3.sqlite_version}")
+        self.stdout.write("")
+        self.stdout.write(f"  {'PRAGMA':<14} {'configuré':<12} {'actif':<12}")
+
+        connexion = obtenir_connexion()
+        try:
+            actifs = lire_profil(connexion)
+        finally:
+            connexion.close()
+
+        for pragma in PRAGMAS_AUTORISES:
+            actif = actifs[pragma]
+            actif = VALEURS_SYMBOLIQUES.get(pragma, {}).get(actif, actif)
+            configure = profil.get(pragma, "-")
+
+            ligne = f"  {pragma:<14} {str(configure):<12} {str(actif):<12}"
+            if configure != "-" and str(configure).upper() != str(actif).upper():
+                self.stdout.write(self.style.WARNING(ligne + " (différent)"))
+            else:
+                self.stdout.write(ligne)
@@ -0,0 +1,52 @@
+"""
+Commande de recalcul des scores de tendance (articles et livres populaires).
+
+Les triggers "tendances_*" tiennent les scores à jour à chaque vue et
+téléchargement. Cette commande les recalcule sur tout l'historique avec
+la configuration courante (settings.BLOG_TENDANCES) et recale l'époque
+des poids à aujourd'hui. À lancer après un changement de configuration;
+l'époque est par ailleurs recalée automatiquement avant l'écriture des vues
+et des téléchargements (RECALAGE_DEMI_VIES).
+
+Usage:
+    python manage.py recalculer_tendances
+    python manage.py recalculer_tendances --limite 10
+"""
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Recalcule les scores de tendance à partir de l'historique"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limite",
+            type=int,
+            default=5,
+            help="Nombre d'articles et de livres affichés après le recalcul",
+        )
+
+    def handle(self, *args, **options):
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import (
+            obtenir_articles_populaires,
+            obtenir_livres_populaires,
+            recalculer_tendances,
+        )
+
+        parametres = recalculer_tendances()
+        self.stdout.write(
+            f"Époque {parametres['epoque']}, demi-vie {parametres['demi_vie']:g} jours, "
+            f"téléchargement = {parametres['poids_telechargement']:g} vues"
+        )
+
+        with unite_de_travail():
+            articles = obtenir_articles_populaires(limite=options["limite"])
+            livres = obtenir_livres_populaires(limite=options["limite"])
+        for titre, contenus in (("Articles", articles), ("Livres", livres)):
+            self.stdout.write(f"{titre} populaires:")
+            for contenu in contenus:
+                self.stdout.write(f"  {contenu['titre']}")
+
+        self.stdout.write(self.style.SUCCESS("Scores de tendance recalculés."))
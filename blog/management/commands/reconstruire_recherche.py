@@ -0,0 +1,31 @@
+"""
+Commande de reconstruction des index de recherche plein texte.
+
+Les index articles_fts et livres_fts sont tenus à jour par les triggers
+"recherche_*". Après une écriture qui les a contournés (import direct,
+restauration partielle, trigger supprimé), les résultats ne suivent
+plus les contenus: la commande relit toutes les lignes des tables
+articles et livres, en une transaction.
+
+Usage:
+    python manage.py reconstruire_recherche
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les index plein texte des articles et des livres"
+
+    def handle(self, *args, **options):
+        from blog.db_operations import reconstruire_index_recherche
+
+        debut = time.perf_counter()
+        reconstruire_index_recherche()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Index de recherche reconstruits en {time.perf_counter() - debut:.1f} s."
+            )
+        )
@@ -0,0 +1,71 @@
+"""
+Commande de vérification des statistiques globales matérialisées.
+
+Recalcule les statistiques à partir des tables et les compare avec
+la table compteurs_globaux tenue à jour par les triggers.
+
+Usage:
+    python manage.py verifier_compteurs
+    python manage.py verifier_compteurs --corriger
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Compare compteurs_globaux avec les valeurs recalculées"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--corriger",
+            action="store_true",
+            help="Réécrit compteurs_globaux avec les valeurs recalculées",
+        )
+
+    def handle(self, *args, **options):
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import (
+            COMPTEURS_GLOBAUX,
+            corriger_compteurs_globaux,
+            lire_ligne,
+            recalculer_statistiques_globales,
+        )
+
+        with unite_de_travail():
+            materialises = (
+                lire_ligne("SELECT * FROM compteurs_globaux WHERE id = 1") or {}
+            )
+            recalcules = recalculer_statistiques_globales()
+
+        self.stdout.write(f"  {'compteur':<18} {'matérialisé':>12} {'recalculé':>12}")
+        ecarts = []
+        for nom in COMPTEURS_GLOBAUX:
+            valeur = materialises.get(nom)
+            ligne = f"  {nom:<18} {str(valeur):>12} {str(recalcules[nom]):>12}"
+            if not self.egales(valeur, recalcules[nom]):
+                ecarts.append(nom)
+                self.stdout.write(self.style.WARNING(ligne + " (écart)"))
+            else:
+                self.stdout.write(ligne)
+
+        if not ecarts:
+            self.stdout.write(self.style.SUCCESS("Compteurs à jour."))
+            return
+
+        if options["corriger"]:
+            with unite_de_travail():
+                corriger_compteurs_globaux()
+            self.stdout.write(
+                self.style.SUCCESS(f"{len(ecarts)} compteur(s) corrigé(s).")
+            )
+        else:
+            raise CommandError(
+                f"{len(ecarts)} compteur(s) en écart: {', '.join(ecarts)} "
+                f"(relancer avec --corriger)"
+            )
+
+    def egales(self, materialise, recalcule):
+        """Compare deux compteurs (au centime près pour les montants)."""
+        if materialise is None:
+            return False
+        return abs(materialise - recalcule) < 0.005
@@ -0,0 +1,50 @@
+"""
+Middlewares pour le Blog Académique.
+
+Ce module fournit le middleware d'unité de travail: chaque requête HTTP
+utilise une seule connexion SQLite et une seule transaction.
+"""
+
+import logging
+
+from django.conf import settings
+
+from blog.db_connexion import obtenir_unite_courante, unite_de_travail
+
+logger = logging.getLogger(__name__)
+
+
+class UniteDeTravailMiddleware:
+    """
+    Ouvre une unité de travail autour de chaque requête HTTP.
+
+    Toutes les écritures de la requête sont validées en une seule fois
+    après la vue. La transaction est annulée si la vue lève une
+    exception ou si la réponse est une erreur serveur (5xx).
+
+    Si ``settings.BLOG_COMPTER_REQUETES`` est actif, le nombre de
+    requêtes SQL de la page est ajouté à la réponse (en-tête
+    ``X-Requetes-SQL``) et journalisé.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.compter_requetes = getattr(settings, "BLOG_COMPTER_REQUETES", False)
+
+    def __call__(self, request):
+        with unite_de_travail() as unite:
+            response = self.get_response(request)
+            if response.status_code >= 500:
+                unite.demander_annulation()
+
+        if self.compter_requetes:
+            response["X-Requetes-SQL"] = str(unite.nombre_requetes)
+            logger.debug(f"{request.path}: {unite.nombre_requetes} requêtes SQL")
+        return response
+
+    def process_exception(self, request, exception):
+        unite = obtenir_unite_courante()
+        if unite is not None:
+            logger.warning(f"Transaction annulée après une exception: {exception}")
+            unite.demander_annulation()
+        return None
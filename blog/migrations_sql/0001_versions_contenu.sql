@@ -0,0 +1,11 @@
+-- Versions des contenus pour l'invalidation des caches de résultats
+
+-- ============================================================================
+-- TABLE: versions_contenu
+-- Description: Numéros de version des contenus (invalidation des caches)
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS versions_contenu (
+    cle VARCHAR(50) PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    date_modification TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,186 @@
+-- Statistiques globales matérialisées et triggers de mise à jour
+
+-- ============================================================================
+-- TABLE: compteurs_globaux
+-- Description: Statistiques globales matérialisées (une seule ligne),
+-- tenues à jour par les triggers "compteurs_*" ci-dessous
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS compteurs_globaux (
+    id INTEGER PRIMARY KEY CHECK(id = 1),
+    total_articles INTEGER NOT NULL DEFAULT 0,
+    total_livres INTEGER NOT NULL DEFAULT 0,
+    total_categories INTEGER NOT NULL DEFAULT 0,
+    total_achats INTEGER NOT NULL DEFAULT 0,
+    messages_non_lus INTEGER NOT NULL DEFAULT 0,
+    total_abonnes INTEGER NOT NULL DEFAULT 0,
+    revenus_totaux DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    total_vues INTEGER NOT NULL DEFAULT 0
+);
+
+-- Valeurs initiales calculées sur les données existantes
+INSERT OR IGNORE INTO compteurs_globaux (
+    id, total_articles, total_livres, total_categories, total_achats,
+    messages_non_lus, total_abonnes, revenus_totaux, total_vues
+) SELECT
+    1,
+    (SELECT COUNT(*) FROM articles WHERE est_publie = 1),
+    (SELECT COUNT(*) FROM livres WHERE est_publie = 1),
+    (SELECT COUNT(*) FROM categories WHERE est_active = 1),
+    (SELECT COUNT(*) FROM achats),
+    (SELECT COUNT(*) FROM messages_contact WHERE est_lu = 0),
+    (SELECT COUNT(*) FROM abonnes_newsletter WHERE est_actif = 1),
+    (SELECT COALESCE(SUM(montant), 0) FROM achats WHERE statut = 'paye'),
+    (SELECT COALESCE(SUM(nombre_vues), 0) FROM statistiques_vues);
+
+-- ============================================================================
+-- TRIGGERS des compteurs globaux (table compteurs_globaux)
+-- ============================================================================
+CREATE TRIGGER IF NOT EXISTS compteurs_articles_insertion
+AFTER INSERT ON articles
+BEGIN
+    UPDATE compteurs_globaux SET total_articles = total_articles + (NEW.est_publie = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_articles_suppression
+AFTER DELETE ON articles
+BEGIN
+    UPDATE compteurs_globaux SET total_articles = total_articles - (OLD.est_publie = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_articles_modification
+AFTER UPDATE OF est_publie ON articles
+BEGIN
+    UPDATE compteurs_globaux
+    SET total_articles = total_articles + (NEW.est_publie = 1) - (OLD.est_publie = 1)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_livres_insertion
+AFTER INSERT ON livres
+BEGIN
+    UPDATE compteurs_globaux SET total_livres = total_livres + (NEW.est_publie = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_livres_suppression
+AFTER DELETE ON livres
+BEGIN
+    UPDATE compteurs_globaux SET total_livres = total_livres - (OLD.est_publie = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_livres_modification
+AFTER UPDATE OF est_publie ON livres
+BEGIN
+    UPDATE compteurs_globaux
+    SET total_livres = total_livres + (NEW.est_publie = 1) - (OLD.est_publie = 1)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_categories_insertion
+AFTER INSERT ON categories
+BEGIN
+    UPDATE compteurs_globaux SET total_categories = total_categories + (NEW.est_active = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_categories_suppression
+AFTER DELETE ON categories
+BEGIN
+    UPDATE compteurs_globaux SET total_categories = total_categories - (OLD.est_active = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_categories_modification
+AFTER UPDATE OF est_active ON categories
+BEGIN
+    UPDATE compteurs_globaux
+    SET total_categories = total_categories + (NEW.est_active = 1) - (OLD.est_active = 1)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_achats_insertion
+AFTER INSERT ON achats
+BEGIN
+    UPDATE compteurs_globaux SET
+        total_achats = total_achats + 1,
+        revenus_totaux = revenus_totaux
+            + (CASE WHEN NEW.statut = 'paye' THEN NEW.montant ELSE 0 END)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_achats_suppression
+AFTER DELETE ON achats
+BEGIN
+    UPDATE compteurs_globaux SET
+        total_achats = total_achats - 1,
+        revenus_totaux = revenus_totaux
+            - (CASE WHEN OLD.statut = 'paye' THEN OLD.montant ELSE 0 END)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_achats_modification
+AFTER UPDATE OF statut, montant ON achats
+BEGIN
+    UPDATE compteurs_globaux SET
+        revenus_totaux = revenus_totaux
+            + (CASE WHEN NEW.statut = 'paye' THEN NEW.montant ELSE 0 END)
+            - (CASE WHEN OLD.statut = 'paye' THEN OLD.montant ELSE 0 END)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_messages_contact_insertion
+AFTER INSERT ON messages_contact
+BEGIN
+    UPDATE compteurs_globaux SET messages_non_lus = messages_non_lus + (NEW.est_lu = 0) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_messages_contact_suppression
+AFTER DELETE ON messages_contact
+BEGIN
+    UPDATE compteurs_globaux SET messages_non_lus = messages_non_lus - (OLD.est_lu = 0) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_messages_contact_modification
+AFTER UPDATE OF est_lu ON messages_contact
+BEGIN
+    UPDATE compteurs_globaux
+    SET messages_non_lus = messages_non_lus + (NEW.est_lu = 0) - (OLD.est_lu = 0)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_abonnes_newsletter_insertion
+AFTER INSERT ON abonnes_newsletter
+BEGIN
+    UPDATE compteurs_globaux SET total_abonnes = total_abonnes + (NEW.est_actif = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_abonnes_newsletter_suppression
+AFTER DELETE ON abonnes_newsletter
+BEGIN
+    UPDATE compteurs_globaux SET total_abonnes = total_abonnes - (OLD.est_actif = 1) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_abonnes_newsletter_modification
+AFTER UPDATE OF est_actif ON abonnes_newsletter
+BEGIN
+    UPDATE compteurs_globaux
+    SET total_abonnes = total_abonnes + (NEW.est_actif = 1) - (OLD.est_actif = 1)
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_statistiques_vues_insertion
+AFTER INSERT ON statistiques_vues
+BEGIN
+    UPDATE compteurs_globaux SET total_vues = total_vues + (COALESCE(NEW.nombre_vues, 0)) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_statistiques_vues_suppression
+AFTER DELETE ON statistiques_vues
+BEGIN
+    UPDATE compteurs_globaux SET total_vues = total_vues - (COALESCE(OLD.nombre_vues, 0)) WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_statistiques_vues_modification
+AFTER UPDATE OF nombre_vues ON statistiques_vues
+BEGIN
+    UPDATE compteurs_globaux
+    SET total_vues = total_vues + (COALESCE(NEW.nombre_vues, 0)) - (COALESCE(OLD.nombre_vues, 0))
+    WHERE id = 1;
+END;
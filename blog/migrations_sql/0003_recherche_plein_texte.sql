@@ -0,0 +1,74 @@
+-- Index de recherche plein texte (FTS5) et triggers de synchronisation
+
+-- ============================================================================
+-- RECHERCHE PLEIN TEXTE (FTS5)
+-- Description: Index externes sur articles et livres, synchronisés par les
+-- triggers "recherche_*". unicode61 + remove_diacritics: "education"
+-- trouve "Éducation"; les index de préfixes accélèrent les requêtes "mot*".
+-- ============================================================================
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    titre, extrait, contenu,
+    content='articles', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS livres_fts USING fts5(
+    titre, auteur, description,
+    content='livres', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+-- Reconstruction depuis les tables de contenu (bases existantes)
+INSERT INTO articles_fts(articles_fts) VALUES ('rebuild');
+INSERT INTO livres_fts(livres_fts) VALUES ('rebuild');
+
+-- ============================================================================
+-- TRIGGERS de l'index de recherche (tables articles_fts et livres_fts)
+-- ============================================================================
+CREATE TRIGGER IF NOT EXISTS recherche_articles_insertion
+AFTER INSERT ON articles
+BEGIN
+    INSERT INTO articles_fts(rowid, titre, extrait, contenu)
+    VALUES (NEW.id, NEW.titre, NEW.extrait, NEW.contenu);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recherche_articles_suppression
+AFTER DELETE ON articles
+BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, titre, extrait, contenu)
+    VALUES ('delete', OLD.id, OLD.titre, OLD.extrait, OLD.contenu);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recherche_articles_modification
+AFTER UPDATE OF titre, extrait, contenu ON articles
+BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, titre, extrait, contenu)
+    VALUES ('delete', OLD.id, OLD.titre, OLD.extrait, OLD.contenu);
+    INSERT INTO articles_fts(rowid, titre, extrait, contenu)
+    VALUES (NEW.id, NEW.titre, NEW.extrait, NEW.contenu);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recherche_livres_insertion
+AFTER INSERT ON livres
+BEGIN
+    INSERT INTO livres_fts(rowid, titre, auteur, description)
+    VALUES (NEW.id, NEW.titre, NEW.auteur, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recherche_livres_suppression
+AFTER DELETE ON livres
+BEGIN
+    INSERT INTO livres_fts(livres_fts, rowid, titre, auteur, description)
+    VALUES ('delete', OLD.id, OLD.titre, OLD.auteur, OLD.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recherche_livres_modification
+AFTER UPDATE OF titre, auteur, description ON livres
+BEGIN
+    INSERT INTO livres_fts(livres_fts, rowid, titre, auteur, description)
+    VALUES ('delete', OLD.id, OLD.titre, OLD.auteur, OLD.description);
+    INSERT INTO livres_fts(rowid, titre, auteur, description)
+    VALUES (NEW.id, NEW.titre, NEW.auteur, NEW.description);
+END;
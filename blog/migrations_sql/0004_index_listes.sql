@@ -0,0 +1,4 @@
+-- Index de l'ordre des listes, parcourus par la pagination par curseur
+
+CREATE INDEX IF NOT EXISTS idx_articles_liste ON articles(ordre_affichage, date_creation DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_livres_liste ON livres(ordre_affichage, date_creation DESC, id DESC);
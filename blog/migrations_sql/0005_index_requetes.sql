@@ -0,0 +1,43 @@
+-- Index composites, partiels et couvrants des requêtes fréquentes
+
+-- Index d'une seule colonne remplacés par les index composites ci-dessous
+-- (les slugs et le token sont déjà indexés par leur contrainte UNIQUE)
+DROP INDEX IF EXISTS idx_articles_type;
+DROP INDEX IF EXISTS idx_articles_vedette;
+DROP INDEX IF EXISTS idx_articles_populaire;
+DROP INDEX IF EXISTS idx_articles_publie;
+DROP INDEX IF EXISTS idx_articles_slug;
+DROP INDEX IF EXISTS idx_categories_slug;
+DROP INDEX IF EXISTS idx_livres_slug;
+DROP INDEX IF EXISTS idx_livres_gratuit;
+DROP INDEX IF EXISTS idx_livres_vedette;
+DROP INDEX IF EXISTS idx_achats_statut;
+DROP INDEX IF EXISTS idx_achats_token;
+DROP INDEX IF EXISTS idx_messages_lu;
+
+-- Listes dans l'ordre (ordre_affichage, date, id): toutes, par type ou
+-- par prix, et vedettes / nouveautés (index partiels, peu de lignes)
+CREATE INDEX IF NOT EXISTS idx_articles_type_liste ON articles(type_article, ordre_affichage, date_creation DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_vedettes ON articles(ordre_affichage, date_creation DESC, id DESC) WHERE est_vedette = 1 AND est_publie = 1;
+CREATE INDEX IF NOT EXISTS idx_articles_recents ON articles(date_creation DESC, id DESC) WHERE est_publie = 1;
+CREATE INDEX IF NOT EXISTS idx_livres_gratuit_liste ON livres(est_gratuit, ordre_affichage, date_creation DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_livres_vedettes ON livres(ordre_affichage, date_creation DESC, id DESC) WHERE est_vedette = 1 AND est_publie = 1;
+CREATE INDEX IF NOT EXISTS idx_livres_nouveaux ON livres(date_creation DESC, id DESC) WHERE est_nouveau = 1 AND est_publie = 1;
+
+-- Tables de liaison lues par catégorie (le sens contenu -> catégorie est
+-- couvert par leur contrainte UNIQUE)
+CREATE INDEX IF NOT EXISTS idx_article_categories_categorie ON article_categories(categorie_id, article_id);
+CREATE INDEX IF NOT EXISTS idx_livre_categories_categorie ON livre_categories(categorie_id, livre_id);
+
+-- Sommes des vues par contenu lues dans l'index seul
+CREATE INDEX IF NOT EXISTS idx_statistiques_vues_article ON statistiques_vues(article_id, nombre_vues) WHERE article_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_statistiques_vues_livre ON statistiques_vues(livre_id, nombre_vues) WHERE livre_id IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_telechargements_livre ON telechargements(livre_id, date_telechargement);
+CREATE INDEX IF NOT EXISTS idx_telechargements_achat ON telechargements(achat_id) WHERE achat_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_achats_livre ON achats(livre_id);
+CREATE INDEX IF NOT EXISTS idx_achats_date ON achats(date_achat DESC);
+CREATE INDEX IF NOT EXISTS idx_achats_statut_date ON achats(statut, date_achat DESC);
+CREATE INDEX IF NOT EXISTS idx_messages_date ON messages_contact(date_creation DESC);
+CREATE INDEX IF NOT EXISTS idx_messages_lu_date ON messages_contact(est_lu, date_creation DESC);
+CREATE INDEX IF NOT EXISTS idx_abonnes_actifs ON abonnes_newsletter(date_inscription DESC) WHERE est_actif = 1;
@@ -0,0 +1,237 @@
+"""
+Catégories recopiées sur les articles et les livres.
+
+Les colonnes categories_noms et categories_ids évitent la jointure
+article_categories / categories et le GROUP BY des requêtes de liste.
+Elles sont remplies ici pour les contenus existants, puis tenues à jour
+par les triggers "categories_*".
+"""
+
+COLONNES = [
+    ("articles", "categories_noms", "TEXT NOT NULL DEFAULT ''"),
+    ("articles", "categories_ids", "TEXT NOT NULL DEFAULT ''"),
+    ("livres", "categories_noms", "TEXT NOT NULL DEFAULT ''"),
+    ("livres", "categories_ids", "TEXT NOT NULL DEFAULT ''"),
+]
+
+SQL = """
+-- ============================================================================
+-- TRIGGERS des catégories recopiées sur les contenus
+-- Description: articles.categories_noms / categories_ids (et ceux des
+-- livres) sont recalculés quand une association est ajoutée ou supprimée,
+-- et quand une catégorie est renommée, déplacée ou supprimée.
+-- ============================================================================
+
+CREATE TRIGGER IF NOT EXISTS categories_articles_insertion
+AFTER INSERT ON article_categories
+BEGIN
+    UPDATE articles SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = NEW.article_id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = NEW.article_id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id = NEW.article_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_articles_suppression
+AFTER DELETE ON article_categories
+BEGIN
+    UPDATE articles SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = OLD.article_id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = OLD.article_id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id = OLD.article_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_livres_insertion
+AFTER INSERT ON livre_categories
+BEGIN
+    UPDATE livres SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = NEW.livre_id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = NEW.livre_id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id = NEW.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_livres_suppression
+AFTER DELETE ON livre_categories
+BEGIN
+    UPDATE livres SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = OLD.livre_id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = OLD.livre_id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id = OLD.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_contenus_modification
+AFTER UPDATE OF nom, ordre ON categories
+BEGIN
+    UPDATE articles SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = articles.id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = articles.id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id IN (SELECT article_id FROM article_categories WHERE categorie_id = NEW.id);
+    UPDATE livres SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = livres.id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = livres.id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id IN (SELECT livre_id FROM livre_categories WHERE categorie_id = NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_contenus_suppression
+AFTER DELETE ON categories
+BEGIN
+    UPDATE articles SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = articles.id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM article_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.article_id = articles.id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id IN (SELECT article_id FROM article_categories WHERE categorie_id = OLD.id);
+    UPDATE livres SET
+        categories_noms = (
+            SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+                SELECT c.nom FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = livres.id
+                ORDER BY c.ordre, c.id
+            )
+        ),
+        categories_ids = (
+            SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+                SELECT c.id FROM livre_categories x
+                JOIN categories c ON c.id = x.categorie_id
+                WHERE x.livre_id = livres.id
+                ORDER BY c.ordre, c.id
+            )
+        )
+    WHERE id IN (SELECT livre_id FROM livre_categories WHERE categorie_id = OLD.id);
+END;
+
+-- Contenus existants (ceux qui ont au moins une catégorie)
+UPDATE articles SET
+    categories_noms = (
+        SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+            SELECT c.nom FROM article_categories x
+            JOIN categories c ON c.id = x.categorie_id
+            WHERE x.article_id = articles.id
+            ORDER BY c.ordre, c.id
+        )
+    ),
+    categories_ids = (
+        SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+            SELECT c.id FROM article_categories x
+            JOIN categories c ON c.id = x.categorie_id
+            WHERE x.article_id = articles.id
+            ORDER BY c.ordre, c.id
+        )
+    )
+WHERE id IN (SELECT article_id FROM article_categories);
+
+UPDATE livres SET
+    categories_noms = (
+        SELECT COALESCE(GROUP_CONCAT(nom), '') FROM (
+            SELECT c.nom FROM livre_categories x
+            JOIN categories c ON c.id = x.categorie_id
+            WHERE x.livre_id = livres.id
+            ORDER BY c.ordre, c.id
+        )
+    ),
+    categories_ids = (
+        SELECT COALESCE(GROUP_CONCAT(id), '') FROM (
+            SELECT c.id FROM livre_categories x
+            JOIN categories c ON c.id = x.categorie_id
+            WHERE x.livre_id = livres.id
+            ORDER BY c.ordre, c.id
+        )
+    )
+WHERE id IN (SELECT livre_id FROM livre_categories);
+"""
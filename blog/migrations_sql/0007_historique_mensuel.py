@@ -0,0 +1,178 @@
+"""
+Historique des vues et des téléchargements regroupé par mois.
+
+Les tables statistiques_vues_mensuelles et telechargements_mensuels
+reçoivent les mois sortis de la fenêtre détaillée (commande
+compacter_historique). articles.total_vues et livres.total_vues gardent
+le total des vues de chaque contenu, tenu par les triggers "cumuls_*":
+le classement « les plus lus » ne parcourt plus l'historique.
+"""
+
+COLONNES = [
+    ("articles", "total_vues", "INTEGER NOT NULL DEFAULT 0"),
+    ("livres", "total_vues", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+SQL = """
+-- ============================================================================
+-- TABLE: statistiques_vues_mensuelles
+-- Description: Vues regroupées par mois, au-delà de la fenêtre détaillée
+-- de statistiques_vues (python manage.py compacter_historique)
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS statistiques_vues_mensuelles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    article_id INTEGER,
+    livre_id INTEGER,
+    mois CHAR(7) NOT NULL,
+    nombre_vues INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE,
+    FOREIGN KEY (livre_id) REFERENCES livres(id) ON DELETE CASCADE,
+    UNIQUE(article_id, mois),
+    UNIQUE(livre_id, mois)
+);
+
+-- ============================================================================
+-- TABLE: telechargements_mensuels
+-- Description: Téléchargements regroupés par livre et par mois, au-delà de
+-- la fenêtre détaillée de telechargements
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS telechargements_mensuels (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    livre_id INTEGER NOT NULL,
+    mois CHAR(7) NOT NULL,
+    nombre_telechargements INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (livre_id) REFERENCES livres(id) ON DELETE CASCADE,
+    UNIQUE(livre_id, mois)
+);
+
+-- Classement « les plus lus » lu dans l'index (total_vues matérialisé)
+DROP INDEX IF EXISTS idx_statistiques_vues_article;
+DROP INDEX IF EXISTS idx_statistiques_vues_livre;
+CREATE INDEX IF NOT EXISTS idx_articles_plus_lus ON articles(total_vues DESC, date_creation DESC, id DESC) WHERE est_publie = 1;
+
+-- Compaction de l'historique, du plus ancien au plus récent
+CREATE INDEX IF NOT EXISTS idx_statistiques_vues_date ON statistiques_vues(date_vue);
+CREATE INDEX IF NOT EXISTS idx_telechargements_date ON telechargements(date_telechargement);
+
+-- La date de modification ne suit plus les colonnes tenues par des
+-- triggers (vues, catégories recopiées)
+DROP TRIGGER IF EXISTS maj_articles_modification;
+DROP TRIGGER IF EXISTS maj_livres_modification;
+
+CREATE TRIGGER IF NOT EXISTS maj_articles_modification
+AFTER UPDATE ON articles
+WHEN NEW.total_vues IS OLD.total_vues
+ AND NEW.categories_noms IS OLD.categories_noms
+ AND NEW.categories_ids IS OLD.categories_ids
+BEGIN
+    UPDATE articles SET date_modification = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS maj_livres_modification
+AFTER UPDATE ON livres
+WHEN NEW.total_vues IS OLD.total_vues
+ AND NEW.categories_noms IS OLD.categories_noms
+ AND NEW.categories_ids IS OLD.categories_ids
+BEGIN
+    UPDATE livres SET date_modification = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_statistiques_vues_mensuelles_insertion
+AFTER INSERT ON statistiques_vues_mensuelles
+BEGIN
+    UPDATE compteurs_globaux SET total_vues = total_vues + NEW.nombre_vues WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_statistiques_vues_mensuelles_suppression
+AFTER DELETE ON statistiques_vues_mensuelles
+BEGIN
+    UPDATE compteurs_globaux SET total_vues = total_vues - OLD.nombre_vues WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS compteurs_statistiques_vues_mensuelles_modification
+AFTER UPDATE OF nombre_vues ON statistiques_vues_mensuelles
+BEGIN
+    UPDATE compteurs_globaux
+    SET total_vues = total_vues + NEW.nombre_vues - OLD.nombre_vues
+    WHERE id = 1;
+END;
+
+
+-- ============================================================================
+-- TRIGGERS des cumuls de vues (articles.total_vues, livres.total_vues)
+-- Description: total des vues par jour et par mois de chaque contenu; la
+-- compaction déplace des vues des jours vers les mois sans changer le total.
+-- ============================================================================
+
+CREATE TRIGGER IF NOT EXISTS cumuls_vues_insertion
+AFTER INSERT ON statistiques_vues
+BEGIN
+    UPDATE articles SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0)
+    WHERE id = NEW.article_id;
+    UPDATE livres SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0)
+    WHERE id = NEW.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS cumuls_vues_suppression
+AFTER DELETE ON statistiques_vues
+BEGIN
+    UPDATE articles SET total_vues = total_vues - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = OLD.article_id;
+    UPDATE livres SET total_vues = total_vues - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = OLD.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS cumuls_vues_modification
+AFTER UPDATE OF nombre_vues ON statistiques_vues
+BEGIN
+    UPDATE articles
+    SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0) - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = NEW.article_id;
+    UPDATE livres
+    SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0) - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = NEW.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS cumuls_vues_mensuelles_insertion
+AFTER INSERT ON statistiques_vues_mensuelles
+BEGIN
+    UPDATE articles SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0)
+    WHERE id = NEW.article_id;
+    UPDATE livres SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0)
+    WHERE id = NEW.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS cumuls_vues_mensuelles_suppression
+AFTER DELETE ON statistiques_vues_mensuelles
+BEGIN
+    UPDATE articles SET total_vues = total_vues - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = OLD.article_id;
+    UPDATE livres SET total_vues = total_vues - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = OLD.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS cumuls_vues_mensuelles_modification
+AFTER UPDATE OF nombre_vues ON statistiques_vues_mensuelles
+BEGIN
+    UPDATE articles
+    SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0) - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = NEW.article_id;
+    UPDATE livres
+    SET total_vues = total_vues + COALESCE(NEW.nombre_vues, 0) - COALESCE(OLD.nombre_vues, 0)
+    WHERE id = NEW.livre_id;
+END;
+
+-- Totaux des contenus existants (ceux sans vue gardent 0 et leur date
+-- de modification)
+UPDATE articles SET total_vues = (
+    SELECT COALESCE(SUM(nombre_vues), 0) FROM statistiques_vues
+    WHERE article_id = articles.id
+)
+WHERE id IN (SELECT article_id FROM statistiques_vues);
+
+UPDATE livres SET total_vues = (
+    SELECT COALESCE(SUM(nombre_vues), 0) FROM statistiques_vues
+    WHERE livre_id = livres.id
+)
+WHERE id IN (SELECT livre_id FROM statistiques_vues);
+"""
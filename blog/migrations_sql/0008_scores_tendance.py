@@ -0,0 +1,152 @@
+"""
+Scores de tendance des articles et des livres.
+
+articles.score_tendance et livres.score_tendance cumulent les vues (et
+les téléchargements des livres) pondérées par 2^((jour - epoque) / demi_vie):
+l'ordre des scores est celui des vues amorties. Les triggers "tendances_*"
+les tiennent à jour; les scores existants sont calculés ici avec les
+paramètres par défaut (python manage.py recalculer_tendances applique
+settings.BLOG_TENDANCES).
+"""
+
+COLONNES = [
+    ("articles", "score_tendance", "REAL NOT NULL DEFAULT 0"),
+    ("livres", "score_tendance", "REAL NOT NULL DEFAULT 0"),
+]
+
+SQL = """
+-- ============================================================================
+-- TABLE: parametres_tendances
+-- Description: Référence des scores de tendance (une seule ligne). Une vue
+-- du jour J vaut 2^((J - epoque) / demi_vie): l'ordre des scores est celui
+-- des vues amorties à tout instant, sans recalcul quotidien.
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS parametres_tendances (
+    id INTEGER PRIMARY KEY CHECK(id = 1),
+    epoque DATE NOT NULL,
+    demi_vie REAL NOT NULL DEFAULT 7.0,
+    poids_telechargement REAL NOT NULL DEFAULT 5.0
+);
+
+INSERT OR IGNORE INTO parametres_tendances (id, epoque) VALUES (1, DATE('now'));
+
+-- Classements « populaires » (score de tendance) lus dans l'index
+CREATE INDEX IF NOT EXISTS idx_articles_tendance ON articles(score_tendance DESC, date_creation DESC, id DESC) WHERE est_publie = 1;
+CREATE INDEX IF NOT EXISTS idx_livres_tendance ON livres(score_tendance DESC, date_creation DESC, id DESC) WHERE est_publie = 1;
+
+-- La date de modification ne suit pas non plus les scores
+DROP TRIGGER IF EXISTS maj_articles_modification;
+DROP TRIGGER IF EXISTS maj_livres_modification;
+
+CREATE TRIGGER IF NOT EXISTS maj_articles_modification
+AFTER UPDATE ON articles
+WHEN NEW.total_vues IS OLD.total_vues
+ AND NEW.score_tendance IS OLD.score_tendance
+ AND NEW.categories_noms IS OLD.categories_noms
+ AND NEW.categories_ids IS OLD.categories_ids
+BEGIN
+    UPDATE articles SET date_modification = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS maj_livres_modification
+AFTER UPDATE ON livres
+WHEN NEW.total_vues IS OLD.total_vues
+ AND NEW.score_tendance IS OLD.score_tendance
+ AND NEW.categories_noms IS OLD.categories_noms
+ AND NEW.categories_ids IS OLD.categories_ids
+BEGIN
+    UPDATE livres SET date_modification = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+
+-- ============================================================================
+-- TRIGGERS des scores de tendance (articles.score_tendance, livres.score_tendance)
+-- Description: chaque vue ajoute son poids du jour (voir parametres_tendances),
+-- chaque téléchargement poids_telechargement fois ce poids. La compaction de
+-- l'historique ne retire rien: les scores ne suivent que les ajouts.
+-- ============================================================================
+CREATE TRIGGER IF NOT EXISTS tendances_vues_insertion
+AFTER INSERT ON statistiques_vues
+BEGIN
+    UPDATE articles SET score_tendance = score_tendance + COALESCE(NEW.nombre_vues, 0)
+        * COALESCE((
+            SELECT power(2.0, (julianday(NEW.date_vue) - julianday(epoque)) / demi_vie)
+            FROM parametres_tendances WHERE id = 1
+        ), 0)
+    WHERE id = NEW.article_id;
+    UPDATE livres SET score_tendance = score_tendance + COALESCE(NEW.nombre_vues, 0)
+        * COALESCE((
+            SELECT power(2.0, (julianday(NEW.date_vue) - julianday(epoque)) / demi_vie)
+            FROM parametres_tendances WHERE id = 1
+        ), 0)
+    WHERE id = NEW.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tendances_vues_modification
+AFTER UPDATE OF nombre_vues ON statistiques_vues
+BEGIN
+    UPDATE articles SET score_tendance = score_tendance
+        + (COALESCE(NEW.nombre_vues, 0) - COALESCE(OLD.nombre_vues, 0))
+        * COALESCE((
+            SELECT power(2.0, (julianday(NEW.date_vue) - julianday(epoque)) / demi_vie)
+            FROM parametres_tendances WHERE id = 1
+        ), 0)
+    WHERE id = NEW.article_id;
+    UPDATE livres SET score_tendance = score_tendance
+        + (COALESCE(NEW.nombre_vues, 0) - COALESCE(OLD.nombre_vues, 0))
+        * COALESCE((
+            SELECT power(2.0, (julianday(NEW.date_vue) - julianday(epoque)) / demi_vie)
+            FROM parametres_tendances WHERE id = 1
+        ), 0)
+    WHERE id = NEW.livre_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tendances_telechargements_insertion
+AFTER INSERT ON telechargements
+BEGIN
+    UPDATE livres SET score_tendance = score_tendance
+        + COALESCE((
+            SELECT poids_telechargement * power(
+                2.0, (julianday(NEW.date_telechargement) - julianday(epoque)) / demi_vie
+            )
+            FROM parametres_tendances WHERE id = 1
+        ), 0)
+    WHERE id = NEW.livre_id;
+END;
+
+-- Scores des contenus existants
+UPDATE articles SET score_tendance = s.score
+FROM (
+    SELECT v.article_id AS id,
+           SUM(v.nombre * power(2.0, (julianday(v.jour) - julianday(p.epoque)) / p.demi_vie)) AS score
+    FROM (
+        SELECT article_id, nombre_vues AS nombre, date_vue AS jour
+        FROM statistiques_vues WHERE article_id IS NOT NULL
+        UNION ALL
+        SELECT article_id, nombre_vues, mois || '-15'
+        FROM statistiques_vues_mensuelles WHERE article_id IS NOT NULL
+    ) AS v, parametres_tendances AS p
+    GROUP BY v.article_id
+) AS s
+WHERE articles.id = s.id AND s.score != 0;
+
+UPDATE livres SET score_tendance = s.score
+FROM (
+    SELECT v.livre_id AS id,
+           SUM(v.nombre * power(2.0, (julianday(v.jour) - julianday(p.epoque)) / p.demi_vie)) AS score
+    FROM (
+        SELECT livre_id, nombre_vues AS nombre, date_vue AS jour
+        FROM statistiques_vues WHERE livre_id IS NOT NULL
+        UNION ALL
+        SELECT livre_id, nombre_vues, mois || '-15'
+        FROM statistiques_vues_mensuelles WHERE livre_id IS NOT NULL
+        UNION ALL
+        SELECT t.livre_id, p.poids_telechargement, t.date_telechargement
+        FROM telechargements AS t, parametres_tendances AS p
+        UNION ALL
+        SELECT m.livre_id, p.poids_telechargement * m.nombre_telechargements, m.mois || '-15'
+        FROM telechargements_mensuels AS m, parametres_tendances AS p
+    ) AS v, parametres_tendances AS p
+    GROUP BY v.livre_id
+) AS s
+WHERE livres.id = s.id AND s.score != 0;
+"""
@@ -175,6 +175,2405 @@ class TestsFonctionsAccesDonnees(DjangoTestCase):
         self.assertIsNone(resultat)
 
 
+# =============================================================================
+# TESTS UNITAIRES - POOL DE CONNEXIONS
+# =============================================================================
+
+class TestsPoolConnexions(TestCase):
+    """Tests pour le pool de connexions SQLite."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_connexion import PoolConnexions
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        self.pool = PoolConnexions(self.chemin_db, taille_max=2)
+
+    def tearDown(self):
+        import os
+
+        self.pool.vider()
+        os.remove(self.chemin_db)
+
+    def test_reutilisation_connexion(self):
+        """Teste qu'une connexion libérée est resservie."""
+        with self.pool.connexion() as premiere:
+            premiere.execute("SELECT 1")
+        with self.pool.connexion() as seconde:
+            seconde.execute("SELECT 1")
+
+        statistiques = self.pool.obtenir_statistiques()
+        self.assertIs(premiere, seconde)
+        self.assertEqual(statistiques['ouvertures'], 1)
+        self.assertEqual(statistiques['misses'], 1)
+        self.assertEqual(statistiques['hits'], 1)
+
+    def test_taille_max_respectee(self):
+        """Teste que le pool ne conserve pas plus de taille_max connexions."""
+        connexions = [self.pool.acquerir() for _ in range(4)]
+        for connexion in connexions:
+            self.pool.liberer(connexion)
+
+        statistiques = self.pool.obtenir_statistiques()
+        self.assertEqual(statistiques['inactives'], 2)
+        self.assertEqual(statistiques['debordements'], 2)
+        self.assertEqual(statistiques['fermetures'], 2)
+
+    def test_transaction_inachevee_annulee(self):
+        """Teste qu'une transaction ouverte est annulée à la libération."""
+        with self.pool.connexion() as connexion:
+            connexion.execute("CREATE TABLE t (x INTEGER)")
+            connexion.commit()
+            connexion.execute("INSERT INTO t VALUES (1)")
+
+        with self.pool.connexion() as connexion:
+            self.assertFalse(connexion.in_transaction)
+            total = connexion.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+        self.assertEqual(total, 0)
+
+    def test_connexion_fermee_remplacee(self):
+        """Teste qu'une connexion défaillante est écartée par le test de santé."""
+        self.pool.delai_verification = 0
+        connexion = self.pool.acquerir()
+        self.pool.liberer(connexion)
+        connexion.close()
+
+        with self.pool.connexion() as nouvelle:
+            nouvelle.execute("SELECT 1")
+
+        statistiques = self.pool.obtenir_statistiques()
+        self.assertIsNot(nouvelle, connexion)
+        self.assertEqual(statistiques['echecs_sante'], 1)
+
+
+class TestsProfilConnexion(TestCase):
+    """Tests pour le profil de PRAGMAs appliqué aux connexions."""
+
+    def test_profil_applique(self):
+        """Teste que le mode WAL et les PRAGMAs sont actifs."""
+        import os
+        import tempfile
+        from blog.db_connexion import activer_journal_mode, obtenir_connexion, lire_profil
+
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin_db = os.path.join(dossier, 'profil.sqlite3')
+            profil = {'journal_mode': 'WAL', 'synchronous': 'NORMAL'}
+            connexion = obtenir_connexion(chemin_db, profil)
+            # journal_mode n'est pas changé à chaque connexion
+            self.assertEqual(lire_profil(connexion)['journal_mode'], 'delete')
+            activer_journal_mode(connexion, 'WAL')
+            connexion.close()
+
+            connexion = obtenir_connexion(chemin_db, profil)
+            actifs = lire_profil(connexion)
+            connexion.close()
+
+        self.assertEqual(actifs['journal_mode'], 'wal')
+        self.assertEqual(actifs['synchronous'], 1)
+
+    def test_journal_mode_base_occupee(self):
+        """Teste qu'une base occupée garde son mode, sans attente ni erreur."""
+        import os
+        import tempfile
+        import time
+        from blog.db_connexion import activer_journal_mode, obtenir_connexion
+
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin_db = os.path.join(dossier, 'occupee.sqlite3')
+            occupante = sqlite3.connect(chemin_db)
+            occupante.execute('CREATE TABLE t (x)')
+            occupante.execute('BEGIN EXCLUSIVE')
+
+            connexion = obtenir_connexion(chemin_db, {'busy_timeout': 5000})
+            debut = time.monotonic()
+            with self.assertLogs('blog.db_connexion', level='WARNING'):
+                mode = activer_journal_mode(connexion, 'WAL')
+            self.assertLess(time.monotonic() - debut, 1)
+            self.assertNotEqual(mode, 'wal')
+            self.assertEqual(connexion.execute('PRAGMA busy_timeout').fetchone()[0], 5000)
+            connexion.close()
+            occupante.rollback()
+            occupante.close()
+
+            connexion = obtenir_connexion(chemin_db)
+            self.assertEqual(activer_journal_mode(connexion, 'WAL'), 'wal')
+            connexion.close()
+
+    def test_pragma_inconnu_refuse(self):
+        """Teste qu'un PRAGMA hors liste est refusé."""
+        from blog.db_connexion import appliquer_profil
+
+        connexion = sqlite3.connect(':memory:')
+        with self.assertRaises(ValueError):
+            appliquer_profil(connexion, {'writable_schema': 1})
+        with self.assertRaises(ValueError):
+            appliquer_profil(connexion, {'synchronous': 'OFF; DROP TABLE x'})
+        connexion.close()
+
+
+class TestsUniteDeTravail(TestCase):
+    """Tests pour l'unité de travail (une transaction par requête)."""
+
+    def setUp(self):
+        import os
+        import tempfile
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+
+        obtenir_pool(self.chemin_db).vider()
+        os.remove(self.chemin_db)
+
+    def compter_lignes(self):
+        conn = sqlite3.connect(self.chemin_db)
+        total = conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+        conn.close()
+        return total
+
+    def test_validation_unique_en_fin_d_unite(self):
+        """Teste que les écritures ne sont visibles qu'à la fin de l'unité."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import executer_requete
+
+        with unite_de_travail(self.chemin_db) as unite:
+            executer_requete("INSERT INTO t VALUES (1)", commit=True)
+            executer_requete("INSERT INTO t VALUES (2)", commit=True)
+            total = executer_requete("SELECT COUNT(*) FROM t", fetchone=True)[0]
+            self.assertEqual(total, 2)
+            self.assertEqual(self.compter_lignes(), 0)
+
+        self.assertEqual(unite.nombre_requetes, 3)
+        self.assertEqual(self.compter_lignes(), 2)
+
+    def test_annulation_sur_exception(self):
+        """Teste que l'unité est annulée si le bloc lève une exception."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import executer_requete
+
+        with self.assertRaises(ValueError):
+            with unite_de_travail(self.chemin_db):
+                executer_requete("INSERT INTO t VALUES (1)", commit=True)
+                raise ValueError("échec de la vue")
+
+        self.assertEqual(self.compter_lignes(), 0)
+
+    def test_unites_imbriquees_partagent_la_transaction(self):
+        """Teste qu'une unité imbriquée réutilise l'unité englobante."""
+        from blog.db_connexion import unite_de_travail
+
+        with unite_de_travail(self.chemin_db) as externe:
+            with unite_de_travail(self.chemin_db) as interne:
+                self.assertIs(interne, externe)
+
+
+# =============================================================================
+# TESTS UNITAIRES - CONVERSION DES LIGNES
+# =============================================================================
+
+class TestsMappeurs(TestCase):
+    """Tests pour la conversion des lignes SQL (blog.db_mappers)."""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute(
+            "CREATE TABLE t (id INTEGER, titre TEXT, categories_noms TEXT)"
+        )
+        self.conn.execute("INSERT INTO t VALUES (1, 'Un', NULL), (2, 'Deux', 'A,B')")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _lire(self, **options):
+        from blog.db_mappers import obtenir_mappeur
+
+        curseur = self.conn.execute("SELECT * FROM t ORDER BY id")
+        convertir = obtenir_mappeur(curseur.description, **options)
+        return [convertir(ligne) for ligne in curseur.fetchall()]
+
+    def test_dictionnaires_et_defauts(self):
+        """Teste les clés issues de cursor.description et les défauts."""
+        lignes = self._lire(defauts={'categories_noms': ''})
+        self.assertEqual(lignes, [
+            {'id': 1, 'titre': 'Un', 'categories_noms': ''},
+            {'id': 2, 'titre': 'Deux', 'categories_noms': 'A,B'},
+        ])
+
+    def test_mappeur_reutilise_par_forme(self):
+        """Teste que la fonction de conversion est générée une seule fois."""
+        from blog.db_mappers import obtenir_mappeur
+
+        curseur = self.conn.execute("SELECT id, titre FROM t")
+        premier = obtenir_mappeur(curseur.description)
+        curseur = self.conn.execute("SELECT id, titre FROM t WHERE id = 2")
+        self.assertIs(obtenir_mappeur(curseur.description), premier)
+
+    def test_enregistrements_slots(self):
+        """Teste les enregistrements à __slots__."""
+        from blog.db_mappers import FORME_ENREGISTREMENT
+
+        premier, second = self._lire(forme=FORME_ENREGISTREMENT)
+        self.assertEqual(premier.titre, 'Un')
+        self.assertEqual(second['categories_noms'], 'A,B')
+        self.assertIs(type(premier), type(second))
+        self.assertFalse(hasattr(premier, '__dict__'))
+        self.assertEqual(premier.en_dict(), {
+            'id': 1, 'titre': 'Un', 'categories_noms': None,
+        })
+
+    def test_colonne_sans_alias_refusee_en_enregistrement(self):
+        """Teste qu'une colonne calculée sans alias est signalée."""
+        from blog.db_mappers import FORME_ENREGISTREMENT, obtenir_mappeur
+
+        curseur = self.conn.execute("SELECT COUNT(*) FROM t")
+        with self.assertRaises(ValueError):
+            obtenir_mappeur(curseur.description, forme=FORME_ENREGISTREMENT)
+
+
+class TestsProjections(TestCase):
+    """Tests pour les projections des requêtes de liste."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.execute(
+            "INSERT INTO articles (titre, slug, contenu, extrait, est_publie)"
+            " VALUES ('Avec extrait', 'avec', 'Corps long', 'Résumé', 1)"
+        )
+        conn.execute(
+            "INSERT INTO articles (titre, slug, contenu, extrait, est_publie)"
+            " VALUES ('Sans extrait', 'sans', 'Début du corps', '', 1)"
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+
+        obtenir_pool(self.chemin_db).vider()
+        for suffixe in ('', '-wal', '-shm'):
+            if os.path.exists(self.chemin_db + suffixe):
+                os.remove(self.chemin_db + suffixe)
+
+    def test_carte_sans_contenu(self):
+        """Teste que la carte ne lit pas le corps de l'article."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import obtenir_tous_articles
+
+        with unite_de_travail(self.chemin_db):
+            cartes = obtenir_tous_articles()
+            details = obtenir_tous_articles(projection='detail')
+
+        self.assertNotIn('contenu', cartes[0])
+        self.assertIn('contenu', details[0])
+        extraits = {carte['slug']: carte['extrait'] for carte in cartes}
+        self.assertEqual(extraits, {'avec': 'Résumé', 'sans': 'Début du corps'})
+
+    def test_projection_inconnue(self):
+        """Teste qu'une projection inconnue est refusée."""
+        from blog.db_operations import obtenir_tous_livres
+
+        with self.assertRaises(ValueError):
+            obtenir_tous_livres(projection='complete')
+
+
+class TestsPaginationCurseur(TestCase):
+    """Tests pour la pagination par curseur des listes."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL, DONNEES_INITIALES_SQL
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.executescript(DONNEES_INITIALES_SQL)
+        # Ordres et dates répétés pour tester les égalités
+        conn.executemany(
+            "INSERT INTO articles (titre, slug, ordre_affichage, date_creation,"
+            " type_article, est_publie) VALUES (?, ?, ?, ?, ?, 1)",
+            [
+                (f'Article {n}', f'article-{n}', n % 3, f'2024-01-{1 + n % 5:02d}',
+                 'publication' if n % 2 else 'article')
+                for n in range(30)
+            ],
+        )
+        conn.execute(
+            "INSERT INTO article_categories (article_id, categorie_id)"
+            " SELECT id, 1 FROM articles WHERE id % 4 = 0"
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+
+        obtenir_pool(self.chemin_db).vider()
+        os.remove(self.chemin_db)
+
+    def parcourir(self, **filtres):
+        """Parcourt toutes les pages en avant puis en arrière."""
+        from blog.db_operations import paginer_articles
+
+        pages = [paginer_articles(par_page=7, **filtres)]
+        while pages[-1].suivant:
+            pages.append(paginer_articles(par_page=7, apres=pages[-1].suivant, **filtres))
+        retour = [pages[-1]]
+        while retour[-1].precedent:
+            retour.append(paginer_articles(par_page=7, avant=retour[-1].precedent, **filtres))
+        return pages, retour[::-1]
+
+    def test_parcours_complet_dans_les_deux_sens(self):
+        """Teste que les pages couvrent la liste complète, sans doublon."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import obtenir_tous_articles
+
+        with unite_de_travail(self.chemin_db):
+            attendus = [a['id'] for a in obtenir_tous_articles()]
+            pages, retour = self.parcourir()
+
+        ids = [a['id'] for page in pages for a in page]
+        self.assertEqual(sorted(ids), sorted(attendus))
+        self.assertEqual(len(pages), len(attendus) // 7 + 1)
+        self.assertEqual(
+            [[a['id'] for a in page] for page in retour],
+            [[a['id'] for a in page] for page in pages],
+        )
+        self.assertIsNone(pages[0].precedent)
+        self.assertIsNone(pages[-1].suivant)
+
+    def test_filtres_et_comptage(self):
+        """Teste les filtres de type et de catégorie avec leur total."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import compter_articles
+
+        with unite_de_travail(self.chemin_db):
+            pages, _ = self.parcourir(type_article='publication')
+            self.assertEqual(sum(len(page) for page in pages), 15)
+            self.assertEqual(compter_articles(type_article='publication'), 15)
+
+            slug = sqlite3.connect(self.chemin_db).execute(
+                "SELECT slug FROM categories WHERE id = 1"
+            ).fetchone()[0]
+            pages, _ = self.parcourir(slug_categorie=slug, est_publie=1)
+            ids = [a['id'] for page in pages for a in page]
+            self.assertEqual(sorted(ids), list(range(4, 31, 4)))
+            self.assertEqual(compter_articles(slug_categorie=slug, est_publie=1), 7)
+
+    def test_page_profonde_en_une_requete(self):
+        """Teste qu'une page profonde ne lit qu'une page plus une ligne."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import paginer_articles
+
+        with unite_de_travail(self.chemin_db) as unite:
+            pages, _ = self.parcourir()
+            avant = unite.nombre_requetes
+            page = paginer_articles(par_page=7, apres=pages[-2].suivant)
+            self.assertEqual(unite.nombre_requetes, avant + 1)
+        self.assertEqual(len(page), len(pages[-1]))
+
+    def test_curseur_invalide(self):
+        """Teste qu'un curseur invalide ramène à la première page."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import encoder_curseur, paginer_articles
+
+        with unite_de_travail(self.chemin_db):
+            premiere = [a['id'] for a in paginer_articles(par_page=5)]
+            for curseur in ('%%%', 'e30', encoder_curseur([1, 2])):
+                page = paginer_articles(par_page=5, apres=curseur)
+                self.assertEqual([a['id'] for a in page], premiere)
+                self.assertIsNone(page.precedent)
+
+
+# =============================================================================
+# TESTS UNITAIRES - PLANS DES REQUÊTES
+# =============================================================================
+
+class TestsPlansRequetes(TestCase):
+    """Vérifie que les requêtes fréquentes passent par un index."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL, DONNEES_INITIALES_SQL, DONNEES_DEMO_SQL
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.executescript(DONNEES_INITIALES_SQL)
+        conn.executescript(DONNEES_DEMO_SQL)
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+
+        obtenir_pool(self.chemin_db).vider()
+        os.remove(self.chemin_db)
+
+    def requetes_frequentes(self):
+        """Requêtes des pages publiques et de l'administration."""
+        from blog import db_operations as op
+
+        premiere = op.paginer_articles(par_page=1, est_publie=1)
+        return [
+            lambda: op.obtenir_articles_vedettes(),
+            lambda: op.obtenir_articles_populaires(),
+            lambda: op.obtenir_articles_plus_lus(),
+            lambda: op.obtenir_derniers_articles(),
+            lambda: op.obtenir_article_par_slug('importance-lecture-formation'),
+            lambda: op.paginer_articles(est_publie=1),
+            lambda: op.paginer_articles(apres=premiere.suivant, est_publie=1),
+            lambda: op.paginer_articles(avant=premiere.suivant, est_publie=1),
+            lambda: op.paginer_articles(type_article='publication', est_publie=1),
+            lambda: op.paginer_articles(slug_categorie='education', est_publie=1),
+            lambda: op.compter_articles(type_article='publication', est_publie=1),
+            lambda: op.obtenir_livres_vedettes(),
+            lambda: op.obtenir_livres_nouveaux(),
+            lambda: op.obtenir_livres_populaires(),
+            lambda: op.obtenir_livre_par_slug('evaluation-competences'),
+            lambda: op.paginer_livres(est_gratuit=1, est_publie=1),
+            lambda: op.compter_livres(est_gratuit=0, est_publie=1),
+            lambda: op.rechercher_contenus('lecture'),
+            lambda: op.obtenir_tous_articles(limite=100, type_article='article'),
+            lambda: op.obtenir_tous_livres(limite=100, est_gratuit=True),
+            lambda: op.obtenir_tous_achats(statut='paye', limite=100),
+            lambda: op.obtenir_achat_par_token('jeton'),
+            lambda: op.obtenir_messages_contact(est_lu=False, limite=100),
+            lambda: op.obtenir_abonnes_newsletter(),
+        ]
+
+    def test_aucun_parcours_complet(self):
+        """Teste qu'aucune requête fréquente ne parcourt une table entière."""
+        import re
+        from blog.db_connexion import unite_de_travail
+
+        with unite_de_travail(self.chemin_db) as unite:
+            connexion = unite.obtenir_connexion()
+            requetes = []
+            for requete in self.requetes_frequentes():
+                connexion.set_trace_callback(requetes.append)
+                try:
+                    requete()
+                finally:
+                    connexion.set_trace_callback(None)
+
+            self.assertGreater(len(requetes), 20)
+            for sql in requetes:
+                # Les lectures internes de FTS5 ('main'.'..._config') sont ignorées
+                if not sql.lstrip().upper().startswith(('SELECT', 'WITH')) or "'main'." in sql:
+                    continue
+                plan = [ligne[3] for ligne in connexion.execute('EXPLAIN QUERY PLAN ' + sql)]
+                sous_requetes = {
+                    detail.split(' ', 1)[1]
+                    for detail in plan
+                    if detail.startswith(('CO-ROUTINE ', 'MATERIALIZE '))
+                }
+                parcours = [
+                    detail for detail in plan
+                    if re.fullmatch(r'SCAN (\S+)', detail)
+                    and detail[5:] not in sous_requetes
+                ]
+                self.assertEqual(parcours, [], f"{' '.join(sql.split())}\n" + '\n'.join(plan))
+
+
+# =============================================================================
+# TESTS UNITAIRES - MIGRATIONS DU SCHÉMA
+# =============================================================================
+
+class TestsMigrations(TestCase):
+    """Tests pour les migrations du schéma SQL brut (blog.db_migrations)."""
+
+    def setUp(self):
+        import os
+        import tempfile
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        self.repertoire = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import os
+        import shutil
+
+        os.remove(self.chemin_db)
+        shutil.rmtree(self.repertoire)
+
+    def ecrire_migration(self, nom, contenu):
+        import os
+
+        with open(os.path.join(self.repertoire, nom), 'w', encoding='utf-8') as fichier:
+            fichier.write(contenu)
+
+    def objets(self, conn):
+        """
+        Objets du schéma (hors schema_version), SQL normalisé.
+
+        Les tables sont comparées par leurs colonnes: ADD COLUMN modifie
+        le texte de leur CREATE TABLE.
+        """
+        return sorted(
+            (
+                type_,
+                nom,
+                conn.execute(f'PRAGMA table_info({nom})').fetchall()
+                if type_ == 'table'
+                else ' '.join((sql or '').split()),
+            )
+            for type_, nom, sql in conn.execute(
+                "SELECT type, name, sql FROM sqlite_master WHERE name != 'schema_version'"
+            ).fetchall()
+        )
+
+    def test_decoupage_des_instructions(self):
+        """Teste que les triggers ne sont pas coupés à leurs points-virgules."""
+        from blog.db_migrations import decouper_instructions
+
+        instructions = decouper_instructions(
+            "-- commentaire\nCREATE TABLE t (x);\n\n"
+            "CREATE TRIGGER tr AFTER INSERT ON t BEGIN\n"
+            "    UPDATE t SET x = 1;\n    DELETE FROM t;\nEND;\n"
+        )
+        self.assertEqual(len(instructions), 2)
+        self.assertTrue(instructions[1].endswith('END;'))
+
+    def test_base_neuve_marquee_a_jour(self):
+        """Teste qu'une base créée par SCHEMA_SQL n'a aucune migration en attente."""
+        from blog.db_schema import SCHEMA_SQL
+        from blog.db_migrations import marquer_migrations_appliquees, migrations_en_attente
+
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        self.assertEqual(len(migrations_en_attente(conn)), 8)
+        marquer_migrations_appliquees(conn)
+        self.assertEqual(migrations_en_attente(conn), [])
+        conn.close()
+
+    def test_base_existante_rattrape_le_schema(self):
+        """Teste que les migrations amènent une ancienne base au schéma courant."""
+        import re
+        from blog.db_schema import SCHEMA_SQL, DONNEES_DEMO_SQL
+        from blog.db_migrations import appliquer_migrations, lister_migrations
+
+        reference = sqlite3.connect(':memory:')
+        reference.executescript(SCHEMA_SQL)
+
+        # Base ancienne: le schéma courant sans les objets créés par les migrations
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.executescript(DONNEES_DEMO_SQL)
+        for migration in reversed(lister_migrations()):
+            for instruction in reversed(migration.instructions()):
+                creation = re.match(
+                    r'CREATE (?:VIRTUAL )?(TABLE|INDEX|TRIGGER) IF NOT EXISTS (\w+)', instruction
+                )
+                if creation:
+                    conn.execute(f'DROP {creation.group(1)} IF EXISTS {creation.group(2)}')
+            for table, colonne, _ in reversed(migration.colonnes()):
+                conn.execute(f'ALTER TABLE {table} DROP COLUMN {colonne}')
+        conn.execute('CREATE INDEX idx_articles_publie ON articles(est_publie)')
+        conn.commit()
+
+        appliquees = appliquer_migrations(conn, journal=lambda ligne: None)
+        self.assertEqual([m.version for m in appliquees], [1, 2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(self.objets(conn), self.objets(reference))
+        # Index de recherche et compteurs calculés sur les données existantes
+        self.assertGreater(
+            conn.execute("SELECT COUNT(*) FROM articles_fts WHERE articles_fts MATCH 'lecture'").fetchone()[0], 0
+        )
+        self.assertEqual(
+            conn.execute('SELECT total_articles FROM compteurs_globaux').fetchone()[0],
+            conn.execute('SELECT COUNT(*) FROM articles WHERE est_publie = 1').fetchone()[0],
+        )
+        # Catégories recopiées sur les contenus existants
+        self.assertEqual(
+            conn.execute("SELECT COUNT(*) FROM articles WHERE categories_ids = ''").fetchone()[0],
+            conn.execute(
+                'SELECT COUNT(*) FROM articles'
+                ' WHERE id NOT IN (SELECT article_id FROM article_categories)'
+            ).fetchone()[0],
+        )
+        self.assertEqual(appliquer_migrations(conn, journal=lambda ligne: None), [])
+        conn.close()
+
+    def test_echec_annule_seulement_la_migration_en_cours(self):
+        """Teste qu'une migration en erreur est annulée, les précédentes gardées."""
+        from blog.db_migrations import appliquer_migrations, versions_appliquees
+
+        self.ecrire_migration('0001_table_a.sql', '-- Table a\nCREATE TABLE a (x);\n')
+        self.ecrire_migration(
+            '0002_table_b.sql', '-- Table b\nCREATE TABLE b (x);\nINSERT INTO inconnue VALUES (1);\n'
+        )
+        conn = sqlite3.connect(self.chemin_db)
+        with self.assertRaises(sqlite3.OperationalError):
+            appliquer_migrations(conn, self.repertoire, journal=lambda ligne: None)
+
+        self.assertEqual(versions_appliquees(conn), {1})
+        tables = {ligne[0] for ligne in conn.execute("SELECT name FROM sqlite_master")}
+        self.assertIn('a', tables)
+        self.assertNotIn('b', tables)
+        conn.close()
+
+    def test_migration_python_et_colonne_ajoutee(self):
+        """Teste une migration Python qui ajoute une colonne de façon rejouable."""
+        from blog.db_migrations import appliquer_migrations, colonne_existe, lister_migrations
+
+        self.ecrire_migration('0001_table.sql', 'CREATE TABLE t (id INTEGER PRIMARY KEY);\n')
+        self.ecrire_migration(
+            '0002_colonne.py',
+            '"""Ajoute t.nom."""\n'
+            'from blog.db_migrations import ajouter_colonne\n\n'
+            'def migrer(connexion):\n'
+            '    ajouter_colonne(connexion, "t", "nom", "TEXT NOT NULL DEFAULT \'\'")\n'
+            '    ajouter_colonne(connexion, "t", "nom", "TEXT NOT NULL DEFAULT \'\'")\n',
+        )
+        conn = sqlite3.connect(self.chemin_db)
+        appliquer_migrations(conn, self.repertoire, cible=1, journal=lambda ligne: None)
+        self.assertFalse(colonne_existe(conn, 't', 'nom'))
+        appliquer_migrations(conn, self.repertoire, journal=lambda ligne: None)
+        self.assertTrue(colonne_existe(conn, 't', 'nom'))
+        self.assertEqual(lister_migrations(self.repertoire)[1].description, 'Ajoute t.nom.')
+        conn.close()
+
+    def test_sqlite_sans_power_refuse(self):
+        """Teste qu'un SQLite sans power() est refusé avant toute migration."""
+        from blog.checks import verifier_sqlite
+        from blog.db_migrations import appliquer_migrations
+
+        def power_absente(base, exposant):
+            raise ValueError('no such function: power')
+
+        self.ecrire_migration('0001_table.sql', 'CREATE TABLE t (id INTEGER PRIMARY KEY);\n')
+        conn = sqlite3.connect(self.chemin_db)
+        # Remplace la fonction intégrée pour cette seule connexion
+        conn.create_function('power', 2, power_absente)
+        with self.assertRaisesRegex(RuntimeError, 'power'):
+            appliquer_migrations(conn, self.repertoire, journal=lambda ligne: None)
+        tables = conn.execute("SELECT name FROM sqlite_master").fetchall()
+        conn.close()
+
+        self.assertEqual(tables, [])
+        self.assertEqual(verifier_sqlite(None), [])
+
+    def test_reset_supprime_toutes_les_tables(self):
+        """Teste que --reset recrée chaque table du schéma, tampons compris."""
+        from blog.db_migrations import initialiser_base
+        from blog.db_schema import TABLES_SCHEMA
+
+        conn = sqlite3.connect(self.chemin_db)
+        initialiser_base(conn, journal=lambda ligne: None)
+        tables = {
+            ligne[0]
+            for ligne in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+                " AND name NOT LIKE 'sqlite_%' AND name NOT LIKE '%fts\\_%' ESCAPE '\\'"
+            )
+        }
+        self.assertEqual(tables - set(TABLES_SCHEMA), set())
+
+        conn.execute("INSERT INTO schema_version (version, nom) VALUES (99, 'ancienne')")
+        conn.execute("UPDATE versions_contenu SET version = version + 10")
+        conn.commit()
+        initialiser_base(conn, reset=True, journal=lambda ligne: None)
+
+        self.assertNotIn(99, {ligne[0] for ligne in conn.execute("SELECT version FROM schema_version")})
+        self.assertEqual(
+            conn.execute("SELECT COUNT(*) FROM versions_contenu WHERE version >= 10").fetchone()[0],
+            0,
+        )
+        conn.close()
+
+    def test_numeros_en_double_refuses(self):
+        """Teste que deux migrations de même numéro sont refusées."""
+        from blog.db_migrations import lister_migrations
+
+        self.ecrire_migration('0001_a.sql', 'SELECT 1;\n')
+        self.ecrire_migration('0001_b.sql', 'SELECT 1;\n')
+        with self.assertRaises(ValueError):
+            lister_migrations(self.repertoire)
+
+
+# =============================================================================
+# TESTS UNITAIRES - CACHE VERSIONNÉ
+# =============================================================================
+
+class TestsCacheVersionne(TestCase):
+    """Tests pour le cache de résultats versionné (blog.cache)."""
+
+    def setUp(self):
+        self.appels = 0
+
+    def calculer(self):
+        self.appels += 1
+        return self.appels
+
+    def test_cache_par_version(self):
+        """Teste qu'une nouvelle version invalide l'entrée."""
+        from blog.cache import CacheVersionne
+
+        cache = CacheVersionne()
+        self.assertEqual(cache.obtenir('cle', 1, self.calculer), 1)
+        self.assertEqual(cache.obtenir('cle', 1, self.calculer), 1)
+        self.assertEqual(cache.obtenir('cle', 2, self.calculer), 2)
+        self.assertEqual(cache.obtenir_statistiques()['hits'], 1)
+
+    def test_duree_de_vie(self):
+        """Teste l'expiration d'une entrée avec TTL."""
+        import time
+        from blog.cache import CacheVersionne
+
+        cache = CacheVersionne()
+        cache.obtenir('cle', 1, self.calculer, ttl=0.01)
+        time.sleep(0.02)
+        self.assertEqual(cache.obtenir('cle', 1, self.calculer, ttl=0.01), 2)
+
+    def test_taille_maximale(self):
+        """Teste l'éviction de l'entrée la plus ancienne."""
+        from blog.cache import CacheVersionne
+
+        cache = CacheVersionne(taille_max=2)
+        for cle in ('a', 'b', 'c'):
+            cache.obtenir(cle, 1, self.calculer)
+        self.assertEqual(cache.obtenir_statistiques()['entrees'], 2)
+        self.assertEqual(cache.obtenir('a', 1, self.calculer), 4)
+
+    def test_eviction_lru(self):
+        """Teste qu'une entrée lue récemment n'est pas évincée."""
+        from blog.cache import CacheVersionne
+
+        cache = CacheVersionne(taille_max=2)
+        cache.obtenir('a', 1, self.calculer)
+        cache.obtenir('b', 1, self.calculer)
+        cache.obtenir('a', 1, self.calculer)
+        cache.obtenir('c', 1, self.calculer)
+        self.assertEqual(cache.obtenir('a', 1, self.calculer), 1)
+        self.assertEqual(cache.obtenir('b', 1, self.calculer), 4)
+
+    def test_invalidation_par_les_ecritures(self):
+        """Teste que les écritures du catalogue incrémentent la version."""
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL
+        from blog.db_connexion import obtenir_pool, unite_de_travail
+        from blog.cache import memoriser
+        from blog.db_operations import creer_livre, supprimer_livre
+
+        descripteur, chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.close()
+
+        livre = {
+            cle: None for cle in (
+                'description', 'extrait', 'auteur', 'co_auteurs', 'isbn',
+                'editeur', 'annee_publication', 'nombre_pages', 'langue',
+                'image_couverture', 'fichier_pdf', 'fichier_preview', 'prix',
+                'devise',
+            )
+        }
+        livre.update(
+            titre='Livre', slug='livre', est_gratuit=1, est_vedette=0,
+            est_nouveau=0, est_publie=1,
+        )
+        cle = f'test-invalidation-{id(self)}'
+        try:
+            with unite_de_travail(chemin_db):
+                self.assertEqual(memoriser(cle, self.calculer), 1)
+                self.assertEqual(memoriser(cle, self.calculer), 1)
+            with unite_de_travail(chemin_db):
+                livre_id = creer_livre(livre)
+            with unite_de_travail(chemin_db):
+                self.assertEqual(memoriser(cle, self.calculer), 2)
+            with unite_de_travail(chemin_db):
+                supprimer_livre(livre_id)
+                self.assertEqual(memoriser(cle, self.calculer), 3)
+        finally:
+            obtenir_pool(chemin_db).vider()
+            os.remove(chemin_db)
+
+
+class TestsCacheRecherche(TestCase):
+    """Tests pour le cache des résultats de recherche."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog import cache
+        from blog.db_schema import SCHEMA_SQL
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.execute(
+            "INSERT INTO articles (titre, slug, est_publie) VALUES ('Éducation', 'e', 1)"
+        )
+        conn.commit()
+        conn.close()
+        cache._cache_recherche = None
+
+    def tearDown(self):
+        import os
+        from blog import cache
+        from blog.db_connexion import obtenir_pool
+
+        cache._cache_recherche = None
+        obtenir_pool(self.chemin_db).vider()
+        os.remove(self.chemin_db)
+
+    def test_saisies_equivalentes_partagent_une_entree(self):
+        """Teste la normalisation de la casse, des accents et des espaces."""
+        from blog.cache import obtenir_cache_recherche, rechercher_en_cache
+        from blog.db_connexion import unite_de_travail
+
+        with unite_de_travail(self.chemin_db) as unite:
+            resultats = rechercher_en_cache('education')
+            requetes = unite.nombre_requetes
+            for terme in ('Éducation ', '  EDUCATION', 'éducation'):
+                self.assertEqual(rechercher_en_cache(terme), resultats)
+            # Une seule lecture de version par recherche servie par le cache
+            self.assertEqual(unite.nombre_requetes, requetes + 3)
+
+        self.assertEqual(resultats['total'], 1)
+        statistiques = obtenir_cache_recherche().obtenir_statistiques()
+        self.assertEqual((statistiques['hits'], statistiques['misses']), (3, 1))
+        self.assertEqual(statistiques['taux_hits'], 0.75)
+
+    def test_resultats_vides_et_invalidation(self):
+        """Teste le cache des recherches vides et leur invalidation."""
+        from blog.cache import obtenir_cache_recherche, rechercher_en_cache
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import incrementer_version_contenu
+
+        with unite_de_travail(self.chemin_db) as unite:
+            self.assertEqual(rechercher_en_cache('histoire')['total'], 0)
+            self.assertEqual(rechercher_en_cache('Histoire')['total'], 0)
+            self.assertEqual(obtenir_cache_recherche().obtenir_statistiques()['hits'], 1)
+
+            unite.obtenir_connexion().execute(
+                "INSERT INTO articles (titre, slug, est_publie) VALUES ('Histoire', 'h', 1)"
+            )
+            incrementer_version_contenu()
+            self.assertEqual(rechercher_en_cache('histoire')['total'], 1)
+
+    def test_saisie_sans_mot(self):
+        """Teste qu'une saisie vide ne lance aucune requête."""
+        from blog.cache import rechercher_en_cache
+        from blog.db_connexion import unite_de_travail
+
+        with unite_de_travail(self.chemin_db) as unite:
+            self.assertEqual(rechercher_en_cache(' ?! ')['total'], 0)
+            self.assertEqual(unite.nombre_requetes, 0)
+
+
+class TestsContexteGlobal(TestCase):
+    """Tests pour le contexte global paresseux et mis en cache."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL, DONNEES_INITIALES_SQL
+        from blog.cache import obtenir_cache
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.executescript(DONNEES_INITIALES_SQL)
+        conn.close()
+        obtenir_cache().vider()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+        from blog.cache import obtenir_cache
+
+        obtenir_cache().vider()
+        obtenir_pool(self.chemin_db).vider()
+        os.remove(self.chemin_db)
+
+    def test_aucune_requete_sans_utilisation(self):
+        """Teste que le contexte n'est lu que s'il est utilisé."""
+        from blog.db_connexion import unite_de_travail
+        from blog.context_processors import contexte_global
+
+        with unite_de_travail(self.chemin_db) as unite:
+            contexte = contexte_global(None)
+            self.assertEqual(unite.nombre_requetes, 0)
+            self.assertEqual(contexte['config_site']['nom_site'], 'Mr Talnan')
+            self.assertGreater(unite.nombre_requetes, 0)
+
+    def test_configuration_invalidee_par_modification(self):
+        """Teste que modifier_configuration invalide le cache."""
+        from blog.db_connexion import unite_de_travail
+        from blog.context_processors import contexte_global
+        from blog.db_operations import modifier_configuration
+
+        def nom_site():
+            return contexte_global(None)['config_site']['nom_site']
+
+        with unite_de_travail(self.chemin_db) as unite:
+            self.assertEqual(nom_site(), 'Mr Talnan')
+            avant = unite.nombre_requetes
+            self.assertEqual(nom_site(), 'Mr Talnan')
+            # Servi par le cache: une seule lecture de version
+            self.assertEqual(unite.nombre_requetes - avant, 1)
+
+            modifier_configuration('nom_site', 'Nouveau nom')
+            self.assertEqual(nom_site(), 'Nouveau nom')
+
+    def test_statistiques_invalidees_par_ecriture(self):
+        """Teste que les statistiques suivent les écritures."""
+        from blog.db_connexion import unite_de_travail
+        from blog.context_processors import contexte_global
+        from blog.db_operations import inscrire_newsletter
+
+        with unite_de_travail(self.chemin_db):
+            total = contexte_global(None)['stats']['total_abonnes']
+            inscrire_newsletter('lecteur@example.com')
+            self.assertEqual(contexte_global(None)['stats']['total_abonnes'], total + 1)
+
+
+class TestsCompteursGlobaux(TestCase):
+    """Tests pour les statistiques globales matérialisées."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL, DONNEES_INITIALES_SQL
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.executescript(DONNEES_INITIALES_SQL)
+        conn.close()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+
+        obtenir_pool(self.chemin_db).vider()
+        os.remove(self.chemin_db)
+
+    def test_triggers_suivent_les_ecritures(self):
+        """Teste que compteurs_globaux reste égal au recalcul complet."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import (
+            obtenir_statistiques_globales,
+            recalculer_statistiques_globales,
+        )
+
+        ecritures = [
+            "INSERT INTO articles (titre, slug, est_publie) VALUES ('A', 'a', 1)",
+            "INSERT INTO articles (titre, slug, est_publie) VALUES ('B', 'b', 0)",
+            "UPDATE articles SET est_publie = 1 WHERE slug = 'b'",
+            "DELETE FROM articles WHERE slug = 'a'",
+            "INSERT INTO livres (id, titre, slug) VALUES (1, 'L', 'l')",
+            "INSERT INTO achats (livre_id, nom_client, email_client, montant)"
+            " VALUES (1, 'C', 'c@example.com', 2500)",
+            "UPDATE achats SET statut = 'paye'",
+            "UPDATE achats SET montant = 3000",
+            "INSERT INTO messages_contact (nom, email, message)"
+            " VALUES ('N', 'n@example.com', 'M')",
+            "UPDATE messages_contact SET est_lu = 1",
+            "INSERT INTO abonnes_newsletter (email) VALUES ('x@example.com')",
+            "INSERT INTO statistiques_vues (livre_id, nombre_vues, date_vue)"
+            " VALUES (1, 4, '2024-01-01')",
+            "UPDATE statistiques_vues SET nombre_vues = 7",
+            "UPDATE categories SET est_active = 0 WHERE id = 1",
+        ]
+        with unite_de_travail(self.chemin_db) as unite:
+            connexion = unite.obtenir_connexion()
+            for requete in ecritures:
+                connexion.execute(requete)
+
+            stats = obtenir_statistiques_globales()
+            recalcul = recalculer_statistiques_globales()
+
+        for nom, valeur in recalcul.items():
+            self.assertEqual(stats[nom], valeur, nom)
+        self.assertEqual(stats['total_articles'], 1)
+        self.assertEqual(stats['revenus_totaux'], 3000)
+        self.assertEqual(stats['total_vues'], 7)
+        self.assertEqual(stats['total_lecteurs'], 1)
+
+    def test_reset_repart_de_zero(self):
+        """Teste que deux init --reset --demo ne cumulent pas les compteurs."""
+        from blog.db_connexion import obtenir_pool, unite_de_travail
+        from blog.db_migrations import initialiser_base
+        from blog.db_operations import (
+            obtenir_statistiques_globales,
+            recalculer_statistiques_globales,
+        )
+
+        conn = sqlite3.connect(self.chemin_db)
+        for _ in range(2):
+            initialiser_base(conn, reset=True, demo=True, journal=lambda ligne: None)
+        articles = conn.execute('SELECT COUNT(*) FROM articles WHERE est_publie = 1').fetchone()[0]
+        conn.close()
+        obtenir_pool(self.chemin_db).vider()
+
+        with unite_de_travail(self.chemin_db):
+            stats = obtenir_statistiques_globales()
+            recalcul = recalculer_statistiques_globales()
+
+        self.assertGreater(articles, 0)
+        self.assertEqual(stats['total_articles'], articles)
+        for nom, valeur in recalcul.items():
+            self.assertEqual(stats[nom], valeur, nom)
+
+    def test_lecture_en_une_requete(self):
+        """Teste que les statistiques sont lues en une seule requête."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import obtenir_statistiques_globales
+
+        with unite_de_travail(self.chemin_db) as unite:
+            obtenir_statistiques_globales()
+            self.assertEqual(unite.nombre_requetes, 1)
+
+
+class TestsCategoriesDenormalisees(TestCase):
+    """Tests pour les catégories recopiées sur les articles et les livres."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL, DONNEES_INITIALES_SQL
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.executescript(DONNEES_INITIALES_SQL)
+        conn.execute("INSERT INTO articles (id, titre, slug, est_publie) VALUES (1, 'A', 'a', 1)")
+        conn.execute("INSERT INTO livres (id, titre, slug, est_publie) VALUES (1, 'L', 'l', 1)")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+
+        obtenir_pool(self.chemin_db).vider()
+        os.remove(self.chemin_db)
+
+    def categories(self, table):
+        conn = sqlite3.connect(self.chemin_db)
+        ligne = conn.execute(
+            f'SELECT categories_noms, categories_ids FROM {table} WHERE id = 1'
+        ).fetchone()
+        conn.close()
+        return ligne
+
+    def test_associations_suivies_dans_l_ordre_des_categories(self):
+        """Teste que les colonnes suivent les associations, triées par ordre."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import associer_categories, associer_categories_livre
+
+        with unite_de_travail(self.chemin_db):
+            associer_categories(1, [9, 3])
+            associer_categories_livre(1, [6])
+        self.assertEqual(self.categories('articles'), ('Éducation,Actualités', '3,9'))
+        self.assertEqual(self.categories('livres'), ('Littérature', '6'))
+
+        with unite_de_travail(self.chemin_db):
+            associer_categories(1, [])
+        self.assertEqual(self.categories('articles'), ('', ''))
+
+    def test_categorie_renommee_ou_supprimee(self):
+        """Teste qu'un renommage ou une suppression de catégorie est recopié."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import associer_categories, associer_categories_livre
+
+        with unite_de_travail(self.chemin_db) as unite:
+            associer_categories(1, [1, 2])
+            associer_categories_livre(1, [2])
+            connexion = unite.obtenir_connexion()
+            connexion.execute("UPDATE categories SET nom = 'Enquêtes' WHERE id = 2")
+            connexion.execute('UPDATE categories SET ordre = 0 WHERE id = 2')
+        self.assertEqual(self.categories('articles'), ('Enquêtes,Sciences', '2,1'))
+        self.assertEqual(self.categories('livres'), ('Enquêtes', '2'))
+
+        with unite_de_travail(self.chemin_db) as unite:
+            unite.obtenir_connexion().execute('DELETE FROM categories WHERE id = 2')
+        self.assertEqual(self.categories('articles'), ('Sciences', '1'))
+        self.assertEqual(self.categories('livres'), ('', ''))
+
+    def test_listes_sans_jointure(self):
+        """Teste que les listes lisent les catégories sans jointure."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import associer_categories, obtenir_tous_articles
+
+        with unite_de_travail(self.chemin_db) as unite:
+            associer_categories(1, [1])
+            requetes = []
+            unite.obtenir_connexion().set_trace_callback(requetes.append)
+            articles = obtenir_tous_articles(est_publie=1)
+            unite.obtenir_connexion().set_trace_callback(None)
+
+        self.assertEqual(articles[0]['categories_noms'], 'Sciences')
+        self.assertFalse([r for r in requetes if 'article_categories' in r])
+
+
+class TestsAssociationCategories(TestCase):
+    """Tests pour l'écriture des associations contenu / catégories."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL, DONNEES_INITIALES_SQL
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.executescript(DONNEES_INITIALES_SQL)
+        conn.execute("INSERT INTO articles (id, titre, slug) VALUES (1, 'A', 'a')")
+        conn.execute('INSERT INTO article_categories (article_id, categorie_id) VALUES (1, 1)')
+        conn.execute('INSERT INTO article_categories (article_id, categorie_id) VALUES (1, 2)')
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+
+        obtenir_pool(self.chemin_db).vider()
+        os.remove(self.chemin_db)
+
+    def associations(self):
+        conn = sqlite3.connect(self.chemin_db)
+        lignes = conn.execute(
+            'SELECT id, categorie_id FROM article_categories WHERE article_id = 1 ORDER BY id'
+        ).fetchall()
+        conn.close()
+        return lignes
+
+    def test_seules_les_differences_sont_ecrites(self):
+        """Teste que les associations inchangées ne sont ni supprimées ni recréées."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import associer_categories, obtenir_versions_contenu
+
+        avant = self.associations()
+        with unite_de_travail(self.chemin_db) as unite:
+            version = obtenir_versions_contenu(['catalogue'])
+            requetes = unite.nombre_requetes
+            changements = associer_categories(1, ['3', 2, 3])
+            requetes = unite.nombre_requetes - requetes
+            self.assertGreater(obtenir_versions_contenu(['catalogue']), version)
+
+        self.assertEqual(changements, {'ajoutees': [3], 'retirees': [1]})
+        self.assertEqual(self.associations()[0], avant[1])
+        self.assertEqual([c for _, c in self.associations()], [2, 3])
+        # Lecture, suppressions, insertions et version: une requête chacune
+        self.assertEqual(requetes, 4)
+
+        with unite_de_travail(self.chemin_db):
+            version = obtenir_versions_contenu(['catalogue'])
+            self.assertEqual(
+                associer_categories(1, [3, 2]), {'ajoutees': [], 'retirees': []}
+            )
+            self.assertEqual(obtenir_versions_contenu(['catalogue']), version)
+
+    def test_erreur_annule_toute_l_association(self):
+        """Teste qu'une insertion refusée n'enlève pas les associations existantes."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import associer_categories
+
+        conn = sqlite3.connect(self.chemin_db)
+        conn.execute(
+            'CREATE TRIGGER refus BEFORE INSERT ON article_categories'
+            " WHEN NEW.categorie_id = 999 BEGIN SELECT RAISE(ABORT, 'refusée'); END"
+        )
+        conn.commit()
+        conn.close()
+        avant = self.associations()
+        with self.assertRaises(sqlite3.IntegrityError):
+            with unite_de_travail(self.chemin_db):
+                associer_categories(1, [3, 999])
+        self.assertEqual(self.associations(), avant)
+
+
+# =============================================================================
+# TESTS UNITAIRES - RECHERCHE PLEIN TEXTE
+# =============================================================================
+
+class TestsRechercheTexte(TestCase):
+    """Tests pour la recherche FTS5 des articles et des livres."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.executescript("""
+            INSERT INTO articles (id, titre, slug, extrait, contenu, est_publie)
+            VALUES (1, 'Notes de cours', 'notes', '', 'Un mot sur l''éducation', 1),
+                   (2, 'Éducation et société', 'education', '', 'Texte', 1),
+                   (3, 'Brouillon sur l''éducation', 'brouillon', '', '', 0);
+            INSERT INTO livres (id, titre, slug, description, auteur, est_publie)
+            VALUES (1, 'Manuel', 'manuel', 'Pédagogie générale', 'Dupont', 1);
+        """)
+        conn.close()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+
+        obtenir_pool(self.chemin_db).vider()
+        os.remove(self.chemin_db)
+
+    def rechercher(self, fonction, terme):
+        from blog.db_connexion import unite_de_travail
+
+        with unite_de_travail(self.chemin_db):
+            return [ligne['id'] for ligne in fonction(terme)]
+
+    def test_expression_fts(self):
+        """Teste que la saisie est réduite à des préfixes entre guillemets."""
+        from blog.db_operations import construire_expression_fts
+
+        self.assertEqual(construire_expression_fts('Éduc  société'), '"Éduc"* "société"*')
+        self.assertEqual(construire_expression_fts('a"b* OR'), '"a"* "b"* "OR"*')
+        self.assertIsNone(construire_expression_fts(' "*- '))
+
+    def test_accents_prefixes_et_classement(self):
+        """Teste l'insensibilité aux accents et le poids du titre."""
+        from blog.db_operations import rechercher_articles, rechercher_livres
+
+        self.assertEqual(self.rechercher(rechercher_articles, 'EDUC'), [2, 1])
+        self.assertEqual(self.rechercher(rechercher_livres, 'pedago'), [1])
+        self.assertEqual(self.rechercher(rechercher_livres, 'dupont'), [1])
+        self.assertEqual(self.rechercher(rechercher_articles, 'inexistant'), [])
+
+    def test_syntaxe_speciale_sans_erreur(self):
+        """Teste que la syntaxe FTS5 saisie n'est pas interprétée."""
+        from blog.db_operations import rechercher_articles
+
+        for terme in ('"', 'éducation*', 'NOT AND', 'titre:notes', '(', ''):
+            self.rechercher(rechercher_articles, terme)
+
+    def test_triggers_synchronisent_index(self):
+        """Teste que l'index suit les modifications et suppressions."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import rechercher_articles
+
+        with unite_de_travail(self.chemin_db) as unite:
+            connexion = unite.obtenir_connexion()
+            connexion.execute("UPDATE articles SET titre = 'Histoire' WHERE id = 2")
+            connexion.execute("DELETE FROM articles WHERE id = 1")
+            connexion.execute("UPDATE articles SET est_publie = 1 WHERE id = 3")
+
+        self.assertEqual(self.rechercher(rechercher_articles, 'éducation'), [3])
+        self.assertEqual(self.rechercher(rechercher_articles, 'histoire'), [2])
+
+    def test_recherche_classee_commune(self):
+        """Teste la fusion des articles et des livres sur un même score."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import rechercher_contenus, rechercher_global
+
+        with unite_de_travail(self.chemin_db) as unite:
+            unite.obtenir_connexion().execute(
+                "INSERT INTO livres (id, titre, slug, description, nombre_telechargements)"
+                " VALUES (2, 'Éducation comparée', 'comparee', 'Ouvrage', 500)"
+            )
+            page = rechercher_contenus('education', par_page=2)
+            self.assertEqual(unite.nombre_requetes, 2)
+            suivante = rechercher_contenus('education', page=2, par_page=2)
+            globale = rechercher_global('education')
+
+        self.assertEqual((page['total'], page['nombre_pages']), (3, 2))
+        # Titres avant contenu, livre populaire devant l'article au titre égal
+        self.assertEqual(
+            [(r['type'], r['id']) for r in page['resultats'] + suivante['resultats']],
+            [('livre', 2), ('article', 2), ('article', 1)],
+        )
+        self.assertTrue(all(0 < r['score'] <= 1 for r in page['resultats']))
+        self.assertIn('éducation', suivante['resultats'][0]['extrait'])
+        self.assertNotIn('contenu', page['resultats'][0])
+        self.assertEqual(rechercher_contenus('', page=1)['resultats'], [])
+        self.assertEqual(
+            ([r['id'] for r in globale['articles']], [r['id'] for r in globale['livres']]),
+            ([2, 1], [2]),
+        )
+        self.assertEqual(globale['total'], 3)
+
+    def test_extraits_surlignes(self):
+        """Teste l'extrait produit par l'index, échappé puis surligné."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import (
+            MARQUE_DEBUT,
+            MARQUE_FIN,
+            MOTS_EXTRAIT,
+            rechercher_contenus,
+            surligner_extrait,
+        )
+
+        contenu = '<script>x</script> ' + 'mot ' * 500 + 'cible ' + 'mot ' * 500
+        with unite_de_travail(self.chemin_db) as unite:
+            unite.obtenir_connexion().execute(
+                "UPDATE articles SET contenu = ? WHERE id = 1", (contenu,)
+            )
+            extrait = rechercher_contenus('cible')['resultats'][0]['extrait']
+
+        self.assertIn('<mark>cible</mark>', extrait)
+        self.assertLessEqual(len(extrait.split()), MOTS_EXTRAIT + 2)
+        self.assertLess(len(extrait), 200)
+
+        self.assertEqual(
+            surligner_extrait(f'a < {MARQUE_DEBUT}b{MARQUE_FIN} & {MARQUE_FIN}c{MARQUE_DEBUT}d'),
+            'a &lt; <mark>b</mark> &amp; c<mark>d</mark>',
+        )
+        self.assertEqual(surligner_extrait(None), '')
+
+    def test_repli_sans_index(self):
+        """Teste le repli sur LIKE pour une base sans index plein texte."""
+        from blog.db_operations import rechercher_articles
+
+        conn = sqlite3.connect(self.chemin_db)
+        conn.execute("DROP TABLE articles_fts")
+        conn.close()
+
+        self.assertEqual(self.rechercher(rechercher_articles, 'Notes de'), [1])
+
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import rechercher_contenus
+
+        with unite_de_travail(self.chemin_db):
+            page = rechercher_contenus('Notes de')
+        self.assertEqual([(r['type'], r['id']) for r in page['resultats']], [('article', 1)])
+
+
+    def test_erreurs_sans_repli(self):
+        """Teste que seules les erreurs d'index absent reviennent au LIKE."""
+        from blog.db_operations import index_recherche_absent
+
+        self.assertTrue(index_recherche_absent(sqlite3.OperationalError('no such table: articles_fts')))
+        self.assertTrue(index_recherche_absent(sqlite3.OperationalError('no such module: fts5')))
+        self.assertFalse(index_recherche_absent(sqlite3.OperationalError('database is locked')))
+        self.assertFalse(index_recherche_absent(sqlite3.OperationalError('disk I/O error')))
+        self.assertFalse(index_recherche_absent(sqlite3.OperationalError('fts5: syntax error near "*"')))
+
+    def test_reconstruction_apres_desynchronisation(self):
+        """Teste reconstruire_index_recherche sur un index vidé hors triggers."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import reconstruire_index_recherche, rechercher_articles
+
+        conn = sqlite3.connect(self.chemin_db)
+        conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('delete-all')")
+        conn.commit()
+        conn.close()
+        self.assertEqual(self.rechercher(rechercher_articles, 'éducation'), [])
+
+        with unite_de_travail(self.chemin_db):
+            reconstruire_index_recherche()
+        self.assertEqual(self.rechercher(rechercher_articles, 'éducation'), [2, 1])
+
+
+class TestsAutocompletion(TestCase):
+    """Tests pour l'index d'autocomplétion en mémoire."""
+
+    ARTICLES = [
+        {'id': 1, 'titre': "L'Éducation au Sénégal", 'slug': 'education',
+         'type_article': 'article', 'image_url': None, 'auteur': 'Professeur',
+         'categories_noms': 'Société'},
+        {'id': 2, 'titre': 'Réforme de l\'éducation', 'slug': 'reforme',
+         'type_article': 'actualite', 'image_url': None, 'auteur': 'Professeur',
+         'categories_noms': ''},
+        {'id': 3, 'titre': 'Notes', 'slug': 'notes',
+         'type_article': 'article', 'image_url': None, 'auteur': 'Professeur',
+         'categories_noms': 'Éducation,Société'},
+    ]
+    LIVRES = [
+        {'id': 1, 'titre': 'Manuel', 'slug': 'manuel', 'image_couverture': None,
+         'auteur': 'Amadou Diop', 'prix': 5000, 'est_gratuit': 0,
+         'categories_noms': ''},
+    ]
+
+    def test_normalisation(self):
+        """Teste la suppression des accents, de la casse et de la ponctuation."""
+        from blog.autocompletion import normaliser
+
+        self.assertEqual(normaliser("  L'Éducation -- ÇA  "), 'l education ca')
+        self.assertEqual(normaliser(None), '')
+
+    def test_prefixes_et_priorites(self):
+        """Teste le classement titre, mot du titre, auteur puis catégorie."""
+        from blog.autocompletion import IndexAutocompletion
+
+        index = IndexAutocompletion(self.ARTICLES, self.LIVRES)
+        ids = [r['id'] for r in index.rechercher('EDUC')]
+        self.assertEqual(ids, [2, 1, 3])
+        self.assertEqual([r['id'] for r in index.rechercher('de l edu')], [2])
+        self.assertEqual([r['id'] for r in index.rechercher('éducation au')], [1])
+        self.assertEqual(index.rechercher('diop')[0]['prix'], 5000)
+        self.assertEqual(index.rechercher('xyz'), [])
+        self.assertEqual(index.rechercher('  '), [])
+
+    def test_limite_par_type(self):
+        """Teste la limite d'articles et de livres et l'ordre des types."""
+        from blog.autocompletion import IndexAutocompletion
+
+        index = IndexAutocompletion(self.ARTICLES, self.LIVRES)
+        resultats = index.rechercher('p', limite_par_type=1)
+        self.assertEqual([r['type'] for r in resultats], ['article'])
+        resultats = index.rechercher('m', limite_par_type=1)
+        self.assertEqual([r['type'] for r in resultats], ['livre'])
+
+    def test_reconstruction_apres_ecriture(self):
+        """Teste que l'index suit les changements de version du catalogue."""
+        import os
+        import tempfile
+        from blog import autocompletion
+        from blog.db_connexion import unite_de_travail, obtenir_pool
+        from blog.db_operations import incrementer_version_contenu
+        from blog.db_schema import SCHEMA_SQL
+
+        descripteur, chemin = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(chemin)
+        conn.executescript(SCHEMA_SQL)
+        conn.execute("INSERT INTO articles (titre, slug, est_publie) VALUES ('Alpha', 'a', 1)")
+        conn.commit()
+        conn.close()
+        autocompletion._index = autocompletion._version_index = None
+        try:
+            with unite_de_travail(chemin) as unite:
+                self.assertEqual(len(autocompletion.autocompleter('alp')), 1)
+                index = autocompletion.obtenir_index_autocompletion()
+                self.assertIs(autocompletion.obtenir_index_autocompletion(), index)
+
+                unite.obtenir_connexion().execute(
+                    "INSERT INTO articles (titre, slug, est_publie) VALUES ('Alpine', 'b', 1)"
+                )
+                incrementer_version_contenu()
+                self.assertEqual(len(autocompletion.autocompleter('alp')), 2)
+        finally:
+            autocompletion._index = autocompletion._version_index = None
+            obtenir_pool(chemin).vider()
+            os.remove(chemin)
+
+
+# =============================================================================
+# TESTS UNITAIRES - COMPTEURS DE VUES
+# =============================================================================
+
+class TestsTamponVues(TestCase):
+    """Tests pour le tampon d'écriture différée des vues."""
+
+    def setUp(self):
+        from blog.compteurs import TamponVues
+
+        self.lots = []
+        self.tampon = TamponVues(self.lots.append, intervalle=60, seuil=1000)
+
+    def tearDown(self):
+        self.tampon.arreter()
+
+    def test_agregation_par_contenu_et_jour(self):
+        """Teste que les vues sont agrégées avant l'écriture."""
+        for _ in range(3):
+            self.tampon.ajouter(article_id=1, date_vue='2024-01-01')
+        self.tampon.ajouter(article_id=1, date_vue='2024-01-02')
+        self.tampon.ajouter(livre_id=7, date_vue='2024-01-01')
+
+        self.assertEqual(self.lots, [])
+        self.tampon.vider()
+
+        self.assertEqual(len(self.lots), 1)
+        self.assertCountEqual(self.lots[0], [
+            (1, None, '2024-01-01', 3),
+            (1, None, '2024-01-02', 1),
+            (None, 7, '2024-01-01', 1),
+        ])
+
+    def test_seuil_declenche_ecriture(self):
+        """Teste que le seuil réveille le thread d'écriture."""
+        import time
+
+        self.tampon.seuil = 5
+        for _ in range(5):
+            self.tampon.ajouter(article_id=2)
+
+        limite = time.monotonic() + 5
+        while not self.lots and time.monotonic() < limite:
+            time.sleep(0.01)
+        self.assertEqual(sum(n for lot in self.lots for *_, n in lot), 5)
+
+    def test_sous_classe_incomplete_refusee(self):
+        """Teste qu'une écriture différée sans ses crochets n'est pas créée."""
+        from blog.ecriture_differee import EcritureDifferee
+
+        class SansReinjection(EcritureDifferee):
+            def _reinitialiser_file(self):
+                self._en_attente = []
+
+            def _taille_file(self):
+                return len(self._en_attente)
+
+            def _lignes(self, en_attente):
+                return en_attente
+
+        with self.assertRaises(TypeError):
+            SansReinjection(self.lots.append, intervalle=60, seuil=10)
+
+    def test_echec_ecriture_conserve_les_vues(self):
+        """Teste que les vues sont conservées si l'écriture échoue."""
+        def ecrire_en_echec(lignes):
+            raise sqlite3.OperationalError('database is locked')
+
+        self.tampon.ecrire = ecrire_en_echec
+        self.tampon.ajouter(article_id=3)
+        self.tampon.vider()
+        self.assertEqual(self.tampon.obtenir_statistiques()['vues_en_attente'], 1)
+
+        self.tampon.ecrire = self.lots.append
+        self.tampon.arreter()
+        self.assertEqual(self.lots[0][0][3], 1)
+
+    def test_ecriture_en_lot_upsert(self):
+        """Teste l'écriture en lot dans statistiques_vues."""
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL
+        from blog.db_connexion import obtenir_pool, unite_de_travail
+        from blog.db_operations import enregistrer_vues_en_lot
+
+        descripteur, chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.close()
+
+        for _ in range(2):
+            with unite_de_travail(chemin_db):
+                enregistrer_vues_en_lot([
+                    (1, None, '2024-01-01', 4),
+                    (None, 1, '2024-01-01', 2),
+                ])
+
+        conn = sqlite3.connect(chemin_db)
+        lignes = conn.execute(
+            "SELECT article_id, livre_id, nombre_vues FROM statistiques_vues"
+            " ORDER BY id"
+        ).fetchall()
+        conn.close()
+        obtenir_pool(chemin_db).vider()
+        os.remove(chemin_db)
+
+        self.assertEqual(lignes, [(1, None, 8), (None, 1, 4)])
+
+
+class TestsUpsertVues(TestCase):
+    """Tests de concurrence pour l'écriture directe des vues."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.execute("INSERT INTO articles (id, titre, slug) VALUES (1, 'A', 'a')")
+        conn.execute("INSERT INTO articles (id, titre, slug) VALUES (2, 'B', 'b')")
+        conn.execute("INSERT INTO livres (id, titre, slug) VALUES (1, 'L', 'l')")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+
+        obtenir_pool(self.chemin_db).vider()
+        for suffixe in ('', '-wal', '-shm'):
+            if os.path.exists(self.chemin_db + suffixe):
+                os.remove(self.chemin_db + suffixe)
+
+    def test_vues_concurrentes_totaux_exacts(self):
+        """Teste que des milliers de vues parallèles sont toutes comptées."""
+        import threading
+        from django.test import override_settings
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import incrementer_vues
+
+        nombre_threads, vues_par_thread = 8, 300
+        erreurs = []
+        depart = threading.Barrier(nombre_threads)
+
+        def visiteur(numero):
+            depart.wait()
+            for i in range(vues_par_thread):
+                cible = (numero + i) % 3
+                try:
+                    # Une unité de travail par vue, comme une requête HTTP
+                    with unite_de_travail(self.chemin_db):
+                        if cible == 2:
+                            incrementer_vues(livre_id=1)
+                        else:
+                            incrementer_vues(article_id=cible + 1)
+                except Exception as e:
+                    erreurs.append(e)
+
+        fils = [
+            threading.Thread(target=visiteur, args=(n,))
+            for n in range(nombre_threads)
+        ]
+        # Écriture directe (sans tampon) pour exercer l'UPSERT
+        with override_settings(BLOG_TAMPON_VUES={'ACTIF': False}):
+            for fil in fils:
+                fil.start()
+            for fil in fils:
+                fil.join()
+
+        self.assertEqual(erreurs, [])
+
+        conn = sqlite3.connect(self.chemin_db)
+        totaux = dict(conn.execute(
+            "SELECT COALESCE(article_id, -livre_id), SUM(nombre_vues)"
+            " FROM statistiques_vues GROUP BY 1"
+        ).fetchall())
+        lignes = conn.execute("SELECT COUNT(*) FROM statistiques_vues").fetchone()[0]
+        conn.close()
+
+        attendus = {1: 0, 2: 0, -1: 0}
+        for numero in range(nombre_threads):
+            for i in range(vues_par_thread):
+                attendus[[1, 2, -1][(numero + i) % 3]] += 1
+
+        self.assertEqual(totaux, attendus)
+        self.assertEqual(sum(totaux.values()), nombre_threads * vues_par_thread)
+        # Une seule ligne par contenu et par jour
+        self.assertEqual(lignes, 3)
+
+
+class TestsHistoriqueMensuel(TestCase):
+    """Tests pour les totaux de vues et la compaction de l'historique."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        for article_id in (1, 2, 3):
+            conn.execute(
+                "INSERT INTO articles (id, titre, slug, est_publie, date_modification)"
+                " VALUES (?, ?, ?, 1, '2020-01-01 00:00:00')",
+                (article_id, f'A{article_id}', f'a{article_id}'),
+            )
+        conn.execute("INSERT INTO livres (id, titre, slug) VALUES (1, 'L', 'l')")
+        conn.executemany(
+            'INSERT INTO statistiques_vues (article_id, livre_id, nombre_vues, date_vue)'
+            ' VALUES (?, ?, ?, ?)',
+            [
+                (1, None, 5, '2024-01-03'),
+                (1, None, 7, '2024-01-20'),
+                (1, None, 2, '2024-02-11'),
+                (2, None, 30, '2024-01-15'),
+                (None, 1, 4, '2024-01-09'),
+                (1, None, 1, '2024-03-01'),
+            ],
+        )
+        conn.executemany(
+            'INSERT INTO telechargements (livre_id, ip_address, date_telechargement)'
+            ' VALUES (1, ?, ?)',
+            [
+                ('10.0.0.1', '2024-01-05 10:00:00'),
+                ('10.0.0.2', '2024-01-31 23:59:59'),
+                ('10.0.0.3', '2024-02-01 00:00:00'),
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+
+        obtenir_pool(self.chemin_db).vider()
+        os.remove(self.chemin_db)
+
+    def lire(self, requete):
+        conn = sqlite3.connect(self.chemin_db)
+        lignes = conn.execute(requete).fetchall()
+        conn.close()
+        return lignes
+
+    def test_totaux_tenus_par_les_triggers(self):
+        """Teste total_vues et le classement, sans toucher date_modification."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import obtenir_articles_plus_lus
+
+        self.assertEqual(
+            self.lire('SELECT id, total_vues FROM articles ORDER BY id'),
+            [(1, 15), (2, 30), (3, 0)],
+        )
+        self.assertEqual(self.lire('SELECT total_vues FROM livres'), [(4,)])
+        self.assertEqual(
+            self.lire('SELECT DISTINCT date_modification FROM articles'),
+            [('2020-01-01 00:00:00',)],
+        )
+
+        with unite_de_travail(self.chemin_db):
+            articles = obtenir_articles_plus_lus(limite=2)
+        self.assertEqual([(a['id'], a['total_vues']) for a in articles], [(2, 30), (1, 15)])
+
+    def test_compaction_garde_les_totaux(self):
+        """Teste que les mois regroupés gardent les totaux et le classement."""
+        from datetime import date
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import (
+            compacter_mois,
+            lister_mois_a_compacter,
+            recalculer_statistiques_globales,
+        )
+
+        with unite_de_travail(self.chemin_db):
+            mois = lister_mois_a_compacter('statistiques_vues', date(2024, 3, 15))
+            self.assertEqual(
+                mois, [('2024-01-01', '2024-02-01'), ('2024-02-01', '2024-03-01')]
+            )
+            lignes = [compacter_mois('statistiques_vues', *m) for m in mois]
+        self.assertEqual(lignes, [4, 1])
+
+        self.assertEqual(
+            self.lire(
+                'SELECT article_id, livre_id, mois, nombre_vues'
+                ' FROM statistiques_vues_mensuelles ORDER BY mois, article_id, livre_id'
+            ),
+            [(None, 1, '2024-01', 4), (1, None, '2024-01', 12), (2, None, '2024-01', 30),
+             (1, None, '2024-02', 2)],
+        )
+        # Le mois en cours de la fenêtre détaillée n'est pas regroupé
+        self.assertEqual(self.lire('SELECT date_vue FROM statistiques_vues'), [('2024-03-01',)])
+        self.assertEqual(
+            self.lire('SELECT id, total_vues FROM articles ORDER BY id'),
+            [(1, 15), (2, 30), (3, 0)],
+        )
+        self.assertEqual(self.lire('SELECT total_vues FROM compteurs_globaux'), [(49,)])
+        with unite_de_travail(self.chemin_db):
+            self.assertEqual(recalculer_statistiques_globales()['total_vues'], 49)
+
+        # Relancée, la compaction n'a plus rien à faire
+        with unite_de_travail(self.chemin_db):
+            self.assertEqual(
+                lister_mois_a_compacter('statistiques_vues', date(2024, 3, 15)), []
+            )
+
+    def test_compaction_des_telechargements_par_lots(self):
+        """Teste le regroupement mois par mois, sans les adresses IP."""
+        from datetime import date
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import compacter_mois, lister_mois_a_compacter
+
+        with unite_de_travail(self.chemin_db):
+            mois = lister_mois_a_compacter('telechargements', date(2024, 6, 1), lots=1)
+            self.assertEqual(mois, [('2024-01-01', '2024-02-01')])
+            self.assertEqual(compacter_mois('telechargements', *mois[0]), 2)
+
+        self.assertEqual(
+            self.lire('SELECT livre_id, mois, nombre_telechargements FROM telechargements_mensuels'),
+            [(1, '2024-01', 2)],
+        )
+        self.assertEqual(self.lire('SELECT ip_address FROM telechargements'), [('10.0.0.3',)])
+
+
+class TestsScoresTendance(TestCase):
+    """Tests pour les scores de tendance (articles et livres populaires)."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.execute("UPDATE parametres_tendances SET epoque = '2024-01-01', demi_vie = 7")
+        for article_id in (1, 2, 3):
+            conn.execute(
+                "INSERT INTO articles (id, titre, slug, est_publie, date_creation, date_modification)"
+                " VALUES (?, ?, ?, 1, ?, '2020-01-01 00:00:00')",
+                (article_id, f'A{article_id}', f'a{article_id}', f'2023-12-0{article_id}'),
+            )
+        conn.execute("INSERT INTO livres (id, titre, slug, est_publie) VALUES (1, 'L1', 'l1', 1)")
+        conn.execute("INSERT INTO livres (id, titre, slug, est_publie) VALUES (2, 'L2', 'l2', 1)")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+
+        obtenir_pool(self.chemin_db).vider()
+        os.remove(self.chemin_db)
+
+    def scores(self, table):
+        conn = sqlite3.connect(self.chemin_db)
+        scores = dict(conn.execute(f'SELECT id, score_tendance FROM {table}').fetchall())
+        conn.close()
+        return scores
+
+    def ajouter_vues(self, vues):
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import enregistrer_vues_en_lot
+
+        with unite_de_travail(self.chemin_db):
+            enregistrer_vues_en_lot(vues)
+
+    def test_epoque_recalee_automatiquement(self):
+        """Teste le recalage de l'époque quand les poids deviennent trop grands."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import recalculer_tendances
+
+        self.ajouter_vues([(1, None, '2024-01-08', 4), (2, None, '2024-01-01', 6)])
+        # 61 demi-vies plus tard: au-delà du seuil (60), l'époque suit
+        self.ajouter_vues([(3, None, '2025-03-03', 2)])
+
+        conn = sqlite3.connect(self.chemin_db)
+        epoque = conn.execute('SELECT epoque FROM parametres_tendances').fetchone()[0]
+        conn.close()
+        recales = self.scores('articles')
+        with unite_de_travail(self.chemin_db):
+            recalculer_tendances(epoque='2025-03-03')
+        recalcules = self.scores('articles')
+
+        self.assertEqual(epoque, '2025-03-03')
+        self.assertEqual(recales[3], 2.0)
+        self.assertAlmostEqual(recales[1] / recales[2], 4 * 2 / 6)
+        for article_id, score in recalcules.items():
+            self.assertAlmostEqual(recales[article_id], score, delta=score * 1e-9)
+
+    def test_vues_recentes_classees_en_tete(self):
+        """Teste qu'une vue récente pèse plus que des vues anciennes."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import obtenir_articles_populaires
+
+        # 10 vues le jour de l'époque, 3 vues trois semaines plus tard (x8)
+        self.ajouter_vues([(1, None, '2024-01-01', 6), (2, None, '2024-01-22', 3)])
+        self.ajouter_vues([(1, None, '2024-01-01', 4)])
+        self.assertEqual(self.scores('articles'), {1: 10.0, 2: 24.0, 3: 0.0})
+
+        with unite_de_travail(self.chemin_db):
+            populaires = obtenir_articles_populaires(limite=3)
+        # Sans vue, l'ordre est celui des derniers articles
+        self.assertEqual([a['id'] for a in populaires], [2, 1, 3])
+
+        conn = sqlite3.connect(self.chemin_db)
+        dates = conn.execute('SELECT DISTINCT date_modification FROM articles').fetchall()
+        conn.close()
+        self.assertEqual(dates, [('2020-01-01 00:00:00',)])
+
+    def test_telechargements_des_livres(self):
+        """Teste le poids des téléchargements dans le score des livres."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import (
+            enregistrer_telechargements_en_lot,
+            obtenir_livres_populaires,
+        )
+
+        self.ajouter_vues([(None, 1, '2024-01-08', 3)])
+        with unite_de_travail(self.chemin_db):
+            enregistrer_telechargements_en_lot([(2, None, None, None, '2024-01-08 00:00:00')])
+            populaires = obtenir_livres_populaires(limite=2)
+        self.assertEqual(self.scores('livres'), {1: 6.0, 2: 10.0})
+        self.assertEqual([l['id'] for l in populaires], [2, 1])
+
+    def test_recalcul_et_nouvelle_epoque(self):
+        """Teste que le recalcul retrouve les scores des triggers, recalés."""
+        from django.test import override_settings
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import (
+            compacter_mois,
+            enregistrer_telechargements_en_lot,
+            recalculer_tendances,
+        )
+
+        self.ajouter_vues([
+            (1, None, '2024-01-15', 2), (2, None, '2024-01-29', 1), (None, 1, '2024-01-15', 1),
+        ])
+        with unite_de_travail(self.chemin_db):
+            enregistrer_telechargements_en_lot([(2, None, None, None, '2024-01-15 00:00:00')])
+        articles, livres = self.scores('articles'), self.scores('livres')
+
+        with override_settings(BLOG_TENDANCES={'DEMI_VIE': 7.0, 'POIDS_TELECHARGEMENT': 5.0}):
+            with unite_de_travail(self.chemin_db):
+                recalculer_tendances('2024-01-15')
+        # Nouvelle époque deux semaines plus tard: scores divisés par 4
+        self.assertEqual(self.scores('articles'), {k: v / 4 for k, v in articles.items()})
+        self.assertEqual(self.scores('livres'), {k: v / 4 for k, v in livres.items()})
+
+        # La compaction ne change pas les scores
+        with unite_de_travail(self.chemin_db):
+            compacter_mois('statistiques_vues', '2024-01-01', '2024-02-01')
+        self.assertEqual(self.scores('articles'), {1: 2.0, 2: 4.0, 3: 0.0})
+
+
+class TestsConsommationTelechargements(TestCase):
+    """Tests pour la consommation atomique des téléchargements payants."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL
+
+        descripteur, self.chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(self.chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.execute("INSERT INTO livres (id, titre, slug) VALUES (1, 'L', 'l')")
+        achats = [
+            ('valide', 'paye', 3, None),
+            ('impaye', 'en_attente', 3, None),
+            ('expire', 'paye', 3, '2000-01-01T00:00:00'),
+            ('futur', 'paye', 3, '2999-01-01T00:00:00.123456'),
+        ]
+        conn.executemany(
+            "INSERT INTO achats (livre_id, nom_client, email_client, montant, statut,"
+            " token_telechargement, max_telechargements, expire_le)"
+            " VALUES (1, 'C', 'c@example.com', 10, ?, ?, ?, ?)",
+            [(statut, token, maximum, expire) for token, statut, maximum, expire in achats],
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        import os
+        from blog.db_connexion import obtenir_pool
+
+        obtenir_pool(self.chemin_db).vider()
+        for suffixe in ('', '-wal', '-shm'):
+            if os.path.exists(self.chemin_db + suffixe):
+                os.remove(self.chemin_db + suffixe)
+
+    def test_statut_et_expiration(self):
+        """Teste que seuls les achats payés et non expirés sont consommés."""
+        from django.test import override_settings
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import consommer_telechargement
+
+        with override_settings(BLOG_JOURNAL_TELECHARGEMENTS={'ACTIF': False}), \
+                unite_de_travail(self.chemin_db):
+            achat = consommer_telechargement('valide', ip='127.0.0.1')
+            self.assertEqual(achat['nombre_telechargements'], 1)
+            self.assertEqual(achat['livre_slug'], 'l')
+            self.assertIsNone(consommer_telechargement('impaye'))
+            self.assertIsNone(consommer_telechargement('expire'))
+            self.assertIsNone(consommer_telechargement('inconnu'))
+            self.assertIsNotNone(consommer_telechargement('futur'))
+
+    def test_quota_jamais_depasse_en_parallele(self):
+        """Teste que des clics simultanés ne dépassent pas max_telechargements."""
+        import threading
+        from django.test import override_settings
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import consommer_telechargement
+
+        nombre_threads = 16
+        resultats = []
+        erreurs = []
+        depart = threading.Barrier(nombre_threads)
+
+        def client():
+            depart.wait()
+            try:
+                # Une unité de travail par clic, comme une requête HTTP
+                with unite_de_travail(self.chemin_db):
+                    resultats.append(consommer_telechargement('valide'))
+            except Exception as e:
+                erreurs.append(e)
+
+        fils = [threading.Thread(target=client) for _ in range(nombre_threads)]
+        # Historique écrit dans la requête pour pouvoir le compter
+        with override_settings(BLOG_JOURNAL_TELECHARGEMENTS={'ACTIF': False}):
+            for fil in fils:
+                fil.start()
+            for fil in fils:
+                fil.join()
+
+        self.assertEqual(erreurs, [])
+        acceptes = [achat for achat in resultats if achat is not None]
+        self.assertEqual(len(acceptes), 3)
+        self.assertEqual(
+            sorted(achat['nombre_telechargements'] for achat in acceptes), [1, 2, 3]
+        )
+
+        conn = sqlite3.connect(self.chemin_db)
+        compteurs = conn.execute(
+            "SELECT a.nombre_telechargements, l.nombre_telechargements,"
+            " (SELECT COUNT(*) FROM telechargements)"
+            " FROM achats a JOIN livres l ON l.id = a.livre_id"
+            " WHERE a.token_telechargement = 'valide'"
+        ).fetchone()
+        conn.close()
+        self.assertEqual(compteurs, (3, 3, 3))
+
+
+class TestsJournalTelechargements(TestCase):
+    """Tests pour l'historique des téléchargements écrit en lot."""
+
+    def setUp(self):
+        from blog.journal import JournalTelechargements
+
+        self.lots = []
+        self.journal = JournalTelechargements(
+            self.lots.append, intervalle=60, seuil=1000, capacite=3
+        )
+
+    def tearDown(self):
+        self.journal.arreter()
+
+    def test_file_bornee_compte_les_pertes(self):
+        """Teste qu'au-delà de la capacité les entrées sont perdues et comptées."""
+        resultats = [self.journal.ajouter(1, ip='10.0.0.1') for _ in range(5)]
+
+        self.assertEqual(resultats, [True, True, True, False, False])
+        statistiques = self.journal.obtenir_statistiques()
+        self.assertEqual(statistiques['entrees_en_attente'], 3)
+        self.assertEqual(statistiques['perdues'], 2)
+        self.assertEqual(self.journal.vider(), 3)
+        self.assertEqual(len(self.lots[0]), 3)
+
+    def test_echec_ecriture_conserve_les_entrees(self):
+        """Teste que les entrées sont réinjectées, dans l'ordre, après un échec."""
+        def ecrire_en_echec(lignes):
+            raise sqlite3.OperationalError('database is locked')
+
+        self.journal.ecrire = ecrire_en_echec
+        self.journal.ajouter(1, achat_id=10)
+        self.journal.ajouter(2, achat_id=20)
+        self.journal.vider()
+        self.journal.ajouter(3, achat_id=30)
+        self.assertEqual(self.journal.obtenir_statistiques()['echecs'], 1)
+
+        self.journal.ecrire = self.lots.append
+        self.journal.arreter()
+        self.assertEqual([ligne[0] for ligne in self.lots[0]], [1, 2, 3])
+
+    def test_ecriture_en_lot(self):
+        """Teste l'écriture en lot dans telechargements, date d'origine comprise."""
+        import os
+        import tempfile
+        from blog.db_schema import SCHEMA_SQL
+        from blog.db_connexion import obtenir_pool, unite_de_travail
+        from blog.db_operations import enregistrer_telechargements_en_lot
+
+        descripteur, chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        conn = sqlite3.connect(chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.execute("INSERT INTO livres (id, titre, slug) VALUES (1, 'L', 'l')")
+        conn.commit()
+        conn.close()
+
+        self.journal.ajouter(1, ip='10.0.0.1', user_agent='x' * 2000)
+        self.journal.ajouter(1, achat_id=None)
+        self.journal.ecrire = enregistrer_telechargements_en_lot
+        with unite_de_travail(chemin_db):
+            self.assertEqual(self.journal.vider(), 2)
+
+        conn = sqlite3.connect(chemin_db)
+        lignes = conn.execute(
+            'SELECT ip_address, LENGTH(user_agent), date_telechargement FROM telechargements'
+            ' ORDER BY id'
+        ).fetchall()
+        conn.close()
+        obtenir_pool(chemin_db).vider()
+        os.remove(chemin_db)
+
+        self.assertEqual([ligne[:2] for ligne in lignes], [('10.0.0.1', 512), (None, None)])
+        self.assertRegex(lignes[0][2], r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$')
+
+
+# =============================================================================
+# TESTS UNITAIRES - LIVRAISON DES FICHIERS
+# =============================================================================
+
+class TestsLivraisonFichiers(TestCase):
+    """Tests pour l'envoi des PDF (blog.fichiers)."""
+
+    def setUp(self):
+        import os
+        import tempfile
+        from django.test import override_settings
+
+        self.racine = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.racine, 'livres'))
+        self.contenu = bytes(range(256)) * 40
+        with open(os.path.join(self.racine, 'livres', 'guide.pdf'), 'wb') as fichier:
+            fichier.write(self.contenu)
+        self.reglages = override_settings(
+            BLOG_FICHIERS={'RACINE': self.racine, 'MODE': 'django'},
+            BLOG_JOURNAL_TELECHARGEMENTS={'ACTIF': False},
+        )
+        self.reglages.enable()
+
+    def tearDown(self):
+        import shutil
+
+        self.reglages.disable()
+        shutil.rmtree(self.racine)
+
+    def servir(self, **entetes):
+        from django.test import RequestFactory
+        from blog.fichiers import preparer_pdf
+
+        request = RequestFactory().get('/telecharger/', headers=entetes)
+        return preparer_pdf(request, 'livres/guide.pdf').reponse('guide.pdf')
+
+    def lire(self, reponse):
+        contenu = b''.join(reponse.streaming_content)
+        reponse.close()
+        return contenu
+
+    def test_analyse_des_plages(self):
+        """Teste les formes d'en-tête Range acceptées ou ignorées."""
+        from blog.fichiers import PlageNonSatisfiable, analyser_plage
+
+        self.assertEqual(analyser_plage('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(analyser_plage('bytes=900-', 1000), (900, 999))
+        self.assertEqual(analyser_plage('bytes=-100', 1000), (900, 999))
+        self.assertEqual(analyser_plage('bytes=500-5000', 1000), (500, 999))
+        self.assertIsNone(analyser_plage(None, 1000))
+        self.assertIsNone(analyser_plage('bytes=0-1,5-9', 1000))
+        self.assertIsNone(analyser_plage('lignes=0-1', 1000))
+        with self.assertRaises(PlageNonSatisfiable):
+            analyser_plage('bytes=1000-', 1000)
+
+    def test_fichier_entier(self):
+        """Teste l'envoi complet avec ETag et en-têtes de téléchargement."""
+        reponse = self.servir()
+
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse['Content-Type'], 'application/pdf')
+        self.assertEqual(reponse['Accept-Ranges'], 'bytes')
+        self.assertEqual(int(reponse['Content-Length']), len(self.contenu))
+        self.assertIn('attachment', reponse['Content-Disposition'])
+        self.assertTrue(reponse['ETag'].startswith('"'))
+        self.assertEqual(self.lire(reponse), self.contenu)
+
+    def test_plage_et_reprise_conditionnelle(self):
+        """Teste les réponses 206, 416, If-Range et 304."""
+        etag = self.servir()['ETag']
+
+        reponse = self.servir(Range='bytes=100-199')
+        self.assertEqual(reponse.status_code, 206)
+        self.assertEqual(reponse['Content-Range'], f'bytes 100-199/{len(self.contenu)}')
+        self.assertEqual(reponse['Content-Length'], '100')
+        self.assertEqual(self.lire(reponse), self.contenu[100:200])
+
+        reponse = self.servir(Range='bytes=100-', **{'If-Range': '"ancien"'})
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(self.lire(reponse), self.contenu)
+
+        reponse = self.servir(Range='bytes=100-', **{'If-Range': etag})
+        self.assertEqual(self.lire(reponse), self.contenu[100:])
+
+        reponse = self.servir(Range=f'bytes={len(self.contenu)}-')
+        self.assertEqual(reponse.status_code, 416)
+        self.assertEqual(reponse['Content-Range'], f'bytes */{len(self.contenu)}')
+
+        self.assertEqual(self.servir(**{'If-None-Match': etag}).status_code, 304)
+
+    def test_delegation_au_serveur_web(self):
+        """Teste X-Accel-Redirect (nginx) et X-Sendfile: aucun contenu envoyé."""
+        import os
+        from django.test import override_settings
+
+        with override_settings(BLOG_FICHIERS={'RACINE': self.racine, 'MODE': 'x-accel'}):
+            reponse = self.servir(Range='bytes=10-')
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse['X-Accel-Redirect'], '/fichiers-proteges/livres/guide.pdf')
+        self.assertEqual(reponse.content, b'')
+
+        with override_settings(BLOG_FICHIERS={'RACINE': self.racine, 'MODE': 'x-sendfile'}):
+            reponse = self.servir()
+        self.assertEqual(
+            reponse['X-Sendfile'],
+            os.path.realpath(os.path.join(self.racine, 'livres', 'guide.pdf')),
+        )
+
+    def test_chemin_hors_racine_refuse(self):
+        """Teste qu'un chemin qui sort de la racine n'est ni servi ni compté."""
+        import os
+        import shutil
+        import tempfile
+        from blog.fichiers import resoudre_chemin
+
+        self.assertIsNone(resoudre_chemin('../secret.pdf', self.racine))
+        self.assertIsNone(resoudre_chemin('/../../etc/passwd', self.racine))
+        self.assertIsNotNone(resoudre_chemin('/media/livres/guide.pdf', self.racine))
+
+        # Fichier existant, mais hors de la racine
+        ailleurs = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, ailleurs)
+        with open(os.path.join(ailleurs, 'secret.pdf'), 'wb') as fichier:
+            fichier.write(self.contenu)
+        relatif = os.path.relpath(os.path.join(ailleurs, 'secret.pdf'), self.racine)
+        chemin_db = self.creer_base(relatif)
+
+        reponse, compte = self.telecharger(chemin_db)
+
+        self.assertEqual(reponse.status_code, 302)
+        self.assertEqual(reponse.url, '/livre/guide/')
+        self.assertEqual(compte, 0)
+
+    def test_ancien_chemin_media(self):
+        """Teste qu'un PDF resté dans MEDIA_ROOT (/media/...) est encore servi."""
+        import os
+        import shutil
+        import tempfile
+        from django.test import override_settings
+
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        os.mkdir(os.path.join(media, 'livres'))
+        with open(os.path.join(media, 'livres', 'ancien.pdf'), 'wb') as fichier:
+            fichier.write(self.contenu)
+        chemin_db = self.creer_base('/media/livres/ancien.pdf')
+
+        with override_settings(
+            MEDIA_ROOT=media,
+            BLOG_FICHIERS={'RACINE': self.racine, 'MODE': 'x-accel'},
+        ):
+            reponse, compte = self.telecharger(chemin_db)
+
+        self.assertEqual(reponse.status_code, 200)
+        self.assertNotIn('X-Accel-Redirect', reponse)
+        self.assertEqual(self.lire(reponse), self.contenu)
+        self.assertEqual(compte, 1)
+
+    def creer_base(self, fichier_pdf='livres/guide.pdf'):
+        """Base temporaire: un livre et deux achats payés limités à 1 et à 10."""
+        import os
+        import tempfile
+        from blog.db_connexion import obtenir_pool
+        from blog.db_schema import SCHEMA_SQL
+
+        descripteur, chemin_db = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descripteur)
+        self.addCleanup(os.remove, chemin_db)
+        self.addCleanup(lambda: obtenir_pool(chemin_db).vider())
+        conn = sqlite3.connect(chemin_db)
+        conn.executescript(SCHEMA_SQL)
+        conn.execute(
+            "INSERT INTO livres (id, titre, slug, fichier_pdf) VALUES (1, 'G', 'guide', ?)",
+            (fichier_pdf,),
+        )
+        for jeton, maximum in (('jeton', 1), ('large', 10)):
+            conn.execute(
+                "INSERT INTO achats (livre_id, nom_client, email_client, montant, statut,"
+                " token_telechargement, max_telechargements)"
+                " VALUES (1, 'C', 'c@example.com', 10, 'paye', ?, ?)",
+                (jeton, maximum),
+            )
+        conn.commit()
+        conn.close()
+        return chemin_db
+
+    def telecharger(self, chemin_db, jeton='jeton', **entetes):
+        """Appelle la vue telecharger_livre; retourne la réponse et le compteur."""
+        from django.contrib.messages.storage.fallback import FallbackStorage
+        from django.test import RequestFactory
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import obtenir_achat_par_token
+        from blog.views import telecharger_livre
+
+        request = RequestFactory().get(f'/telecharger/{jeton}/', headers=entetes)
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        with unite_de_travail(chemin_db):
+            reponse = telecharger_livre(request, jeton)
+            compte = obtenir_achat_par_token(jeton)['nombre_telechargements']
+        return reponse, compte
+
+    def test_reprise_ne_compte_pas_un_telechargement(self):
+        """Teste qu'une reprise (Range) est servie sans consommer le lien."""
+        from blog.db_connexion import unite_de_travail
+        from blog.db_operations import verifier_achat_valide
+
+        chemin_db = self.creer_base()
+        premiere, compte = self.telecharger(chemin_db)
+        self.assertEqual(compte, 1)
+        reprise, compte = self.telecharger(chemin_db, Range='bytes=500-')
+        self.assertEqual(compte, 1)
+        with unite_de_travail(chemin_db):
+            self.assertIsNone(verifier_achat_valide('jeton'))
+            self.assertIsNotNone(verifier_achat_valide('jeton', reprise=True))
+
+        self.assertEqual(self.lire(premiere), self.contenu)
+        self.assertEqual(reprise.status_code, 206)
+        self.assertEqual(self.lire(reprise), self.contenu[500:])
+
+    def test_envoi_complet_toujours_compte(self):
+        """Teste que chaque réponse qui part du premier octet consomme le lien."""
+        chemin_db = self.creer_base()
+        self.telecharger(chemin_db)
+        entetes_contournement = [
+            {'Range': 'bytes=5-3'},
+            {'Range': 'bytes=-99999999'},
+            {'Range': 'bytes=00-'},
+            {'Range': 'bytes=0-99'},
+            {'Range': 'bytes=1-', 'If-Range': '"x"'},
+        ]
+
+        for numero, entetes in enumerate(entetes_contournement, start=1):
+            with self.subTest(entetes=entetes):
+                # Lien épuisé: refusé au lieu d'envoyer le fichier
+                reponse, compte = self.telecharger(chemin_db, **entetes)
+                self.assertEqual(reponse.status_code, 302)
+                self.assertEqual(compte, 1)
+
+                # Lien valide: le téléchargement est compté
+                reponse, compte = self.telecharger(chemin_db, 'large', **entetes)
+                self.assertIn(reponse.status_code, (200, 206))
+                self.assertTrue(self.lire(reponse).startswith(self.contenu[:1]))
+                self.assertEqual(compte, numero)
+
+    def test_fichier_absent_ne_consomme_pas(self):
+        """Teste qu'un PDF introuvable ne consomme pas de téléchargement."""
+        chemin_db = self.creer_base('livres/absent.pdf')
+
+        reponse, compte = self.telecharger(chemin_db)
+
+        self.assertEqual(reponse.status_code, 302)
+        self.assertEqual(reponse.url, '/livre/guide/')
+        self.assertEqual(compte, 0)
+
+
 # =============================================================================
 # TESTS D'INTÉGRATION - VUES
 # =============================================================================
@@ -4,46 +4,48 @@ Vues pour le Blog Académique du Professeur.
 
 from django.shortcuts import render, redirect
 from django.http import JsonResponse, Http404, FileResponse
-from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.http import require_GET, require_POST, require_safe
 from django.views.decorators.csrf import csrf_exempt
-from django.core.paginator import Paginator
 from django.contrib import messages
 
 from blog.db_operations import (
     # Articles
-    obtenir_tous_articles,
+    paginer_articles,
+    compter_articles,
     obtenir_article_par_slug,
     obtenir_articles_vedettes,
     obtenir_articles_populaires,
     obtenir_articles_plus_lus,
     obtenir_derniers_articles,
-    rechercher_articles,
-    obtenir_articles_par_categorie,
     obtenir_categorie_par_slug,
     obtenir_toutes_categories,
     incrementer_vues,
     # Livres
-    obtenir_tous_livres,
+    paginer_livres,
+    compter_livres,
     obtenir_livre_par_slug,
     obtenir_livres_vedettes,
     obtenir_livres_nouveaux,
-    obtenir_livres_gratuits,
-    obtenir_livres_payants,
-    rechercher_livres,
     incrementer_telechargements,
     # Achats
     creer_achat,
     obtenir_achat_par_token,
     verifier_achat_valide,
-    incrementer_telechargement_achat,
+    consommer_telechargement,
     enregistrer_telechargement,
     # Autres
-    rechercher_global,
     inscrire_newsletter,
     creer_message_contact,
-    obtenir_toutes_configurations,
     obtenir_statistiques_globales,
 )
+from blog.autocompletion import autocompleter
+from blog.cache import (
+    memoriser,
+    obtenir_configuration_cache,
+    obtenir_configurations_en_cache,
+    rechercher_en_cache,
+)
+from blog.fichiers import preparer_pdf
 
 
 # =============================================================================
@@ -54,18 +56,42 @@ from blog.db_operations import (
 @require_GET
 def accueil(request):
     """Page d'accueil du blog académique."""
+    sections = memoriser("accueil", _sections_accueil)
+    articles_plus_lus = memoriser(
+        "accueil:plus_lus",
+        lambda: obtenir_articles_plus_lus(limite=6),
+        ttl=obtenir_configuration_cache()["TTL_VUES"],
+    )
+    articles_populaires = _articles_populaires()
+
     contexte = {
         "titre_page": "Accueil",
+        **sections,
+        "contenus_vedettes": sections["articles_vedettes"],
+        "articles_plus_lus": articles_plus_lus,
+        "articles_populaires": articles_populaires,
+        "config_site": obtenir_configurations_en_cache(),
+    }
+    return render(request, "blog/accueil.html", contexte)
+
+
+def _sections_accueil():
+    """Sections du catalogue de la page d'accueil (mises en cache)."""
+    return {
         "articles_vedettes": obtenir_articles_vedettes(),
-        "contenus_vedettes": obtenir_articles_vedettes(),
-        "articles_populaires": obtenir_articles_populaires(limite=6),
         "derniers_articles": obtenir_derniers_articles(limite=6),
-        "articles_plus_lus": obtenir_articles_plus_lus(limite=6),
         "livres_vedettes": obtenir_livres_vedettes(limite=4),
         "livres_nouveaux": obtenir_livres_nouveaux(limite=4),
-        "config_site": obtenir_toutes_configurations(),
     }
-    return render(request, "blog/accueil.html", contexte)
+
+
+def _articles_populaires():
+    """Articles en tendance: suivent les vues, rafraîchis après TTL_VUES."""
+    return memoriser(
+        "articles:populaires",
+        lambda: obtenir_articles_populaires(limite=6),
+        ttl=obtenir_configuration_cache()["TTL_VUES"],
+    )
 
 
 # =============================================================================
@@ -73,32 +99,52 @@ def accueil(request):
 # =============================================================================
 
 
+def _page_curseur(request, paginer, compter, **filtres):
+    """
+    Page d'une liste d'après les paramètres ``apres``/``avant`` de la
+    requête; le total affiché est mis en cache jusqu'au prochain
+    changement du catalogue.
+    """
+    page = paginer(
+        apres=request.GET.get("apres"), avant=request.GET.get("avant"), **filtres
+    )
+    numero = request.GET.get("page", "1")
+    if (request.GET.get("apres") or request.GET.get("avant")) and numero.isdigit():
+        page.numero = max(1, int(numero))
+    page.total = memoriser(
+        f"compte:{compter.__name__}:{sorted(filtres.items())}",
+        lambda: compter(**filtres),
+    )
+    return page
+
+
 @require_GET
 def liste_articles(request):
     """Page listant tous les articles."""
-    page = request.GET.get("page", 1)
     categorie = request.GET.get("categorie")
     type_article = request.GET.get("type")
 
     if categorie:
-        articles = obtenir_articles_par_categorie(categorie, limite=100)
+        contenus = _page_curseur(
+            request, paginer_articles, compter_articles,
+            slug_categorie=categorie, est_publie=1,
+        )
         titre = f"Articles - {categorie.replace('-', ' ').title()}"
     elif type_article:
-        articles = obtenir_tous_articles(type_article=type_article, limite=100)
+        contenus = _page_curseur(
+            request, paginer_articles, compter_articles, type_article=type_article
+        )
         titre = f"Articles - {type_article.title()}"
     else:
-        articles = obtenir_tous_articles(limite=100)
+        contenus = _page_curseur(request, paginer_articles, compter_articles)
         titre = "Tous les Articles"
 
-    paginator = Paginator(articles, 12)
-    page_obj = paginator.get_page(page)
-
     # Récupérer les catégories pour les filtres
     categories = obtenir_toutes_categories()
 
     contexte = {
         "titre_page": titre,
-        "contenus": page_obj,
+        "contenus": contenus,
         "type_contenu": "article",
         "categories": categories,
     }
@@ -108,15 +154,13 @@ def liste_articles(request):
 @require_GET
 def liste_publications(request):
     """Page listant toutes les publications académiques."""
-    page = request.GET.get("page", 1)
-    publications = obtenir_tous_articles(type_article="publication", limite=100)
-
-    paginator = Paginator(publications, 12)
-    page_obj = paginator.get_page(page)
+    contenus = _page_curseur(
+        request, paginer_articles, compter_articles, type_article="publication"
+    )
 
     contexte = {
         "titre_page": "Publications Académiques",
-        "contenus": page_obj,
+        "contenus": contenus,
         "type_contenu": "publication",
     }
     return render(request, "blog/liste_contenus.html", contexte)
@@ -125,15 +169,13 @@ def liste_publications(request):
 @require_GET
 def liste_recherches(request):
     """Page listant les travaux de recherche."""
-    page = request.GET.get("page", 1)
-    recherches = obtenir_tous_articles(type_article="recherche", limite=100)
-
-    paginator = Paginator(recherches, 12)
-    page_obj = paginator.get_page(page)
+    contenus = _page_curseur(
+        request, paginer_articles, compter_articles, type_article="recherche"
+    )
 
     contexte = {
         "titre_page": "Travaux de Recherche",
-        "contenus": page_obj,
+        "contenus": contenus,
         "type_contenu": "recherche",
     }
     return render(request, "blog/liste_contenus.html", contexte)
@@ -149,7 +191,7 @@ def detail_article(request, slug):
 
     incrementer_vues(article_id=article["id"])
 
-    similaires = obtenir_articles_populaires(limite=6)
+    similaires = _articles_populaires()
     similaires = [s for s in similaires if s["id"] != article["id"]][:5]
 
     contexte = {
@@ -168,16 +210,15 @@ def categorie(request, slug):
     if not cat:
         raise Http404("Cette catégorie n'existe pas.")
 
-    page = request.GET.get("page", 1)
-    articles = obtenir_articles_par_categorie(slug, limite=100)
-
-    paginator = Paginator(articles, 12)
-    page_obj = paginator.get_page(page)
+    contenus = _page_curseur(
+        request, paginer_articles, compter_articles,
+        slug_categorie=slug, est_publie=1,
+    )
 
     contexte = {
         "titre_page": cat["nom"],
         "categorie": cat,
-        "contenus": page_obj,
+        "contenus": contenus,
     }
     return render(request, "blog/categorie.html", contexte)
 
@@ -190,31 +231,25 @@ def categorie(request, slug):
 @require_GET
 def liste_livres(request):
     """Page listant tous les livres."""
-    page = request.GET.get("page", 1)
-
     # Filtres
     est_gratuit = request.GET.get("gratuit")
     est_nouveau = request.GET.get("nouveau")
 
-    if est_gratuit == "1":
-        livres = obtenir_livres_gratuits(limite=50)
-        titre = "Livres Gratuits"
-    elif est_gratuit == "0":
-        livres = obtenir_livres_payants(limite=50)
-        titre = "Livres Payants"
+    if est_gratuit in ("0", "1"):
+        filtres = {"est_gratuit": int(est_gratuit), "est_publie": 1}
+        titre = "Livres Gratuits" if est_gratuit == "1" else "Livres Payants"
     elif est_nouveau == "1":
-        livres = obtenir_livres_nouveaux(limite=50)
+        filtres = {"est_nouveau": 1, "est_publie": 1}
         titre = "Nouveautés"
     else:
-        livres = obtenir_tous_livres(limite=50)
+        filtres = {}
         titre = "Tous les Livres"
 
-    paginator = Paginator(livres, 12)
-    page_obj = paginator.get_page(page)
+    livres = _page_curseur(request, paginer_livres, compter_livres, **filtres)
 
     contexte = {
         "titre_page": titre,
-        "livres": page_obj,
+        "livres": livres,
         "filtre_gratuit": est_gratuit,
         "filtre_nouveau": est_nouveau,
     }
@@ -333,37 +368,51 @@ def confirmation_achat(request, token):
     return render(request, "blog/confirmation_achat.html", contexte)
 
 
-@require_GET
+@require_safe
 def telecharger_livre(request, token):
-    """Téléchargement d'un livre payant."""
-    achat = verifier_achat_valide(token)
+    """
+    Téléchargement d'un livre payant.
+
+    Le PDF est envoyé par ``blog.fichiers`` (plages, ETag, sendfile ou
+    X-Accel-Redirect). Le fichier est trouvé avant tout comptage; une
+    requête GET dont la réponse l'envoie depuis le premier octet (200, ou
+    206 à partir de 0) compte comme un téléchargement. Une reprise (206
+    plus loin dans le fichier) est acceptée tant que le lien a été
+    utilisé dans sa limite.
+    """
+    achat = obtenir_achat_par_token(token)
+    livraison = None
+    if achat and achat["fichier_pdf"]:
+        livraison = preparer_pdf(request, achat["fichier_pdf"])
+
+    if request.method == "GET" and livraison and livraison.compte_comme_telechargement:
+        # Vérification et comptage en une seule écriture
+        achat = consommer_telechargement(
+            token,
+            ip=request.META.get("REMOTE_ADDR"),
+            user_agent=request.META.get("HTTP_USER_AGENT"),
+        )
+    else:
+        achat = verifier_achat_valide(
+            token, reprise=livraison is not None and livraison.est_reprise
+        )
 
     if not achat:
+        if livraison:
+            livraison.fermer()
         messages.error(request, "Lien de téléchargement invalide ou expiré.")
         return redirect("blog:accueil")
 
-    # Incrémenter le compteur de téléchargement
-    incrementer_telechargement_achat(achat["id"])
-    incrementer_telechargements(achat["livre_id"])
-    enregistrer_telechargement(
-        livre_id=achat["livre_id"],
-        achat_id=achat["id"],
-        ip=request.META.get("REMOTE_ADDR"),
-        user_agent=request.META.get("HTTP_USER_AGENT"),
-    )
-
-    # Rediriger vers le fichier PDF (ou servir le fichier)
-    if achat["fichier_pdf"]:
-        # En production, servir le fichier sécurisé
-        return redirect(achat["fichier_pdf"])
+    if livraison is None:
+        messages.info(request, "Fichier non disponible pour le moment.")
+        return redirect("blog:detail_livre", slug=achat["livre_slug"])
 
-    messages.info(request, "Fichier non disponible pour le moment.")
-    return redirect("blog:detail_livre", slug=achat["livre_slug"])
+    return livraison.reponse(f"{achat['livre_slug']}.pdf")
 
 
-@require_GET
+@require_safe
 def telecharger_livre_gratuit(request, slug):
-    """Téléchargement d'un livre gratuit."""
+    """Téléchargement d'un livre gratuit (voir ``telecharger_livre``)."""
     livre = obtenir_livre_par_slug(slug)
 
     if not livre:
@@ -372,19 +421,23 @@ def telecharger_livre_gratuit(request, slug):
     if not livre["est_gratuit"]:
         return redirect("blog:acheter_livre", slug=slug)
 
-    # Incrémenter les téléchargements
-    incrementer_telechargements(livre["id"])
-    enregistrer_telechargement(
-        livre_id=livre["id"],
-        ip=request.META.get("REMOTE_ADDR"),
-        user_agent=request.META.get("HTTP_USER_AGENT"),
-    )
-
+    livraison = None
     if livre["fichier_pdf"]:
-        return redirect(livre["fichier_pdf"])
+        livraison = preparer_pdf(request, livre["fichier_pdf"])
+    if livraison is None:
+        messages.info(request, "Fichier non disponible pour le moment.")
+        return redirect("blog:detail_livre", slug=slug)
+
+    if request.method == "GET" and livraison.compte_comme_telechargement:
+        # Incrémenter les téléchargements
+        incrementer_telechargements(livre["id"])
+        enregistrer_telechargement(
+            livre_id=livre["id"],
+            ip=request.META.get("REMOTE_ADDR"),
+            user_agent=request.META.get("HTTP_USER_AGENT"),
+        )
 
-    messages.info(request, "Fichier non disponible pour le moment.")
-    return redirect("blog:detail_livre", slug=slug)
+    return livraison.reponse(f"{slug}.pdf")
 
 
 # =============================================================================
@@ -394,18 +447,22 @@ def telecharger_livre_gratuit(request, slug):
 
 @require_GET
 def recherche(request):
-    """Page de résultats de recherche globale."""
+    """Page de résultats de recherche globale, classés par pertinence."""
     terme = request.GET.get("q", "").strip()
-    resultats = {"articles": [], "livres": [], "total": 0}
+    page = request.GET.get("page", "1")
+    page = int(page) if page.isdigit() else 1
+    resultats = {"resultats": [], "total": 0, "page": 1, "nombre_pages": 0}
 
     if terme and len(terme) >= 2:
-        resultats = rechercher_global(terme, limite=50)
+        resultats = rechercher_en_cache(terme, page=page)
 
     contexte = {
         "titre_page": f"Recherche : {terme}" if terme else "Recherche",
         "terme_recherche": terme,
-        "resultats": resultats,
+        "resultats": resultats["resultats"],
         "nombre_resultats": resultats["total"],
+        "page": resultats["page"],
+        "nombre_pages": resultats["nombre_pages"],
     }
     return render(request, "blog/recherche.html", contexte)
 
@@ -423,36 +480,7 @@ def api_recherche(request):
     if len(terme) < 2:
         return JsonResponse({"resultats": []})
 
-    articles = rechercher_articles(terme, limite=5)
-    livres = rechercher_livres(terme, limite=5)
-
-    data = []
-
-    for r in articles:
-        data.append(
-            {
-                "id": r["id"],
-                "titre": r["titre"],
-                "type": "article",
-                "sous_type": r["type_article"],
-                "image": r["image_url"],
-                "slug": r["slug"],
-                "url": f"/article/{r['slug']}/",
-            }
-        )
-
-    for r in livres:
-        data.append(
-            {
-                "id": r["id"],
-                "titre": r["titre"],
-                "type": "livre",
-                "image": r["image_couverture"],
-                "slug": r["slug"],
-                "url": f"/livre/{r['slug']}/",
-                "prix": r["prix"] if not r["est_gratuit"] else "Gratuit",
-            }
-        )
+    data = autocompleter(terme, limite_par_type=5)
 
     return JsonResponse({"resultats": data})
 
@@ -489,7 +517,7 @@ def api_newsletter(request):
 @require_GET
 def a_propos(request):
     """Page À propos du professeur."""
-    config = obtenir_toutes_configurations()
+    config = obtenir_configurations_en_cache()
     contexte = {
         "titre_page": "À propos",
         "config": config,
@@ -500,7 +528,7 @@ def a_propos(request):
 @require_GET
 def cv(request):
     """Page CV et parcours."""
-    config = obtenir_toutes_configurations()
+    config = obtenir_configurations_en_cache()
     contexte = {
         "titre_page": "CV & Parcours",
         "config": config,
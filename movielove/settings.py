@@ -64,8 +64,16 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+
+    # Une connexion et une transaction SQL brut par requête
+    'blog.middleware.UniteDeTravailMiddleware',
 ]
 
+# En-tête X-Requetes-SQL: nombre de requêtes SQL brut par page
+BLOG_COMPTER_REQUETES = os.environ.get(
+    'BLOG_COMPTER_REQUETES', str(DEBUG)
+).lower() == 'true'
+
 # =============================================================================
 # CONFIGURATION DES URLS
 # =============================================================================
@@ -113,6 +121,72 @@ DATABASES = {
     }
 }
 
+# Pool de connexions SQL brut (blog.db_connexion), un pool par worker
+BLOG_DB_POOL = {
+    'TAILLE_MAX': int(os.environ.get('BLOG_DB_POOL_TAILLE', 5)),
+    'DELAI_VERIFICATION': 30,
+    'DUREE_VIE_MAX': 3600,
+}
+
+# PRAGMAs appliqués à chaque connexion SQL brut (python manage.py profil_db)
+# busy_timeout est déduit de OPTIONS['timeout'] s'il n'est pas précisé ici.
+# journal_mode est enregistré dans la base par init_db et migrer_db.
+BLOG_DB_PROFIL = {
+    'journal_mode': 'WAL',
+    'synchronous': os.environ.get('BLOG_DB_SYNCHRONOUS', 'NORMAL'),
+    'cache_size': -16000,          # en Kio (16 Mo)
+    'mmap_size': 64 * 1024 * 1024,  # 64 Mo
+    'temp_store': 'MEMORY',
+}
+
+# Compteur de vues différé (blog.compteurs): écriture en lot toutes les
+# INTERVALLE secondes ou dès SEUIL vues en attente, vidé à l'arrêt du worker.
+BLOG_TAMPON_VUES = {
+    'ACTIF': os.environ.get('BLOG_TAMPON_VUES', 'True').lower() == 'true',
+    'INTERVALLE': 5.0,
+    'SEUIL': 100,
+}
+
+# Historique des téléchargements différé (blog.journal): écriture en lot toutes
+# les INTERVALLE secondes ou dès SEUIL entrées; au-delà de CAPACITE entrées en
+# attente, les nouvelles sont perdues (et comptées) plutôt que de ralentir.
+BLOG_JOURNAL_TELECHARGEMENTS = {
+    'ACTIF': os.environ.get('BLOG_JOURNAL_TELECHARGEMENTS', 'True').lower() == 'true',
+    'INTERVALLE': 2.0,
+    'SEUIL': 200,
+    'CAPACITE': 10000,
+}
+
+# Historique détaillé gardé JOURS_* jours (statistiques_vues, telechargements);
+# les mois plus anciens sont regroupés par python manage.py compacter_historique.
+BLOG_HISTORIQUE = {
+    'JOURS_VUES': 90,
+    'JOURS_TELECHARGEMENTS': 365,
+}
+
+# Scores de tendance (articles et livres populaires): une vue compte pour
+# moitié après DEMI_VIE jours, un téléchargement vaut POIDS_TELECHARGEMENT vues.
+# Après un changement, relancer python manage.py recalculer_tendances.
+# Les scores utilisent power(): SQLite 3.35+ avec les fonctions mathématiques
+# (vérifié par manage.py check, init_db et migrer_db).
+BLOG_TENDANCES = {
+    'DEMI_VIE': 7.0,
+    'POIDS_TELECHARGEMENT': 5.0,
+    # L'époque est recalée d'elle-même quand les poids dépassent 2^60
+    'RECALAGE_DEMI_VIES': 60,
+}
+
+# Cache des résultats versionné (blog.cache): invalidé à chaque écriture du
+# catalogue; TTL_VUES borne la fraîcheur des classements par nombre de vues.
+# Les recherches ont leur propre cache LRU (TAILLE_MAX_RECHERCHE entrées).
+BLOG_CACHE = {
+    'ACTIF': os.environ.get('BLOG_CACHE', 'True').lower() == 'true',
+    'TTL_VUES': 300,
+    'TTL_STATISTIQUES': 60,
+    'TAILLE_MAX_RECHERCHE': 512,
+    'TTL_RECHERCHE': 600,
+}
+
 # =============================================================================
 # VALIDATION DES MOTS DE PASSE
 # =============================================================================
@@ -157,6 +231,16 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# PDF des livres (blog.fichiers): rangés hors de MEDIA_ROOT et envoyés après
+# contrôle du lien de téléchargement. MODE: 'django' (os.sendfile via
+# gunicorn), 'x-accel' (nginx, emplacement internal PREFIXE_X_ACCEL qui pointe
+# sur RACINE) ou 'x-sendfile' (Apache mod_xsendfile, lighttpd).
+BLOG_FICHIERS = {
+    'RACINE': Path(os.environ.get('BLOG_FICHIERS_RACINE', BASE_DIR / 'fichiers')),
+    'MODE': os.environ.get('BLOG_FICHIERS_MODE', 'django'),
+    'PREFIXE_X_ACCEL': '/fichiers-proteges/',
+}
+
 # =============================================================================
 # CONFIGURATION PAR DÉFAUT
 # =============================================================================